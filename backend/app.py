@@ -4,6 +4,19 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
+import config
+from models.destination import Destination
+from models.game import Game
+from models.indexes import ensure_indexes
+from models.user import User
+from services.catalog_response_cache import CatalogResponseCache
+from services.catalog_service import DestinationCatalog
+from services.data_service import DataService
+from services.deck_service import DeckService
+from services.game_service import GameService
+from services.stats_service import create_stats_writer
+from utils.json_provider import MongoJSONProvider
+
 # Import routes
 from routes.destination_routes import destination_bp
 from routes.user_routes import user_bp
@@ -12,45 +25,119 @@ from routes.game_routes import game_bp
 # Load environment variables
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": ["https://fantastic-lollipop-bbbcf3.netlify.app", "http://localhost:3000"]}})
-
-# Configure MongoDB
-# app.config['MONGO_URI'] = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-# db_name = os.getenv('MONGO_DB_NAME', 'globetrotter')
-mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
-db_name = os.getenv('MONGO_DB_NAME', 'globetrotter')
-app.config['MONGO_URI'] = mongo_uri
-mongo_client = MongoClient(mongo_uri)
-db = mongo_client[db_name]
-# mongo_client = MongoClient(app.config['MONGO_URI'])
-# db = mongo_client.get_database()
-
-# Register blueprints
-app.register_blueprint(destination_bp, url_prefix='/api/destinations')
-app.register_blueprint(user_bp, url_prefix='/api/users')
-app.register_blueprint(game_bp, url_prefix='/api/games')
-
-# Make the database instance available to routes
-@app.before_request
-def before_request():
+def create_mongo_client(app_config, connect=False):
+    """Create a MongoClient with the pool, timeouts and compression from the config"""
+    return MongoClient(
+        app_config['MONGO_URI'],
+        maxPoolSize=app_config['MONGO_MAX_POOL_SIZE'],
+        minPoolSize=app_config['MONGO_MIN_POOL_SIZE'],
+        maxIdleTimeMS=app_config['MONGO_MAX_IDLE_TIME_MS'],
+        waitQueueTimeoutMS=app_config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        connectTimeoutMS=app_config['MONGO_CONNECT_TIMEOUT_MS'],
+        socketTimeoutMS=app_config['MONGO_SOCKET_TIMEOUT_MS'],
+        serverSelectionTimeoutMS=app_config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        compressors=app_config['MONGO_COMPRESSORS'] or None,
+        connect=connect
+    )
+
+def create_app(config_object=None):
+    """Create the Flask app.
+
+    Settings are read from `config_object` (the config module by default).
+    The app gets one MongoClient, whose pool every request shares, and one
+    instance of each model and service. The client only connects on first
+    use, so an app created in the master of a pre-forking server (for
+    example gunicorn --preload) opens its connections in each worker.
+    """
+    # Initialize Flask app
+    app = Flask(__name__)
+    app.config.from_object(config_object or config)
+    CORS(app, resources={r"/api/*": {"origins": ["https://fantastic-lollipop-bbbcf3.netlify.app", "http://localhost:3000"]}})
+
+    # Serialize MongoDB documents (ObjectIds, datetimes) directly and quickly
+    app.json = MongoJSONProvider(app)
+
+    # Create the indexes the models rely on (a no-op when they already exist)
+    # with a short-lived client, so the shared one stays unconnected until forked
+    with create_mongo_client(app.config, connect=True) as setup_client:
+        ensure_indexes(setup_client[app.config['MONGO_DB_NAME']])
+
+    # Configure MongoDB
+    mongo_client = create_mongo_client(app.config)
+    db = mongo_client[app.config['MONGO_DB_NAME']]
+    app.config['MONGO_CLIENT'] = mongo_client
     app.config['DB'] = db
 
-# Root route
-@app.route('/')
-def index():
-    return jsonify({'message': 'Globetrotter API is running'})
+    # Models hold no per-request state, so routes and services share one of each
+    destination_model = Destination(db)
+    user_model = User(db)
+    game_model = Game(db)
+    app.config['DESTINATION_MODEL'] = destination_model
+    app.config['USER_MODEL'] = user_model
+    app.config['GAME_MODEL'] = game_model
+
+    # Shared in-memory destination catalog, reloaded when the catalog version changes
+    catalog = DestinationCatalog(db, app.config['CATALOG_VERSION_CHECK_SECONDS'], destination_model)
+    app.config['CATALOG'] = catalog
+
+    # Serialized catalog read responses, served until the catalog version changes
+    app.config['CATALOG_CACHE'] = CatalogResponseCache(catalog, app.json.dump_bytes)
+
+    # User statistics writer, either direct or write-behind depending on STATS_WRITE_MODE
+    stats_writer = create_stats_writer(
+        db,
+        app.config['STATS_WRITE_MODE'],
+        app.config['STATS_FLUSH_MAX_USERS'],
+        app.config['STATS_FLUSH_INTERVAL_SECONDS'],
+        user_model
+    )
+    app.config['STATS'] = stats_writer
+
+    # Services are shared too, and built on the shared models
+    deck_service = DeckService(db, catalog, user_model)
+    app.config['DECK_SERVICE'] = deck_service
+    app.config['GAME_SERVICE'] = GameService(
+        db,
+        catalog,
+        stats_writer,
+        destination_model=destination_model,
+        user_model=user_model,
+        game_model=game_model,
+        deck_service=deck_service
+    )
+    app.config['DATA_SERVICE'] = DataService(db, destination_model=destination_model)
+
+    # Register blueprints
+    app.register_blueprint(destination_bp, url_prefix='/api/destinations')
+    app.register_blueprint(user_bp, url_prefix='/api/users')
+    app.register_blueprint(game_bp, url_prefix='/api/games')
+
+    # Root route
+    @app.route('/')
+    def index():
+        return jsonify({'message': 'Globetrotter API is running'})
+
+    # Operational metrics
+    @app.route('/api/metrics')
+    def metrics():
+        return jsonify({
+            'stats_writer': app.config['STATS'].metrics(),
+            'catalog_cache': app.config['CATALOG_CACHE'].metrics()
+        })
+
+    # Error handlers
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'error': 'Not found'}), 404
+
+    @app.errorhandler(500)
+    def server_error(error):
+        return jsonify({'error': 'Server error'}), 500
 
-# Error handlers
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Not found'}), 404
+    return app
 
-@app.errorhandler(500)
-def server_error(error):
-    return jsonify({'error': 'Server error'}), 500
+app = create_app()
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=os.getenv('DEBUG', 'False').lower() == 'true')
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=os.getenv('DEBUG', 'False').lower() == 'true')
@@ -7,6 +7,19 @@ load_dotenv()
 
 # MongoDB configuration
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/globetrotter')
+MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'globetrotter')
+
+# MongoDB connection pool, per worker process
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+# Milliseconds a request waits for a free connection before failing
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 20000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+# Wire compression, in order of preference (zstd and snappy need extra packages)
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zlib')
 
 # Application configuration
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
@@ -17,4 +30,20 @@ HOST = os.getenv('HOST', '0.0.0.0')
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 
 # OpenAI API key (for dataset expansion)
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
\ No newline at end of file
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+
+# Destination catalog cache (seconds between catalog version checks)
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 5))
+
+# Seconds clients may reuse catalog read responses without revalidating
+# them (0 makes them revalidate with the ETag every time)
+CATALOG_CACHE_MAX_AGE = int(os.getenv('CATALOG_CACHE_MAX_AGE', 0))
+
+# User statistics writes: 'direct' applies every answer immediately,
+# 'buffered' collects deltas in memory and flushes them in bulk
+STATS_WRITE_MODE = os.getenv('STATS_WRITE_MODE', 'direct')
+STATS_FLUSH_MAX_USERS = int(os.getenv('STATS_FLUSH_MAX_USERS', 100))
+STATS_FLUSH_INTERVAL_SECONDS = float(os.getenv('STATS_FLUSH_INTERVAL_SECONDS', 2))
+
+# Records per bulk write when streaming an NDJSON destination import
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
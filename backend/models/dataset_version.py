@@ -0,0 +1,64 @@
+# backend/models/dataset_version.py
+import datetime
+import hashlib
+import json
+
+class DatasetVersion:
+    """Content hashes of the dataset files imported into the catalog.
+    
+    One document per dataset file, keyed by file name, holds the hash of
+    the whole file, the hashes of its records and the catalog version the
+    import left behind.
+    """
+    collection_name = 'dataset_versions'
+    indexes = []
+    
+    # Every lookup this model runs, with representative values (see models/indexes.py)
+    queries = [
+        {
+            'name': 'DatasetVersion.get_version and save_version',
+            'filter': {'_id': 'expanded_dataset.json'},
+            'hot_path': False
+        }
+    ]
+    
+    # Truncated SHA-256 hex digests, short enough for 100k records per document
+    record_hash_length = 16
+    
+    def __init__(self, db):
+        self.collection = db[self.collection_name]
+    
+    @staticmethod
+    def hash_file(file_path, block_size=1 << 20):
+        """Hash the bytes of a file"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @classmethod
+    def hash_record(cls, destination):
+        """Hash the content of a normalized destination record"""
+        payload = json.dumps(destination, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:cls.record_hash_length]
+    
+    def get_version(self, name):
+        """Get the recorded version of a dataset file, or None"""
+        return self.collection.find_one({'_id': name})
+    
+    def get_all_versions(self):
+        """Get the recorded versions of every dataset file without their record hashes"""
+        return list(self.collection.find({}, {'record_hashes': 0}))
+    
+    def save_version(self, name, file_hash, record_hashes, catalog_version):
+        """Record the version of a dataset file after importing it"""
+        version = {
+            'file_hash': file_hash,
+            'record_hashes': sorted(record_hashes),
+            'records': len(record_hashes),
+            'catalog_version': catalog_version,
+            'imported_at': datetime.datetime.utcnow()
+        }
+        self.collection.update_one({'_id': name}, {'$set': version}, upsert=True)
+        return version
@@ -1,13 +1,79 @@
 
 # backend/models/destination.py
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from utils.place_names import canonical_place_key
+import copy
 import random
 
 class Destination:
     collection_name = 'destinations'
+    meta_collection_name = 'metadata'
+    catalog_version_key = 'destination_catalog'
+    match_key_version_key = 'destination_match_keys'
+    # Bumped whenever make_match_key changes, so stored keys are rebuilt
+    match_key_version = 2
+    indexes = [
+        # City and country lookups when deduplicating imports
+        ([('city', 1), ('country', 1)], {'name': 'city_country'}),
+        # Alias-aware city+country key that every import matches on
+        ([('match_key', 1)], {
+            'name': 'match_key_unique',
+            'unique': True,
+            'partialFilterExpression': {'match_key': {'$exists': True}}
+        })
+    ]
+    
+    # Every lookup this model runs, with representative values (see models/indexes.py)
+    queries = [
+        {
+            'name': 'Destination.get_catalog_version',
+            'collection': meta_collection_name,
+            'filter': {'_id': catalog_version_key},
+            'hot_path': True
+        },
+        {
+            'name': 'ImportPlanner.apply inserts',
+            'filter': {'match_key': 'example|example'},
+            'hot_path': True
+        },
+        {
+            'name': 'Destination.get_destination_by_id',
+            'filter': {'_id': ObjectId()},
+            'hot_path': False
+        },
+        {
+            'name': 'Destination lookup by city and country',
+            'filter': {'city': 'example', 'country': 'example'},
+            'hot_path': False
+        },
+        {
+            'name': 'Destination.get_all_destination_documents',
+            'filter': {},
+            'sort': [('_id', 1)],
+            'hot_path': False
+        },
+        {
+            # The partial match_key index cannot serve this, imports run it once
+            'name': 'Destination.backfill_match_keys',
+            'filter': {'match_key': {'$exists': False}},
+            'hot_path': False
+        }
+    ]
+    
+    # Optional destination fields and their defaults
+    optional_fields = {
+        'continent': None,
+        'clues': [],
+        'fun_facts': [],
+        'trivia': [],
+        'image_url': None
+    }
     
     def __init__(self, db):
         self.collection = db[self.collection_name]
+        self.meta_collection = db[self.meta_collection_name]
     
     def create_destination(self, city, country, clues, fun_facts, trivia, continent=None, image_url=None):
         """Create a new destination in the database"""
@@ -18,10 +84,18 @@ class Destination:
             'clues': clues,
             'fun_facts': fun_facts,
             'trivia': trivia,
-            'image_url': image_url
+            'image_url': image_url,
+            'match_key': self.make_match_key(city, country),
+            # Stamped with the catalog version by bump_catalog_version
+            'added_version': None
         }
         
-        result = self.collection.insert_one(destination)
+        try:
+            result = self.collection.insert_one(destination)
+        except DuplicateKeyError:
+            # A destination with the same city and country already exists
+            return None
+        self.bump_catalog_version([result.inserted_id])
         return str(result.inserted_id)
     
     def get_destination_by_id(self, destination_id):
@@ -88,22 +162,24 @@ class Destination:
         # If we removed duplicates and don't have enough options, get more
         while len(unique_options) < 4:
             # Get another random destination that's not already in our options
-            additional_option = self.collection.aggregate([
+            additional_option = next(self.collection.aggregate([
                 {'$match': {
                     '_id': {'$ne': excluded_id},
                     'city': {'$nin': list(unique_cities)}
                 }},
                 {'$sample': {'size': 1}},
                 {'$project': {'city': 1, 'country': 1}}
-            ]).next()
+            ]), None)
+            
+            # Stop if the collection has no more distinct cities
+            if not additional_option:
+                break
             
-            # Add it to our options if we found one
-            if additional_option:
-                city = additional_option['city']
-                if city not in unique_cities:
-                    unique_cities.add(city)
-                    additional_option['_id'] = str(additional_option['_id'])
-                    unique_options.append(additional_option)
+            city = additional_option['city']
+            if city not in unique_cities:
+                unique_cities.add(city)
+                additional_option['_id'] = str(additional_option['_id'])
+                unique_options.append(additional_option)
         
         return unique_options
     
@@ -117,26 +193,152 @@ class Destination:
             return 0
         
         # Transform data to match our schema if needed
-        transformed_data = []
-        for destination in destinations_data:
-            # Handle the case where keys might be different
-            transformed = {
-                'city': destination.get('city', ''),
-                'country': destination.get('country', ''),
-                'continent': destination.get('continent', None),
-                'clues': destination.get('clues', []),
-                'fun_facts': destination.get('fun_fact', []),  # Handle different key names
-                'trivia': destination.get('trivia', []),
-                'image_url': destination.get('image_url', None)
-            }
-            transformed_data.append(transformed)
-        
-        # Insert the data
+        transformed_data = [self.transform_record(destination) for destination in destinations_data]
+        for destination in transformed_data:
+            destination['added_version'] = None
+        
+        # Insert the data, skipping destinations that already exist
         if transformed_data:
-            result = self.collection.insert_many(transformed_data)
-            return len(result.inserted_ids)
+            try:
+                result = self.collection.insert_many(transformed_data, ordered=False)
+                inserted_count = len(result.inserted_ids)
+            except BulkWriteError as e:
+                inserted_count = e.details.get('nInserted', 0)
+            if inserted_count:
+                # insert_many set each _id, duplicates that were skipped match nothing
+                self.bump_catalog_version([destination['_id'] for destination in transformed_data])
+            return inserted_count
         return 0
     
+    @staticmethod
+    def make_match_key(city, country):
+        """Build the city+country key that identifies a destination.
+        
+        Names are normalized and resolved through utils.place_names, so
+        "New York City, United States" and "New York, USA" get the same key.
+        """
+        return canonical_place_key(city, country)
+    
+    def validate_record(self, record):
+        """Check an imported destination record, returning an error message or None"""
+        if not isinstance(record, dict):
+            return 'Record must be a JSON object'
+        
+        for field in ('city', 'country'):
+            value = record.get(field)
+            if not isinstance(value, str) or not value.strip():
+                return f'Missing {field}'
+        
+        for field in ('clues', 'fun_facts', 'fun_fact', 'trivia'):
+            value = record.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return f'{field} must be a list of strings'
+        
+        return None
+    
+    def transform_record(self, record, partial=False):
+        """Map an imported destination record onto our schema.
+        
+        With `partial`, optional fields missing from the record are left
+        out instead of being filled with defaults, so an update does not
+        wipe them.
+        """
+        city = record.get('city', '')
+        country = record.get('country', '')
+        if isinstance(city, str):
+            city = city.strip()
+        if isinstance(country, str):
+            country = country.strip()
+        
+        destination = {
+            'city': city,
+            'country': country,
+            'match_key': self.make_match_key(city, country)
+        }
+        for field, default in self.optional_fields.items():
+            if field in record:
+                destination[field] = record[field]
+            elif field == 'fun_facts' and 'fun_fact' in record:
+                # Handle different key names
+                destination[field] = record['fun_fact']
+            elif not partial:
+                destination[field] = copy.copy(default)
+        return destination
+    
+    def backfill_match_keys(self, batch_size=1000):
+        """Add match keys to destinations stored without one.
+        
+        If the stored keys were built by an older make_match_key (see
+        match_key_version), every key is rebuilt instead.
+        """
+        meta = self.meta_collection.find_one({'_id': self.match_key_version_key})
+        rebuild = not meta or meta.get('version') != self.match_key_version
+        query = {} if rebuild else {'match_key': {'$exists': False}}
+        cursor = self.collection.find(query, {'city': 1, 'country': 1, 'match_key': 1})
+        
+        updated = 0
+        operations = []
+        for destination in cursor:
+            match_key = self.make_match_key(destination.get('city'), destination.get('country'))
+            if destination.get('match_key') == match_key:
+                continue
+            operations.append(UpdateOne({'_id': destination['_id']}, {'$set': {'match_key': match_key}}))
+            if len(operations) >= batch_size:
+                updated += self._apply_backfill(operations)
+                operations = []
+        if operations:
+            updated += self._apply_backfill(operations)
+        
+        if rebuild:
+            self.meta_collection.update_one(
+                {'_id': self.match_key_version_key},
+                {'$set': {'version': self.match_key_version}},
+                upsert=True
+            )
+        return updated
+    
+    def _apply_backfill(self, operations):
+        """Write a batch of match key backfills, leaving duplicates with their old key or none"""
+        try:
+            return self.collection.bulk_write(operations, ordered=False).modified_count
+        except BulkWriteError as e:
+            print(f"Skipped {len(e.details.get('writeErrors', []))} duplicate destinations while adding match keys")
+            return e.details.get('nModified', 0)
+    
     def count_destinations(self):
         """Count the number of destinations in the database"""
-        return self.collection.count_documents({})
\ No newline at end of file
+        return self.collection.count_documents({})
+    
+    def get_all_destination_documents(self):
+        """Get every destination with all of its fields"""
+        return list(self.collection.find({}).sort('_id', 1))
+    
+    def get_catalog_version(self):
+        """Get the current version of the destination catalog"""
+        meta = self.meta_collection.find_one({'_id': self.catalog_version_key})
+        if meta:
+            return meta.get('version', 0)
+        return 0
+    
+    def bump_catalog_version(self, added_ids=()):
+        """Increment the catalog version so cached catalogs reload.
+        
+        Destinations in `added_ids` are inserted with `added_version: None`
+        and are stamped with the new version, which is how user decks find
+        the destinations added since they were built. Destinations from
+        before stamping have no `added_version` and count as version 0.
+        """
+        meta = self.meta_collection.find_one_and_update(
+            {'_id': self.catalog_version_key},
+            {'$inc': {'version': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if added_ids:
+            self.collection.update_many(
+                {'_id': {'$in': list(added_ids)}, 'added_version': None},
+                {'$set': {'added_version': meta['version']}}
+            )
+        return meta['version']
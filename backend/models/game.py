@@ -1,100 +1,320 @@
 # backend/models/game.py
 from bson import ObjectId
+from pymongo import ReturnDocument
 import datetime
 
 class Game:
     collection_name = 'games'
+    indexes = [
+        # A user's games, newest first
+        ([('user_id', 1), ('created_at', -1), ('_id', -1)], {'name': 'user_games_newest_first'})
+    ]
+    
+    # Every lookup this model runs, with representative values (see models/indexes.py)
+    queries = [
+        {
+            'name': 'Game.get_game, add_rounds and end_game',
+            'filter': {'_id': ObjectId(), 'active': True},
+            'hot_path': True
+        },
+        {
+            'name': 'Game.update_round and update_rounds',
+            'filter': {'_id': ObjectId(), 'rounds.4': {'$exists': True}, 'active': True, 'rounds.4.is_correct': {'$ne': True}},
+            'hot_path': True
+        },
+        {
+            'name': 'Game.find_user_games',
+            'filter': {'user_id': 'example'},
+            'sort': [('created_at', -1), ('_id', -1)],
+            'hot_path': True
+        },
+        {
+            'name': 'Game.find_user_games after a cursor',
+            'filter': {'user_id': 'example', '$or': [
+                {'created_at': {'$lt': datetime.datetime(2024, 1, 1)}},
+                {'created_at': datetime.datetime(2024, 1, 1), '_id': {'$lt': ObjectId()}}
+            ]},
+            'sort': [('created_at', -1), ('_id', -1)],
+            'hot_path': True
+        }
+    ]
+    
+    # Game fields without the embedded rounds (requires MongoDB 4.4+)
+    summary_projection = {
+        'user_id': 1,
+        'is_challenge': 1,
+        'challenged_by': 1,
+        'score': 1,
+        'active': 1,
+        'version': 1,
+        'created_at': 1,
+        'rounds_played': {'$size': {'$ifNull': ['$rounds', []]}}
+    }
     
     def __init__(self, db):
         self.collection = db[self.collection_name]
     
     def create_game(self, user_id, is_challenge=False, challenged_by=None):
         """Create a new game session"""
+        # User IDs are stored as strings, whether given as strings or ObjectIds
         game = {
-            'user_id': user_id,
+            'user_id': str(user_id),
             'is_challenge': is_challenge,
-            'challenged_by': challenged_by,
+            'challenged_by': str(challenged_by) if challenged_by else None,
             'score': 0,
             'rounds': [],
             'active': True,
+            # Bumped by every change, so clients can tell whether their copy is current
+            'version': 1,
             'created_at': datetime.datetime.utcnow()
         }
         
-        result = self.collection.insert_one(game)
-        game['_id'] = str(result.inserted_id)
+        self.collection.insert_one(game)
         return game
     
     def add_round(self, game_id, destination_id, clues_shown, answer_options=None):
-        """Add a new round to the game"""
-        # Prepare the round data
-        round_data = {
+        """Add a new round to an active game.
+        
+        The round is pushed and the updated game returned in one atomic
+        operation, so the new round is always the last one in the returned
+        game. Returns None if the game does not exist or is not active.
+        """
+        return self.add_rounds(game_id, [{
             'destination_id': destination_id,
             'clues_shown': clues_shown,
-            'answer_options': answer_options,
+            'answer_options': answer_options
+        }])
+    
+    def add_rounds(self, game_id, rounds):
+        """Add several rounds to an active game in one write.
+        
+        Each round needs `destination_id`, `clues_shown` and
+        `answer_options`. Returns the updated game, with the new rounds last,
+        or None if the game does not exist or is not active.
+        """
+        # Prepare the round data
+        rounds_data = [{
+            'destination_id': round['destination_id'],
+            'clues_shown': round['clues_shown'],
+            'answer_options': round.get('answer_options'),
             'user_answer': None,
             'is_correct': None,
             'fact_shown': None
-        }
+        } for round in rounds]
         
-        # Add the round to the game
-        result = self.collection.update_one(
-            {'_id': ObjectId(game_id)},
-            {'$push': {'rounds': round_data}}
+        # Add the rounds to the game
+        game = self.collection.find_one_and_update(
+            {'_id': ObjectId(game_id), 'active': True},
+            {'$push': {'rounds': {'$each': rounds_data}}, '$inc': {'version': 1}},
+            return_document=ReturnDocument.AFTER
         )
         
-        return result.modified_count > 0
+        return game
     
-    def update_round(self, game_id, round_index, user_answer, is_correct, fact_shown):
-        """Update a round with the user's answer and result"""
-        # Get the current rounds
-        game = self.collection.find_one({'_id': ObjectId(game_id)})
-        if not game or 'rounds' not in game or round_index >= len(game['rounds']):
-            return False
+    def update_round(self, game_id, round_index, user_answer, is_correct, fact_shown, active_only=False):
+        """Update a round with the user's answer and result.
         
-        # Update the round with user's answer
-        rounds = game['rounds']
-        rounds[round_index]['user_answer'] = user_answer
-        rounds[round_index]['is_correct'] = is_correct
-        rounds[round_index]['fact_shown'] = fact_shown
+        Only the `rounds.<round_index>` fields are written and the score is
+        adjusted in the same atomic operation, so concurrent answers to other
+        rounds are never lost. Returns `(previous_game, updated_game)`, so
+        callers can tell whether the round was unanswered before, or
+        `(None, None)` if the game or round does not exist (or the game is
+        inactive when `active_only` is set).
+        """
+        try:
+            round_index = int(round_index)
+        except (TypeError, ValueError):
+            return None, None
+        if round_index < 0:
+            return None, None
         
-        # Calculate new score
-        new_score = sum(1 for round in rounds if round.get('is_correct', False))
+        round_key = f'rounds.{round_index}'
+        query = {'_id': ObjectId(game_id), round_key: {'$exists': True}}
+        if active_only:
+            query['active'] = True
         
-        # Update the game
-        result = self.collection.update_one(
-            {'_id': ObjectId(game_id)},
-            {
-                '$set': {
-                    'rounds': rounds,
-                    'score': new_score
-                }
-            }
+        round_fields = {
+            f'{round_key}.user_answer': user_answer,
+            f'{round_key}.is_correct': is_correct,
+            f'{round_key}.fact_shown': fact_shown
+        }
+        
+        # Rounds are normally answered once, so first assume this round has
+        # not already been scored as correct. A concurrent answer can change
+        # the round between the two attempts so that neither matches, then
+        # try again until one does or the round is gone.
+        answer = {
+            'round_index': round_index,
+            'user_answer': user_answer,
+            'is_correct': is_correct,
+            'fact_shown': fact_shown
+        }
+        while True:
+            score_change = 1 if is_correct else 0
+            previous_game = self.collection.find_one_and_update(
+                {**query, f'{round_key}.is_correct': {'$ne': True}},
+                {'$set': round_fields, '$inc': {'score': score_change, 'version': 1}},
+                return_document=ReturnDocument.BEFORE
+            )
+            
+            if not previous_game:
+                # The round was already correct, so only a wrong answer changes the score
+                score_change = 0 if is_correct else -1
+                previous_game = self.collection.find_one_and_update(
+                    {**query, f'{round_key}.is_correct': True},
+                    {'$set': round_fields, '$inc': {'score': score_change, 'version': 1}},
+                    return_document=ReturnDocument.BEFORE
+                )
+            
+            if previous_game:
+                updated_game = self.apply_answers(previous_game, [answer])
+                updated_game['score'] = previous_game.get('score', 0) + score_change
+                return previous_game, updated_game
+            
+            if not self.collection.find_one(query, {'_id': 1}):
+                return None, None
+    
+    def update_rounds(self, game_id, answers, active_only=False):
+        """Apply answers to several rounds and recompute the score in one update.
+        
+        Each answer needs `round_index`, `user_answer`, `is_correct` and
+        `fact_shown`. The update is a single pipeline, so either every round
+        is updated or none is. Returns `(previous_game, updated_game)`, so
+        callers can tell which rounds were unanswered before, or
+        `(None, None)` if the game or any of the rounds does not exist (or
+        the game is inactive when `active_only` is set).
+        """
+        if not answers:
+            return None, None
+        
+        max_index = max(answer['round_index'] for answer in answers)
+        query = {'_id': ObjectId(game_id), f'rounds.{max_index}': {'$exists': True}}
+        if active_only:
+            query['active'] = True
+        
+        # Replace the answered rounds by position, keeping every other round as is
+        current_round = {'$arrayElemAt': ['$rounds', '$$i']}
+        branches = [{
+            'case': {'$eq': ['$$i', answer['round_index']]},
+            'then': {'$mergeObjects': [current_round, {
+                'user_answer': {'$literal': answer['user_answer']},
+                'is_correct': answer['is_correct'],
+                'fact_shown': {'$literal': answer['fact_shown']}
+            }]}
+        } for answer in answers]
+        
+        pipeline = [
+            {'$set': {'rounds': {'$map': {
+                'input': {'$range': [0, {'$size': '$rounds'}]},
+                'as': 'i',
+                'in': {'$switch': {'branches': branches, 'default': current_round}}
+            }}}},
+            {'$set': {
+                'score': {'$size': {'$filter': {
+                    'input': '$rounds',
+                    'cond': {'$eq': ['$$this.is_correct', True]}
+                }}},
+                'version': {'$add': [{'$ifNull': ['$version', 0]}, 1]}
+            }}
+        ]
+        
+        # Return the pre-image and apply the same answers to it, instead of a
+        # second read that could see later writes
+        previous_game = self.collection.find_one_and_update(
+            query,
+            pipeline,
+            return_document=ReturnDocument.BEFORE
         )
+        if not previous_game:
+            return None, None
         
-        return result.modified_count > 0
+        updated_game = self.apply_answers(previous_game, answers)
+        updated_game['score'] = sum(1 for round in updated_game['rounds'] if round.get('is_correct') is True)
+        
+        return previous_game, updated_game
+    
+    @classmethod
+    def apply_answers(cls, game, answers):
+        """Get a copy of a game pre-image with answers written to its rounds and the version bumped"""
+        rounds = list(game['rounds'])
+        for answer in answers:
+            rounds[answer['round_index']] = dict(
+                rounds[answer['round_index']],
+                user_answer=answer['user_answer'],
+                is_correct=answer['is_correct'],
+                fact_shown=answer['fact_shown']
+            )
+        return dict(game, rounds=rounds, version=cls.get_version(game) + 1)
     
     def get_game(self, game_id):
         """Get a game by ID"""
         game = self.collection.find_one({'_id': ObjectId(game_id)})
+        return game
+    
+    def get_game_version(self, game_id):
+        """Get the version of a game without loading its rounds, or None if it does not exist"""
+        game = self.collection.find_one({'_id': ObjectId(game_id)}, {'version': 1})
         if game:
-            game['_id'] = str(game['_id'])
-            return game
+            return self.get_version(game)
         return None
     
+    @staticmethod
+    def get_version(game):
+        """Get the version of a game document (0 for games stored before versions)"""
+        return game.get('version', 0)
+    
+    @staticmethod
+    def make_etag(game_id, version):
+        """Build the entity tag of a game version"""
+        return f"{game_id}-{version}"
+    
+    @classmethod
+    def make_delta(cls, game, round_indexes=()):
+        """Describe a change to a game: its score, state and version plus the changed rounds.
+        
+        Clients holding the game replace their rounds at each `round_index`
+        instead of receiving every earlier round again.
+        """
+        rounds = game.get('rounds', [])
+        return {
+            '_id': game['_id'],
+            'score': game['score'],
+            'active': game['active'],
+            'version': cls.get_version(game),
+            'rounds_played': len(rounds),
+            'rounds': [dict(rounds[index], round_index=index) for index in round_indexes if 0 <= index < len(rounds)]
+        }
+    
     def get_user_games(self, user_id):
         """Get all games for a user"""
-        cursor = self.collection.find({'user_id': user_id}).sort('created_at', -1)
-        games = []
-        for game in cursor:
-            game['_id'] = str(game['_id'])
-            games.append(game)
-        return games
+        return list(self.find_user_games(user_id, include_rounds=True))
+    
+    def find_user_games(self, user_id, before=None, limit=0, include_rounds=False):
+        """Get a cursor over a user's games, newest first.
+        
+        `before` is a (created_at, _id) position from a previous page; only
+        older games are returned. Without `include_rounds` the rounds are
+        left out and replaced by a `rounds_played` count.
+        """
+        query = {'user_id': user_id}
+        if before:
+            created_at, game_id = before
+            query['$or'] = [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': game_id}}
+            ]
+        
+        projection = None if include_rounds else self.summary_projection
+        cursor = self.collection.find(query, projection).sort([('created_at', -1), ('_id', -1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
     
     def end_game(self, game_id):
         """Mark a game as inactive"""
         result = self.collection.update_one(
-            {'_id': ObjectId(game_id)},
-            {'$set': {'active': False}}
+            {'_id': ObjectId(game_id), 'active': True},
+            {'$set': {'active': False}, '$inc': {'version': 1}}
         )
         
         return result.modified_count > 0
\ No newline at end of file
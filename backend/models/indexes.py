@@ -0,0 +1,64 @@
+# backend/models/indexes.py
+from pymongo.errors import ConnectionFailure, OperationFailure
+from models.dataset_version import DatasetVersion
+from models.destination import Destination
+from models.game import Game
+from models.user import User
+
+MODELS = [Destination, User, Game, DatasetVersion]
+
+# Every lookup the models run, declared next to each model's indexes. Hot
+# path queries are served on request paths and must never scan a collection.
+MODEL_QUERIES = [
+    dict(query, collection=query.get('collection', model.collection_name))
+    for model in MODELS
+    for query in model.queries
+]
+
+def ensure_indexes(db):
+    """Create the indexes every model declares, safe to run on every start"""
+    created = []
+    for model in MODELS:
+        collection = db[model.collection_name]
+        for keys, options in model.indexes:
+            try:
+                created.append(collection.create_index(keys, **options))
+            except ConnectionFailure as e:
+                print(f"Could not connect to MongoDB to create indexes: {e}")
+                return created
+            except OperationFailure as e:
+                # For example a unique index over data that already has duplicates
+                print(f"Could not create index {options.get('name')} on {model.collection_name}: {e}")
+    return created
+
+def get_plan_stages(plan):
+    """Collect the stage names of a query plan, outermost first"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(get_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(get_plan_stages(value))
+    return stages
+
+def explain_queries(db):
+    """Explain every model query and return the winning plan stages of each"""
+    results = []
+    for query in MODEL_QUERIES:
+        cursor = db[query['collection']].find(query['filter'])
+        if query.get('sort'):
+            cursor = cursor.sort(query['sort'])
+
+        winning_plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        stages = get_plan_stages(winning_plan)
+        results.append({
+            'name': query['name'],
+            'collection': query['collection'],
+            'hot_path': query['hot_path'],
+            'stages': stages,
+            'collection_scan': 'COLLSCAN' in stages
+        })
+    return results
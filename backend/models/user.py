@@ -1,9 +1,42 @@
 # backend/models/user.py
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 import uuid
 
 class User:
     collection_name = 'users'
+    indexes = [
+        ([('username', 1)], {'name': 'username_unique', 'unique': True}),
+        ([('challenge_id', 1)], {'name': 'challenge_id_unique', 'unique': True})
+    ]
+    
+    # Every lookup this model runs, with representative values (see models/indexes.py)
+    queries = [
+        {
+            'name': 'User.get_user_by_id, deck draws and resets, stats updates',
+            'filter': {'_id': ObjectId()},
+            'hot_path': True
+        },
+        {
+            'name': 'User.merge_into_deck',
+            'filter': {'_id': ObjectId(), 'deck.catalog_version': {'$not': {'$gte': 5}}},
+            'hot_path': True
+        },
+        {
+            'name': 'User.get_user_by_username, create_user and suggest_username',
+            'filter': {'username': 'example'},
+            'hot_path': True
+        },
+        {
+            'name': 'User.get_user_by_challenge_id',
+            'filter': {'challenge_id': 'example'},
+            'hot_path': True
+        }
+    ]
+    
+    # User fields without the deck (and the played list of users from before
+    # decks), which grow with the catalog
+    profile_projection = {'deck': 0, 'played_destinations': 0}
     
     def __init__(self, db):
         self.collection = db[self.collection_name]
@@ -22,50 +55,45 @@ class User:
                 'correct_answers': 0,
                 'incorrect_answers': 0,
                 'total_played': 0
-            },
-            'played_destinations': []
+            }
         }
         
-        result = self.collection.insert_one(user)
-        user['_id'] = str(result.inserted_id)
+        self.collection.insert_one(user)
         return user
     
     def get_user_by_id(self, user_id):
-        """Get a user by ID"""
-        user = self.collection.find_one({'_id': ObjectId(user_id)})
-        if user:
-            user['_id'] = str(user['_id'])
-            return user
-        return None
+        """Get a user by ID, without their deck or played destinations"""
+        user = self.collection.find_one({'_id': ObjectId(user_id)}, self.profile_projection)
+        return user
     
     def get_user_by_username(self, username):
-        """Get a user by username"""
-        user = self.collection.find_one({'username': username})
-        if user:
-            user['_id'] = str(user['_id'])
-            return user
-        return None
+        """Get a user by username, without their deck or played destinations"""
+        user = self.collection.find_one({'username': username}, self.profile_projection)
+        return user
     
     def get_user_by_challenge_id(self, challenge_id):
-        """Get a user by challenge ID"""
-        user = self.collection.find_one({'challenge_id': challenge_id})
-        if user:
-            user['_id'] = str(user['_id'])
-            return user
-        return None
+        """Get a user by challenge ID, without their deck or played destinations"""
+        user = self.collection.find_one({'challenge_id': challenge_id}, self.profile_projection)
+        return user
     
     def update_stats(self, user_id, is_correct):
         """Update user's game statistics"""
+        if is_correct:
+            return self.apply_stats_delta(user_id, correct_answers=1)
+        return self.apply_stats_delta(user_id, incorrect_answers=1)
+    
+    def apply_stats_delta(self, user_id, correct_answers=0, incorrect_answers=0):
+        """Add several answers to user's game statistics in one update"""
         updates = {
             '$inc': {
-                'game_stats.total_played': 1
+                'game_stats.total_played': correct_answers + incorrect_answers
             }
         }
         
-        if is_correct:
-            updates['$inc']['game_stats.correct_answers'] = 1
-        else:
-            updates['$inc']['game_stats.incorrect_answers'] = 1
+        if correct_answers:
+            updates['$inc']['game_stats.correct_answers'] = correct_answers
+        if incorrect_answers:
+            updates['$inc']['game_stats.incorrect_answers'] = incorrect_answers
         
         result = self.collection.update_one(
             {'_id': ObjectId(user_id)}, 
@@ -74,17 +102,30 @@ class User:
         
         return result.modified_count > 0
     
-    def add_played_destination(self, user_id, destination_id):
-        """Add a destination to user's played list"""
-        result = self.collection.update_one(
-            {'_id': ObjectId(user_id)},
-            {'$addToSet': {'played_destinations': destination_id}}
-        )
+    def bulk_apply_stats_deltas(self, deltas):
+        """Apply buffered statistics for many users with one bulk write.
         
-        return result.modified_count > 0
+        `deltas` maps user IDs to `(correct_answers, incorrect_answers)`.
+        The ordered=False bulk write keeps applying the other users' deltas
+        if one of them fails.
+        """
+        operations = []
+        for user_id, (correct_answers, incorrect_answers) in deltas.items():
+            operations.append(UpdateOne(
+                {'_id': ObjectId(user_id)},
+                {'$inc': {
+                    'game_stats.total_played': correct_answers + incorrect_answers,
+                    'game_stats.correct_answers': correct_answers,
+                    'game_stats.incorrect_answers': incorrect_answers
+                }}
+            ))
+        
+        if not operations:
+            return None
+        return self.collection.bulk_write(operations, ordered=False)
     
     def get_played_destinations(self, user_id):
-        """Get list of destinations played by user"""
+        """Get the destinations a user played before decks replaced the played list"""
         user = self.collection.find_one(
             {'_id': ObjectId(user_id)},
             {'played_destinations': 1}
@@ -94,6 +135,79 @@ class User:
             return user['played_destinations']
         return []
     
+    def draw_from_deck(self, user_id, count=1):
+        """Advance the user's deck cursor and return the destination IDs it passed.
+
+        Returns the deck state from before the draw: `drawn` (up to `count`
+        IDs), `cursor`, `size` and the `catalog_version` the deck is current
+        with (missing for decks built before it was recorded), or None if
+        the user does not exist. Only the requested slice of the deck is sent back, so the
+        cost does not grow with the deck size (requires MongoDB 4.4+).
+        """
+        deck_ids = {'$ifNull': ['$deck.ids', []]}
+        cursor = {'$ifNull': ['$deck.cursor', 0]}
+        # A top-level $slice would be read as the $slice projection operator,
+        # which takes no expressions, so the aggregation $slice is wrapped
+        drawn = {'$ifNull': [{'$slice': [deck_ids, cursor, count]}, []]}
+        return self.collection.find_one_and_update(
+            {'_id': ObjectId(user_id)},
+            {'$inc': {'deck.cursor': count}},
+            projection={
+                '_id': 0,
+                'drawn': drawn,
+                'cursor': cursor,
+                'size': {'$size': deck_ids},
+                'catalog_version': '$deck.catalog_version'
+            },
+            return_document=ReturnDocument.BEFORE
+        )
+    
+    def reset_deck(self, user_id, destination_ids, cursor, catalog_version):
+        """Replace the user's deck with a new permutation of destination IDs.
+        
+        The deck now covers what the played list recorded, so it is dropped.
+        """
+        result = self.collection.update_one(
+            {'_id': ObjectId(user_id)},
+            {
+                '$set': {'deck': {
+                    'ids': destination_ids,
+                    'cursor': cursor,
+                    'catalog_version': catalog_version
+                }},
+                '$unset': {'played_destinations': ''}
+            }
+        )
+        
+        return result.modified_count > 0
+    
+    def merge_into_deck(self, user_id, destination_ids, position, catalog_version):
+        """Insert newly added destinations into the undealt part of the user's deck.
+        
+        IDs the deck already holds are skipped, and the deck is marked as
+        current with `catalog_version`. Decks that are already current with
+        it are left alone, so concurrent merges of the same import are a
+        no-op. The deck is never sent to the client.
+        """
+        deck_ids = '$deck.ids'
+        new_ids = {'$filter': {
+            'input': {'$literal': destination_ids},
+            'cond': {'$not': [{'$in': ['$$this', deck_ids]}]}
+        }}
+        result = self.collection.update_one(
+            {'_id': ObjectId(user_id), 'deck.catalog_version': {'$not': {'$gte': catalog_version}}},
+            [{'$set': {
+                'deck.ids': {'$concatArrays': [
+                    {'$slice': [deck_ids, position]},
+                    new_ids,
+                    {'$slice': [deck_ids, position, {'$max': [{'$size': deck_ids}, 1]}]}
+                ]},
+                'deck.catalog_version': {'$literal': catalog_version}
+            }}]
+        )
+        
+        return result.modified_count > 0
+    
     def suggest_username(self, base_username):
         """Suggest a username if the requested one is taken"""
         import random
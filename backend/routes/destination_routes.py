@@ -1,33 +1,49 @@
 # backend/routes/destination_routes.py
 from flask import Blueprint, request, jsonify, current_app
-from models.destination import Destination
-from models.user import User
 import random
 
 destination_bp = Blueprint('destinations', __name__)
 
+# Content types accepted for streaming imports
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+def catalog_response(name, build):
+    """Serve a catalog read from the response cache, or 304 if the client has it.
+    
+    `build` turns a catalog snapshot into the response data. Responses
+    carry a strong ETag of the catalog version and may be cached for
+    CATALOG_CACHE_MAX_AGE seconds, or must be revalidated when it is 0.
+    """
+    cache = current_app.config['CATALOG_CACHE']
+    etag, body = cache.get(name, build)
+    
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    max_age = current_app.config['CATALOG_CACHE_MAX_AGE']
+    response.headers['Cache-Control'] = f'public, max-age={max_age}' if max_age else 'no-cache'
+    
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        cache.record_not_modified()
+    return response
+
 @destination_bp.route('/random', methods=['GET'])
 def get_random_destination():
     """Get a random destination with clues"""
-    db = current_app.config['DB']
-    destination_model = Destination(db)
+    deck_service = current_app.config['DECK_SERVICE']
+    catalog = current_app.config['CATALOG']
     
-    # Get excluded destination IDs from user if provided
+    # Deal the next unplayed destination from the user's deck if provided
     user_id = request.args.get('user_id')
-    excluded_ids = []
-    
-    if user_id:
-        user_model = User(db)
-        excluded_ids = user_model.get_played_destinations(user_id)
-    
-    # Get a random destination
-    destination = destination_model.get_random_destination(excluded_ids)
+    drawn = deck_service.draw(user_id)
     
-    if not destination:
+    if not drawn:
         return jsonify({'error': 'No destinations found'}), 404
     
+    destination = drawn[0]
+    
     # Get answer options for multiple choice
-    answer_options = destination_model.get_multiple_choice_options(destination)
+    answer_options = catalog.get_multiple_choice_options(destination)
     
     # Select 1-2 random clues
     clues = destination['clues']
@@ -37,11 +53,6 @@ def get_random_destination():
     # Select a random fun fact
     fun_fact = random.choice(destination['fun_facts']) if destination['fun_facts'] else None
     
-    # If user is logged in, mark destination as played
-    if user_id:
-        user_model = User(db)
-        user_model.add_played_destination(user_id, str(destination['_id']))
-    
     # Prepare response
     response = {
         'destination_id': str(destination['_id']),
@@ -59,7 +70,6 @@ def get_random_destination():
 @destination_bp.route('/validate', methods=['POST'])
 def validate_answer():
     """Validate a user's answer"""
-    db = current_app.config['DB']
     data = request.json
     
     # Extract data from request
@@ -70,8 +80,8 @@ def validate_answer():
     round_index = data.get('round_index', 0)
     
     # Validate destination
-    destination_model = Destination(db)
-    destination = destination_model.get_destination_by_id(destination_id)
+    catalog = current_app.config['CATALOG']
+    destination = catalog.get_destination_by_id(destination_id)
     
     if not destination:
         return jsonify({'error': 'Destination not found'}), 404
@@ -89,12 +99,11 @@ def validate_answer():
     
     # Update user stats if user is logged in
     if user_id:
-        user_model = User(db)
-        user_model.update_stats(user_id, is_correct)
+        current_app.config['STATS'].record_answer(user_id, is_correct)
     
     # Update game if part of a game
     if game_id:
-        game_model = Game(db)
+        game_model = current_app.config['GAME_MODEL']
         game_model.update_round(game_id, round_index, user_answer, is_correct, random_fact)
     
     # Prepare response
@@ -113,22 +122,15 @@ def validate_answer():
 @destination_bp.route('/', methods=['GET'])
 def get_all_destinations():
     """Get all destinations (admin only)"""
-    db = current_app.config['DB']
-    destination_model = Destination(db)
-    
-    destinations = destination_model.get_all_destinations()
-    
-    # Convert ObjectId to string for JSON serialization
-    for destination in destinations:
-        destination['_id'] = str(destination['_id'])
-    
-    return jsonify(destinations)
+    return catalog_response('destinations', lambda snapshot: [
+        {'_id': destination['_id'], 'city': destination['city'], 'country': destination.get('country')}
+        for destination in snapshot.destinations
+    ])
 
 @destination_bp.route('/', methods=['POST'])
 def add_destination():
     """Add a new destination (admin only)"""
-    db = current_app.config['DB']
-    destination_model = Destination(db)
+    destination_model = current_app.config['DESTINATION_MODEL']
     data = request.json
     
     # Extract data from request
@@ -149,13 +151,31 @@ def add_destination():
         city, country, clues, fun_facts, trivia, continent, image_url
     )
     
+    if not destination_id:
+        return jsonify({'error': 'Destination already exists'}), 409
+    
+    current_app.config['CATALOG_CACHE'].invalidate()
+    
     return jsonify({'destination_id': destination_id}), 201
 
 @destination_bp.route('/import', methods=['POST'])
 def import_destinations():
-    """Import multiple destinations (admin only)"""
-    db = current_app.config['DB']
-    destination_model = Destination(db)
+    """Import multiple destinations (admin only)
+    
+    Accepts a JSON list, or NDJSON (one destination per line) with an
+    application/x-ndjson content type. NDJSON bodies are streamed and
+    upserted in chunks of `chunk_size` records.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        chunk_size = request.args.get('chunk_size', current_app.config['IMPORT_CHUNK_SIZE'], type=int)
+        if not chunk_size or chunk_size < 1:
+            return jsonify({'error': 'Chunk size must be a positive number'}), 400
+        
+        report = current_app.config['DATA_SERVICE'].import_destination_stream(request.stream, chunk_size)
+        current_app.config['CATALOG_CACHE'].invalidate()
+        return jsonify(report), 201
+    
+    destination_model = current_app.config['DESTINATION_MODEL']
     data = request.json
     
     # Validate data
@@ -164,18 +184,11 @@ def import_destinations():
     
     # Import destinations
     count = destination_model.import_destinations(data)
+    current_app.config['CATALOG_CACHE'].invalidate()
     
     return jsonify({'message': f'Successfully imported {count} destinations'}), 201
 
 @destination_bp.route('/count', methods=['GET'])
 def count_destinations():
     """Count the number of destinations"""
-    db = current_app.config['DB']
-    destination_model = Destination(db)
-    
-    count = destination_model.count_destinations()
-    
-    return jsonify({'count': count})
-
-# Import missing dependencies to avoid circular imports
-from models.game import Game
\ No newline at end of file
+    return catalog_response('count', lambda snapshot: {'count': len(snapshot.destinations)})
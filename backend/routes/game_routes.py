@@ -1,17 +1,41 @@
 # backend/routes/game_routes.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from models.game import Game
-from models.user import User
-from models.destination import Destination
-from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from utils.helpers import encode_cursor, decode_cursor
 
 game_bp = Blueprint('games', __name__)
 
+# A game is five questions, dealt one at a time or all up front
+ROUNDS_PER_GAME = 5
+MAX_ROUNDS_PER_REQUEST = 20
+
+# Game history pages, streamed from MongoDB in batches
+DEFAULT_GAMES_PAGE_SIZE = 20
+GAMES_STREAM_BATCH_SIZE = 100
+
+# HTTP status codes for the errors GameService reports
+GAME_ERROR_STATUS = {
+    'Game not found': 404,
+    'Game is not active': 400,
+    'Round not found': 400,
+    'Invalid answers': 400,
+    'No destinations found': 404
+}
+
+def wants_delta():
+    """Check whether the client asked for delta responses with `delta=true`.
+    
+    A delta replaces the full game in a response with its score, state,
+    version and only the rounds the request changed (see Game.make_delta).
+    """
+    return request.args.get('delta', 'false').lower() == 'true'
+
 @game_bp.route('/', methods=['POST'])
 def start_game():
     """Start a new game session"""
-    db = current_app.config['DB']
-    game_model = Game(db)
+    game_model = current_app.config['GAME_MODEL']
+    user_model = current_app.config['USER_MODEL']
     data = request.json
     
     # Extract user ID from request
@@ -21,7 +45,6 @@ def start_game():
         return jsonify({'error': 'User ID is required'}), 400
     
     # Validate user exists
-    user_model = User(db)
     user = user_model.get_user_by_id(user_id)
     
     if not user:
@@ -35,16 +58,15 @@ def start_game():
             'id': game['_id'],
             'score': game['score'],
             'rounds': game['rounds'],
-            'active': game['active']
+            'active': game['active'],
+            'version': game['version']
         }
     }), 201
 
 @game_bp.route('/<game_id>/round', methods=['POST'])
 def add_round(game_id):  # Add game_id as parameter here
     """Add a new round to the game"""
-    db = current_app.config['DB']
-    game_model = Game(db)
-    destination_model = Destination(db)
+    game_service = current_app.config['GAME_SERVICE']
     data = request.json
     
     # Extract data from request
@@ -53,76 +75,51 @@ def add_round(game_id):  # Add game_id as parameter here
     if not game_id:
         return jsonify({'error': 'Game ID is required'}), 400
     
-    # Get the game
-    game = game_model.get_game(game_id)
-    
-    if not game:
-        return jsonify({'error': 'Game not found'}), 404
-    
-    # If game is not active, return error
-    if not game['active']:
-        return jsonify({'error': 'Game is not active'}), 400
+    # Deal the round and add it to the game
+    result = game_service.create_round(game_id, user_id)
     
-    # Get excluded destination IDs from user if provided
-    excluded_ids = []
-    if user_id:
-        user_model = User(db)
-        excluded_ids = user_model.get_played_destinations(user_id)
+    if 'error' in result:
+        return jsonify({'error': result['error']}), GAME_ERROR_STATUS[result['error']]
     
-    # Get a random destination
-    destination = destination_model.get_random_destination(excluded_ids)
+    if wants_delta():
+        result['game'] = Game.make_delta(result['game'], [result['round']['round_index']])
     
-    if not destination:
-        return jsonify({'error': 'No destinations found'}), 404
-    
-    # Get answer options for multiple choice
-    answer_options = destination_model.get_multiple_choice_options(destination)
+    return jsonify(result)
+
+@game_bp.route('/<game_id>/rounds', methods=['POST'])
+def add_rounds(game_id):
+    """Deal several rounds of the game at once"""
+    game_service = current_app.config['GAME_SERVICE']
+    data = request.get_json(silent=True) or {}
     
-    # Select 1-2 random clues
-    clues = destination['clues']
-    num_clues = min(2, len(clues))
-    selected_clues = random.sample(clues, num_clues)
+    # Extract data from request
+    user_id = data.get('user_id')
+    try:
+        count = int(request.args.get('count', ROUNDS_PER_GAME))
+    except ValueError:
+        # Reject a malformed count instead of silently dealing the default
+        count = 0
     
-    # If user is logged in, mark destination as played
-    if user_id:
-        user_model = User(db)
-        user_model.add_played_destination(user_id, str(destination['_id']))
+    if count < 1 or count > MAX_ROUNDS_PER_REQUEST:
+        return jsonify({'error': f'Count must be between 1 and {MAX_ROUNDS_PER_REQUEST}'}), 400
     
-    # Add the round to the game
-    game_model.add_round(
-        game_id, 
-        str(destination['_id']), 
-        selected_clues,
-        answer_options
-    )
+    # Deal the rounds and add them to the game in one write
+    result = game_service.create_rounds(game_id, user_id, count)
     
-    # Get the updated game
-    updated_game = game_model.get_game(game_id)
+    if 'error' in result:
+        return jsonify({'error': result['error']}), GAME_ERROR_STATUS[result['error']]
     
-    # Prepare response
-    response = {
-        'game': updated_game,
-        'round': {
-            'destination_id': str(destination['_id']),
-            'clues': selected_clues,
-            'answer_options': answer_options,
-            'round_index': len(updated_game['rounds']) - 1,
-            'correct_answer': {
-                'city': destination['city'],
-                'country': destination['country']
-            }
-        }
-    }
+    if wants_delta():
+        result['game'] = Game.make_delta(result['game'], [round['round_index'] for round in result['rounds']])
     
-    return jsonify(response)
+    return jsonify(result)
 
 @game_bp.route('/<game_id>/answer', methods=['POST'])
 def submit_answer(game_id):
     """Submit an answer for the current round"""
-    db = current_app.config['DB']
-    game_model = Game(db)
-    user_model = User(db)
-    destination_model = Destination(db)
+    game_model = current_app.config['GAME_MODEL']
+    game_service = current_app.config['GAME_SERVICE']
+    catalog = current_app.config['CATALOG']
     data = request.json
     
     # Extract data from request
@@ -133,18 +130,8 @@ def submit_answer(game_id):
     if not game_id or not destination_id or not user_answer:
         return jsonify({'error': 'Game ID, destination ID, and answer are required'}), 400
     
-    # Get the game
-    game = game_model.get_game(game_id)
-    
-    if not game:
-        return jsonify({'error': 'Game not found'}), 404
-    
-    # If game is not active, return error
-    if not game['active']:
-        return jsonify({'error': 'Game is not active'}), 400
-    
     # Get the destination
-    destination = destination_model.get_destination_by_id(destination_id)
+    destination = catalog.get_destination_by_id(destination_id)
     
     if not destination:
         return jsonify({'error': 'Destination not found'}), 404
@@ -152,47 +139,34 @@ def submit_answer(game_id):
     # Check if answer is correct
     is_correct = destination['city'] == user_answer
     
-    # Get a random fact to display - THIS IS THE IMPORTANT PART TO FIX
-    if is_correct:
-        if 'fun_facts' in destination and destination['fun_facts']:
-            facts = destination['fun_facts']
-        elif 'fun_fact' in destination and destination['fun_fact']:
-            facts = destination['fun_fact']
-        else:
-            facts = [f"{destination['city']} is a fascinating destination!"]
-    else:
-        if 'trivia' in destination and destination['trivia']:
-            facts = destination['trivia']
-        else:
-            facts = [f"{destination['city']} has many interesting aspects to explore."]
-
-    random_fact = random.choice(facts)
-    
-    # Make sure we have at least one fact, otherwise use a default
-    if facts and len(facts) > 0:
-        random_fact = random.choice(facts)
-    else:
-        # Provide default facts based on whether answer was correct
-        if is_correct:
-            random_fact = f"{destination['city']} is a fascinating destination with a rich history and culture!"
-        else:
-            random_fact = f"{destination['city']} is known for its unique attractions and landmarks."
-    
-    # Update the round
-    game_model.update_round(
+    # Get a random fact to display
+    random_fact = game_service.pick_fact(destination, is_correct)
+    
+    # Update the round, this also returns the game before and after
+    previous_game, updated_game = game_model.update_round(
         game_id, 
         round_index, 
         user_answer, 
         is_correct, 
-        random_fact
+        random_fact,
+        active_only=True
     )
     
-    # Update user stats
-    user_id = game['user_id']
-    user_model.update_stats(user_id, is_correct)
+    if not updated_game:
+        # Only look the game up again to report why the update failed
+        game = game_model.get_game(game_id)
+        if not game:
+            return jsonify({'error': 'Game not found'}), 404
+        if not game['active']:
+            return jsonify({'error': 'Game is not active'}), 400
+        return jsonify({'error': 'Round not found'}), 400
     
-    # Get the updated game
-    updated_game = game_model.get_game(game_id)
+    # Update user stats, unless the round was already answered
+    if previous_game['rounds'][int(round_index)].get('user_answer') is None:
+        current_app.config['STATS'].record_answer(updated_game['user_id'], is_correct)
+    
+    if wants_delta():
+        updated_game = Game.make_delta(updated_game, [int(round_index)])
     
     # Prepare response
     response = {
@@ -208,25 +182,62 @@ def submit_answer(game_id):
     
     return jsonify(response)
 
+@game_bp.route('/<game_id>/answers', methods=['POST'])
+def submit_answers(game_id):
+    """Submit answers for several rounds at once"""
+    game_service = current_app.config['GAME_SERVICE']
+    data = request.json
+    
+    # Accept either {"answers": [...]} or a bare list of answers
+    answers = data.get('answers') if isinstance(data, dict) else data
+    
+    # Validate the answers and apply them in a single update
+    result = game_service.submit_answers(game_id, answers)
+    
+    if 'error' in result:
+        return jsonify(result), GAME_ERROR_STATUS[result['error']]
+    
+    if wants_delta():
+        result['game'] = Game.make_delta(result['game'], [item['round_index'] for item in result['results']])
+    
+    return jsonify(result)
+
 @game_bp.route('/<game_id>', methods=['GET'])
-def get_game(self, game_id):
-    """Get a game by ID"""
+def get_game(game_id):
+    """Get a game by ID.
+    
+    The response carries the game version as its ETag. A poll sending
+    that ETag back in If-None-Match gets an empty 304 while the game is
+    unchanged, which only reads the version, not the rounds.
+    """
+    game_model = current_app.config['GAME_MODEL']
+    
     try:
-        game = self.collection.find_one({'_id': ObjectId(game_id)})
-        if game:
-            game['_id'] = str(game['_id'])
-            return game
-        return None
-    except Exception as e:
-        # Handle invalid ID or other errors
-        print(f"Error retrieving game with ID {game_id}: {e}")
-        return None
+        if request.if_none_match:
+            version = game_model.get_game_version(game_id)
+            if version is not None and request.if_none_match.contains(Game.make_etag(game_id, version)):
+                response = Response(status=304)
+                response.set_etag(Game.make_etag(game_id, version))
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+        
+        game = game_model.get_game(game_id)
+    except InvalidId:
+        game = None
+    
+    if not game:
+        return jsonify({'error': 'Game not found'}), 404
+    
+    response = jsonify({'game': game})
+    response.set_etag(Game.make_etag(game['_id'], Game.get_version(game)))
+    # Clients may keep the game but must revalidate it before use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @game_bp.route('/<game_id>/end', methods=['POST'])
 def end_game(game_id):
     """End a game session"""
-    db = current_app.config['DB']
-    game_model = Game(db)
+    game_model = current_app.config['GAME_MODEL']
     
     # Get the game
     game = game_model.get_game(game_id)
@@ -240,17 +251,54 @@ def end_game(game_id):
     # Get the updated game
     updated_game = game_model.get_game(game_id)
     
+    if wants_delta():
+        updated_game = Game.make_delta(updated_game)
+    
     return jsonify({'game': updated_game})
 
 @game_bp.route('/user/<user_id>', methods=['GET'])
 def get_user_games(user_id):
-    """Get all games for a user"""
-    db = current_app.config['DB']
-    game_model = Game(db)
-    
-    games = game_model.get_user_games(user_id)
-    
-    return jsonify({'games': games})
-
-# Import missing dependencies
-import random
\ No newline at end of file
+    """Get a page of a user's games, newest first.
+    
+    Query parameters: `limit` (default 20, 0 for the whole history),
+    `before` (the `next_cursor` of the previous page) and
+    `include_rounds=true` to include every round. The response is
+    streamed one game at a time, so memory use does not depend on the
+    size of the page.
+    """
+    game_model = current_app.config['GAME_MODEL']
+    
+    limit = request.args.get('limit', DEFAULT_GAMES_PAGE_SIZE, type=int)
+    include_rounds = request.args.get('include_rounds', 'false').lower() == 'true'
+    
+    if limit is None or limit < 0:
+        return jsonify({'error': 'Limit must be a non-negative number'}), 400
+    
+    before = None
+    if request.args.get('before'):
+        before = decode_cursor(request.args['before'])
+        if not before:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    cursor = game_model.find_user_games(user_id, before, limit, include_rounds)
+    cursor = cursor.batch_size(GAMES_STREAM_BATCH_SIZE)
+    json_provider = current_app.json
+    
+    def generate():
+        yield '{"games": ['
+        count = 0
+        last_position = None
+        for game in cursor:
+            if count:
+                yield ','
+            last_position = (game['created_at'], game['_id'])
+            yield json_provider.dumps(game)
+            count += 1
+        
+        # A full page may be followed by older games
+        next_cursor = None
+        if limit and count == limit:
+            next_cursor = encode_cursor(*last_position)
+        yield f'], "next_cursor": {json_provider.dumps(next_cursor)}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -1,15 +1,12 @@
 # backend/routes/user_routes.py
 from flask import Blueprint, request, jsonify, current_app
-from models.user import User
-from models.game import Game
 import random
 user_bp = Blueprint('users', __name__)
 
 @user_bp.route('/register', methods=['POST'])
 def register_user():
     """Register a new user"""
-    db = current_app.config['DB']
-    user_model = User(db)
+    user_model = current_app.config['USER_MODEL']
     data = request.json
     
     # Extract username from request
@@ -41,8 +38,7 @@ def register_user():
 @user_bp.route('/<user_id>', methods=['GET'])
 def get_user(user_id):
     """Get user by ID"""
-    db = current_app.config['DB']
-    user_model = User(db)
+    user_model = current_app.config['USER_MODEL']
     
     user = user_model.get_user_by_id(user_id)
     
@@ -61,8 +57,7 @@ def get_user(user_id):
 @user_bp.route('/username/<username>', methods=['GET'])
 def get_user_by_username(username):
     """Get user by username"""
-    db = current_app.config['DB']
-    user_model = User(db)
+    user_model = current_app.config['USER_MODEL']
     
     user = user_model.get_user_by_username(username)
     
@@ -81,8 +76,7 @@ def get_user_by_username(username):
 @user_bp.route('/challenge/<challenge_id>', methods=['GET'])
 def get_user_by_challenge(challenge_id):
     """Get user by challenge ID"""
-    db = current_app.config['DB']
-    user_model = User(db)
+    user_model = current_app.config['USER_MODEL']
     
     user = user_model.get_user_by_challenge_id(challenge_id)
     
@@ -100,9 +94,8 @@ def get_user_by_challenge(challenge_id):
 @user_bp.route('/challenge', methods=['POST'])
 def create_challenge():
     """Create a challenge link"""
-    db = current_app.config['DB']
-    user_model = User(db)
-    game_model = Game(db)
+    user_model = current_app.config['USER_MODEL']
+    game_model = current_app.config['GAME_MODEL']
     data = request.json
     
     # Extract user ID from request
@@ -135,9 +128,8 @@ def create_challenge():
 @user_bp.route('/challenge/accept', methods=['POST'])
 def accept_challenge():
     """Accept a challenge"""
-    db = current_app.config['DB']
-    user_model = User(db)
-    game_model = Game(db)
+    user_model = current_app.config['USER_MODEL']
+    game_model = current_app.config['GAME_MODEL']
     data = request.json
     
     # Extract data from request
@@ -197,5 +189,3 @@ def accept_challenge():
             'id': game['_id']
         }
     })
-
-# Import missing dependencies
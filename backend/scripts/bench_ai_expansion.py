@@ -0,0 +1,86 @@
+# scripts/bench_ai_expansion.py
+"""
+Benchmark the AI dataset expansion at different concurrency levels.
+
+Runs DataService.expand_dataset against a local stand-in for the OpenAI
+endpoint that answers every request after a fixed latency and makes a
+share of the generated destinations invalid. Each concurrency level
+starts from a freshly seeded database (MONGO_DB_NAME, default
+globetrotter_bench, on the server in MONGO_URI) and an empty response
+cache; the last run repeats the widest level with the cache warm.
+
+Usage:
+    python scripts/bench_ai_expansion.py [destinations] [latency_seconds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openai_stub_server import OpenAIStubServer
+from services.data_service import DataService
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+DESTINATIONS_PER_REQUEST = 5
+INVALID_RATE = 0.05
+
+def seed(db):
+    """Reset the benchmark database to the starter dataset"""
+    db.client.drop_database(db.name)
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    service = DataService(db)
+    service.import_starter_dataset(os.path.join(data_dir, 'starter_dataset.json'))
+    return service.get_destination_count()
+
+def run(db, server, cache_dir, destinations, concurrency):
+    """Expand a freshly seeded database and return (seconds, report)"""
+    existing = seed(db)
+    service = DataService(db, openai_api_key='stub', openai_base_url=server.base_url, cache_dir=cache_dir)
+    # Keep the expanded dataset file of the repository untouched
+    service.data_dir = cache_dir
+
+    started = time.perf_counter()
+    report = service.expand_dataset(
+        prompts_count=DESTINATIONS_PER_REQUEST,
+        concurrency=concurrency,
+        target_count=existing + destinations
+    )
+    return time.perf_counter() - started, report
+
+def main():
+    """Print expansion throughput for each concurrency level"""
+    destinations = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+
+    load_dotenv()
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    db = client[os.getenv('MONGO_DB_NAME', 'globetrotter_bench')]
+
+    with OpenAIStubServer(latency=latency, invalid_rate=INVALID_RATE) as server:
+        print(f"{destinations} destinations, {DESTINATIONS_PER_REQUEST} per request, {latency * 1000:.0f} ms per request\n")
+        print(f"{'concurrency':>11} {'cache':>6} {'requests/s':>11} {'dest/s':>8} {'inserted':>9} {'rejected':>9} {'cache hits':>11}")
+
+        runs = [(concurrency, False) for concurrency in CONCURRENCY_LEVELS]
+        runs.append((CONCURRENCY_LEVELS[-1], True))
+        with tempfile.TemporaryDirectory() as warm_cache_dir:
+            for number, (concurrency, warm) in enumerate(runs):
+                # The last cold run fills the cache the warm run reads
+                with tempfile.TemporaryDirectory() as cold_cache_dir:
+                    cache_dir = warm_cache_dir if number >= len(runs) - 2 else cold_cache_dir
+                    seconds, report = run(db, server, cache_dir, destinations, concurrency)
+                print(
+                    f"{concurrency:>11} {'warm' if warm else 'cold':>6} {report['requests'] / seconds:>11.1f} "
+                    f"{report['generated'] / seconds:>8.1f} {report['inserted']:>9} {report['rejected']:>9} {report['cache_hits']:>11}"
+                )
+
+    client.drop_database(db.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# scripts/bench_answer_options.py
+"""
+Benchmark multiple choice option generation as the catalog grows.
+
+Builds synthetic catalogs from 100 to 100k destinations and reports the
+time to build the distractor index and the per-call latency of drawing
+answer options from it. No database is needed.
+"""
+
+import os
+import random
+import sys
+import time
+
+from bson import ObjectId
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.distractor_index import DistractorIndex
+
+CATALOG_SIZES = [100, 1000, 10000, 100000]
+CONTINENTS = ["Africa", "Asia", "Europe", "North America", "Oceania", "South America"]
+CALLS_PER_SIZE = 20000
+
+def build_catalog(size):
+    """Build a synthetic catalog with a realistic share of duplicate cities"""
+    destinations = []
+    for i in range(size):
+        continent = CONTINENTS[i % len(CONTINENTS)]
+        destinations.append({
+            '_id': ObjectId(),
+            # Roughly 5% of entries repeat an earlier city name
+            'city': f"City {i if i % 20 else i // 2}",
+            'country': f"Country {i % 150}",
+            'continent': continent if i % 50 else None
+        })
+    return destinations
+
+def main():
+    """Run the benchmark and print one line per catalog size"""
+    print(f"{'destinations':>12} {'build (ms)':>12} {'per call (us)':>14} {'p99 (us)':>10}")
+    for size in CATALOG_SIZES:
+        destinations = build_catalog(size)
+
+        started = time.perf_counter()
+        index = DistractorIndex(destinations)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        samples = []
+        for _ in range(CALLS_PER_SIZE):
+            destination = random.choice(destinations)
+            started = time.perf_counter()
+            index.get_distractors(destination, 3)
+            samples.append(time.perf_counter() - started)
+
+        samples.sort()
+        mean_us = sum(samples) / len(samples) * 1e6
+        p99_us = samples[int(len(samples) * 0.99)] * 1e6
+        print(f"{size:>12} {build_ms:>12.1f} {mean_us:>14.2f} {p99_us:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# scripts/bench_extraction.py
+"""
+Micro-benchmark picking clues, fun facts and trivia from article text.
+
+Extracts the paragraphs of every saved article in scripts/fixtures/pages
+once, then times the single-pass extractor against the three separate
+generators it replaced, which are kept below as the reference. Both are
+run with the same random seed and must pick exactly the same items.
+
+Usage:
+    python scripts/bench_extraction.py [iterations]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from bs4 import BeautifulSoup
+
+# Scripts import their siblings directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import extract_items, extract_paragraphs, generic_clues, generic_fun_facts, generic_trivia
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+def reference_select(paragraphs, city_name, keep, min_length, generic):
+    """Pick items the way each generator did on its own"""
+    items = []
+    for paragraph in paragraphs:
+        sentences = paragraph.split('. ')
+        for sentence in sentences:
+            if keep(sentence):
+                cleaned = sentence.strip().replace('\n', ' ')
+                if cleaned and len(cleaned) > min_length and cleaned[-1] != '.':
+                    cleaned += '.'
+
+                if cleaned and len(cleaned) > min_length:
+                    items.append(cleaned)
+
+    selected = []
+    for item in items:
+        if len(selected) >= 3:
+            break
+        if item not in selected:
+            selected.append(item)
+
+    while len(selected) < 3:
+        item = random.choice(generic)
+        if item not in selected:
+            selected.append(item)
+
+    return selected
+
+def reference_items(paragraphs, city_name):
+    """Run the three original generators"""
+    clues = reference_select(
+        paragraphs, city_name,
+        lambda sentence: city_name.lower() not in sentence.lower() and len(sentence) > 30,
+        30, generic_clues(city_name)
+    )
+    fun_facts = reference_select(
+        paragraphs, city_name,
+        lambda sentence: any(keyword in sentence.lower() for keyword in ['largest', 'oldest', 'first', 'famous', 'popular', 'unique', 'founded']),
+        20, generic_fun_facts(city_name)
+    )
+    trivia = reference_select(
+        paragraphs, city_name,
+        lambda sentence: any(keyword in sentence.lower() for keyword in ['tradition', 'annual', 'celebration', 'festival', 'event', 'known for', 'population']),
+        20, generic_trivia(city_name)
+    )
+    return {'clues': clues, 'fun_facts': fun_facts, 'trivia': trivia}
+
+def load_corpus():
+    """Get (city, paragraphs) for every fixture article, with all paragraphs kept"""
+    with open(os.path.join(FIXTURES_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    corpus = []
+    for page in index:
+        with open(os.path.join(FIXTURES_DIR, page['file']), 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        corpus.append((page['city'], extract_paragraphs(soup, max_paragraphs=None)))
+    return corpus
+
+def time_extractor(extract, corpus, iterations):
+    """Return microseconds per article"""
+    random.seed(0)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for city, paragraphs in corpus:
+            extract(paragraphs, city)
+    return (time.perf_counter() - started) / (iterations * len(corpus)) * 1e6
+
+def main():
+    """Check both extractors agree and time them"""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    corpus = load_corpus()
+
+    for city, paragraphs in corpus:
+        random.seed(city)
+        expected = reference_items(paragraphs, city)
+        random.seed(city)
+        if extract_items(paragraphs, city) != expected:
+            print(f"❌ Extractors disagree on {city}")
+            sys.exit(1)
+    print(f"✅ Both extractors pick the same items for {len(corpus)} articles\n")
+
+    reference = time_extractor(reference_items, corpus, iterations)
+    single_pass = time_extractor(extract_items, corpus, iterations)
+    print(f"{'extractor':<14} {'µs/article':>11}")
+    print(f"{'three passes':<14} {reference:>11.1f}")
+    print(f"{'single pass':<14} {single_pass:>11.1f}")
+    print(f"\nSpeed-up: {reference / single_pass:.2f}x")
+
+if __name__ == "__main__":
+    main()
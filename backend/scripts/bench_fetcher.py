@@ -0,0 +1,74 @@
+# scripts/bench_fetcher.py
+"""
+Benchmark the page fetcher at different concurrency levels.
+
+Fetches fixture pages from a local stand-in server that answers every
+request after a fixed latency and fails a share of them with 503, and
+reports pages per second for each concurrency level. The per-host rate
+limit is lifted so the numbers show what concurrency and keep-alive buy;
+the last line repeats the widest level with the scraper's default limit.
+A second table fetches the same pages through the on-disk cache: cold,
+revalidated with conditional requests, and offline.
+
+Usage:
+    python scripts/bench_fetcher.py [pages] [latency_seconds]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Scripts import their siblings directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fetcher import AsyncFetcher
+from fixture_server import FixtureServer
+from http_cache import HttpCache
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32]
+FAILURE_RATE = 0.05
+
+async def fetch_pages(urls, concurrency, rate_per_host, cache=None):
+    """Fetch every URL and return the fetcher stats"""
+    async with AsyncFetcher(concurrency=concurrency, rate_per_host=rate_per_host, backoff=0.01, cache=cache) as fetcher:
+        pages = await fetcher.fetch_all(urls)
+    return fetcher.stats, sum(1 for page in pages if page is not None)
+
+def run(server, pages, concurrency, rate_per_host=0, cache=None):
+    """Fetch `pages` fixture pages and return (pages per second, stats, fetched)"""
+    urls = [f"{server.base_url}City_{index}" for index in range(pages)]
+    started = time.perf_counter()
+    stats, fetched = asyncio.run(fetch_pages(urls, concurrency, rate_per_host, cache))
+    elapsed = time.perf_counter() - started
+    return fetched / elapsed, stats, fetched
+
+def main():
+    """Print pages per second for each concurrency level"""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    with FixtureServer(latency=latency, failure_rate=FAILURE_RATE) as server:
+        print(f"{pages} pages, {latency * 1000:.0f} ms latency, {FAILURE_RATE:.0%} of responses fail\n")
+        print(f"{'concurrency':>11} {'rate limit':>10} {'pages/s':>9} {'fetched':>8} {'retries':>8}")
+
+        levels = [(concurrency, 0) for concurrency in CONCURRENCY_LEVELS]
+        levels.append((CONCURRENCY_LEVELS[-1], float(os.getenv('SCRAPER_RATE_PER_HOST', 2))))
+        for concurrency, rate_per_host in levels:
+            # Rate limited runs are slow by design, so they fetch fewer pages
+            count = pages if not rate_per_host else min(pages, 20)
+            pages_per_second, stats, fetched = run(server, count, concurrency, rate_per_host)
+            limit = f"{rate_per_host:g}/s" if rate_per_host else 'none'
+            print(f"{concurrency:>11} {limit:>10} {pages_per_second:>9.1f} {fetched:>8} {stats['retries']:>8}")
+
+        concurrency = CONCURRENCY_LEVELS[2]
+        print(f"\n{'cache':>11} {'pages/s':>9} {'downloaded':>10} {'revalidated':>11} {'from disk':>9}")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for mode, label in [('revalidate', 'cold'), ('revalidate', 'revalidate'), ('offline', 'offline')]:
+                cache = HttpCache(cache_dir, mode=mode)
+                pages_per_second, stats, fetched = run(server, pages, concurrency, cache=cache)
+                print(f"{label:>11} {pages_per_second:>9.1f} {stats['fetched']:>10} {stats['revalidated']:>11} {stats['cache_hits']:>9}")
+
+if __name__ == "__main__":
+    main()
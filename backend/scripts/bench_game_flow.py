@@ -0,0 +1,92 @@
+# scripts/bench_game_flow.py
+"""
+Benchmark dealing a full game round by round against dealing it as a pack.
+
+Plays games through the Flask test client against the MongoDB server in
+MONGO_URI, using a separate database (MONGO_DB_NAME, default
+globetrotter_bench) seeded from the starter and expanded datasets.
+Reports the MongoDB commands and wall time per game for both flows.
+"""
+
+import os
+import sys
+import time
+from pymongo import monitoring
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GAMES_PER_FLOW = 50
+ROUNDS_PER_GAME = 5
+
+class CommandCounter(monitoring.CommandListener):
+    """Count the commands sent to MongoDB"""
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def play_round_by_round(client, game_id, user_id):
+    """Deal a game with one request per round"""
+    for _ in range(ROUNDS_PER_GAME):
+        client.post(f'/api/games/{game_id}/round', json={'user_id': user_id})
+
+def play_pack(client, game_id, user_id):
+    """Deal a game with a single request"""
+    client.post(f'/api/games/{game_id}/rounds?count={ROUNDS_PER_GAME}', json={'user_id': user_id})
+
+def run_flow(client, counter, user_id, deal):
+    """Play several games with the given flow and return (commands, seconds) per game"""
+    commands = 0
+    elapsed = 0.0
+    for _ in range(GAMES_PER_FLOW):
+        game_id = client.post('/api/games/', json={'user_id': user_id}).get_json()['game']['id']
+
+        counter.count = 0
+        started = time.perf_counter()
+        deal(client, game_id, user_id)
+        elapsed += time.perf_counter() - started
+        commands += counter.count
+
+    return commands / GAMES_PER_FLOW, elapsed / GAMES_PER_FLOW
+
+def main():
+    """Seed a benchmark database and compare both flows"""
+    os.environ.setdefault('MONGO_DB_NAME', 'globetrotter_bench')
+
+    # The listener must be registered before the app creates its client
+    counter = CommandCounter()
+    monitoring.register(counter)
+
+    from app import app
+    from utils.helpers import load_json_file
+
+    db = app.config['DB']
+    db.client.drop_database(db.name)
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    destination_model = app.config['DESTINATION_MODEL']
+    for file_name in ['starter_dataset.json', 'expanded_dataset.json']:
+        destination_model.import_destinations(load_json_file(os.path.join(data_dir, file_name)) or [])
+
+    client = app.test_client()
+    user_id = client.post('/api/users/register', json={'username': 'bench'}).get_json()['user']['id']
+
+    # Warm the catalog cache so both flows start from the same state
+    client.get('/api/destinations/random')
+
+    print(f"{'flow':<16} {'mongo ops/game':>15} {'ms/game':>10}")
+    for name, deal in [('round by round', play_round_by_round), ('game pack', play_pack)]:
+        commands, seconds = run_flow(client, counter, user_id, deal)
+        print(f"{name:<16} {commands:>15.1f} {seconds * 1000:>10.2f}")
+
+    db.client.drop_database(db.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# scripts/bench_html_extraction.py
+"""
+Check and time the paragraph extraction backends.
+
+Every available backend must return byte-identical paragraphs to the
+html.parser reference for every saved page in scripts/fixtures/pages,
+at several paragraph limits. The stream backend is also checked on
+malformed markup that BeautifulSoup nests in its own way. Each page is
+then extracted repeatedly with every backend, once as saved and once
+padded with the hundreds of paragraphs, tables and navboxes a full
+article has below its lead section.
+
+Usage:
+    python scripts/bench_html_extraction.py [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+# Scripts import their siblings directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import available_extractors, extract_with_html_parser, extract_with_stream, PARAGRAPH_EXTRACTORS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+PARAGRAPH_LIMITS = [1, 3, 5, 8, None]
+
+# Markup only a tag soup parser would accept
+MALFORMED_PAGES = [
+    '<div id="mw-content-text"><p>Outer paragraph that is long enough to keep around for the check <p>with an unclosed inner paragraph that is also quite long</div><p>Outside of the content so it never counts at all, however long it is</p>',
+    '<div id="mw-content-text"><p>Text with <script>var hidden = "script text";</script>a script and <style>.x{}</style>a style and <!-- a comment --> inside it, all of it long</p></div>',
+    '<div id="mw-content-text"></p><p/><p>A stray end tag, an empty paragraph and entities &amp; &#91;1&#93; &#150; &nbsp;&eacute; here</p></div>',
+    '<div><div id="mw-content-text"><div><p>Closing an outer div closes the paragraph and the content div too, long enough</div></div></div><p>Never seen by the extractor because the content div is closed already</p>',
+    '<p>No content div anywhere on this page, so nothing is extracted from it at all</p>'
+]
+
+def load_pages():
+    """Get (name, html) for every saved fixture page"""
+    with open(os.path.join(FIXTURES_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    pages = []
+    for page in index:
+        with open(os.path.join(FIXTURES_DIR, page['file']), 'r', encoding='utf-8') as f:
+            pages.append((page['file'], f.read()))
+    return pages
+
+def pad_page(html, sections=60):
+    """Add the long body of a full article after the lead section"""
+    section = (
+        '<h2><span class="mw-headline">History</span></h2>'
+        '<p>The district grew around the harbour during the eighteenth century, when merchants built warehouses along the river front and the first stone bridge was opened to carriages.</p>'
+        '<table class="wikitable"><tr><th>Year</th><th>Population</th></tr><tr><td>1900</td><td>356,009</td></tr><tr><td>1950</td><td>783,226</td></tr></table>'
+        '<p>Most of the buildings from that period survive, and several of them are listed as monuments of national interest.<sup class="reference"><a href="#cite_note-9">[9]</a></sup></p>'
+        '<div class="navbox"><ul><li><a href="/wiki/A">A</a></li><li><a href="/wiki/B">B</a></li><li><a href="/wiki/C">C</a></li></ul></div>'
+    )
+    marker = '</div></div>'
+    position = html.find(marker)
+    if position == -1:
+        return html
+    return html[:position] + section * sections + html[position:]
+
+def encode(paragraphs):
+    """Serialize paragraphs so outputs can be compared byte for byte"""
+    return json.dumps(paragraphs, ensure_ascii=False).encode('utf-8')
+
+def check(pages, backends):
+    """Compare every backend with the reference and return the mismatches"""
+    mismatches = []
+    for name, html in pages:
+        for limit in PARAGRAPH_LIMITS:
+            expected = encode(extract_with_html_parser(html, limit))
+            for backend in backends:
+                if encode(PARAGRAPH_EXTRACTORS[backend](html, limit)) != expected:
+                    mismatches.append(f"{backend} on {name} with max_paragraphs={limit}")
+
+    for number, html in enumerate(MALFORMED_PAGES, 1):
+        for limit in PARAGRAPH_LIMITS:
+            if encode(extract_with_stream(html, limit)) != encode(extract_with_html_parser(html, limit)):
+                mismatches.append(f"stream on malformed page {number} with max_paragraphs={limit}")
+    return mismatches
+
+def time_backend(backend, pages, iterations):
+    """Return milliseconds per page"""
+    extract = PARAGRAPH_EXTRACTORS[backend]
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for _, html in pages:
+            extract(html)
+    return (time.perf_counter() - started) / (iterations * len(pages)) * 1000
+
+def main():
+    """Check every backend against the reference and time them"""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    backends = available_extractors()
+    pages = load_pages()
+    padded = [(name, pad_page(html)) for name, html in pages]
+
+    mismatches = check(pages + padded, [backend for backend in backends if backend != 'html.parser'])
+    if mismatches:
+        print("❌ Backends differ from the html.parser reference:")
+        for mismatch in mismatches:
+            print(f"  - {mismatch}")
+        sys.exit(1)
+    print(f"✅ {', '.join(backends)} agree byte for byte on {len(pages) * 2} pages\n")
+
+    sizes = [sum(len(html) for _, html in group) // len(group) // 1024 for group in (pages, padded)]
+    print(f"{'backend':<12} {f'saved ({sizes[0]} KB)':>16} {f'padded ({sizes[1]} KB)':>17}")
+    for backend in backends:
+        saved = time_backend(backend, pages, iterations)
+        full = time_backend(backend, padded, iterations)
+        print(f"{backend:<12} {saved:>13.2f} ms {full:>14.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# scripts/bench_import_planner.py
+"""
+Time the import planner on large synthetic datasets.
+
+A catalog of stored destinations is indexed and an import of the same
+size is planned against it. A third of the imported records match stored
+destinations exactly, a third under another spelling (case, accents,
+"St." or a country alias) and the rest are new. The old exact-city list
+check is timed on a slice of the import for comparison. No database is
+needed.
+
+Usage:
+    python scripts/bench_import_planner.py [records]
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.destination import Destination
+from services.import_planner import ImportPlanner
+
+COUNTRY_SPELLINGS = [('United States', 'USA'), ('United Kingdom', 'UK'), ('Czech Republic', 'Czechia'), ('Türkiye', 'Turkey')]
+LIST_CHECK_RECORDS = 2000
+
+def make_destination(number, country):
+    """Make up a stored destination"""
+    return {
+        'city': f"St. Émile {number}",
+        'country': country,
+        'continent': 'Europe',
+        'clues': [f"Clue about city {number}."],
+        'fun_facts': [],
+        'trivia': [f"Trivia about city {number}."]
+    }
+
+def make_datasets(count):
+    """Get (stored documents, import records) with the mix described above"""
+    stored = []
+    records = []
+    for number in range(count):
+        country, alias = COUNTRY_SPELLINGS[number % len(COUNTRY_SPELLINGS)]
+        document = make_destination(number, country)
+        document['_id'] = number
+        stored.append(document)
+
+        kind = number % 3
+        if kind == 0:
+            records.append(make_destination(number, country))
+        elif kind == 1:
+            records.append(dict(make_destination(number, alias), city=f"saint emile {number}", fun_facts=['New fact.']))
+        else:
+            records.append(make_destination(count + number, country))
+    return stored, records
+
+def list_check(stored, records):
+    """The exact-city list check the planner replaced"""
+    existing_cities = [document['city'] for document in stored]
+    return [record for record in records if record['city'] not in existing_cities]
+
+def main():
+    """Print index, planning and list check times"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    stored, records = make_datasets(count)
+
+    # Planning only reads and writes plain dicts, so the model needs no database
+    planner = ImportPlanner(Destination({'destinations': None, 'metadata': None}))
+
+    started = time.perf_counter()
+    index = planner.build_index(stored)
+    index_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    plan = planner.plan(records, index)
+    plan_seconds = time.perf_counter() - started
+
+    sample = records[:LIST_CHECK_RECORDS]
+    started = time.perf_counter()
+    list_check(stored, sample)
+    list_seconds = (time.perf_counter() - started) * len(records) / len(sample)
+
+    print(f"{count} stored destinations, {len(records)} imported records\n")
+    print(f"inserts {len(plan['inserts'])}, updates {len(plan['updates'])}, unchanged {plan['unchanged']}, alias matches {plan['aliases']}\n")
+    print(f"{'build index':<24} {index_seconds * 1000:>10.0f} ms")
+    print(f"{'plan':<24} {plan_seconds * 1000:>10.0f} ms  ({len(records) / plan_seconds:,.0f} records/s)")
+    print(f"{'list check (projected)':<24} {list_seconds * 1000:>10.0f} ms")
+
+if __name__ == "__main__":
+    main()
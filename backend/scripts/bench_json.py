@@ -0,0 +1,124 @@
+# scripts/bench_json.py
+"""
+Benchmark serializing game documents for API responses.
+
+Builds game documents as MongoDB returns them, with ObjectIds, datetimes
+and rounds that embed their answer options, and serializes them with:
+
+    flask      Flask's default provider, after converting the _id by hand
+               the way the models used to
+    stdlib     MongoJSONProvider on the standard library json module
+    orjson     MongoJSONProvider on orjson, if it is installed
+
+Both MongoJSONProvider backends must produce the same bytes.
+
+Usage:
+    python scripts/bench_json.py [iterations]
+"""
+
+import datetime
+import os
+import sys
+import time
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_provider
+from utils.json_provider import MongoJSONProvider
+
+ROUND_COUNTS = [5, 50, 500]
+GAMES_PER_PAGE = 20
+
+def make_game(rounds):
+    """Build a finished game with the given number of rounds"""
+    options = [
+        {'_id': str(ObjectId()), 'city': city, 'country': country}
+        for city, country in [('Lisbon', 'Portugal'), ('Kyoto', 'Japan'), ('Reykjavík', 'Iceland'), ('Cusco', 'Peru')]
+    ]
+    return {
+        '_id': ObjectId(),
+        'user_id': str(ObjectId()),
+        'is_challenge': False,
+        'challenged_by': None,
+        'score': rounds // 2,
+        'rounds': [{
+            'destination_id': options[number % 4]['_id'],
+            'clues_shown': [
+                'This city sits on seven hills above the estuary of a long river.',
+                'Its trams climb streets too steep for buses.'
+            ],
+            'answer_options': options,
+            'user_answer': options[(number * 3) % 4]['city'],
+            'is_correct': number % 2 == 0,
+            'fact_shown': 'It is older than Rome, and one of the oldest cities in Western Europe.'
+        } for number in range(rounds)],
+        'active': False,
+        'created_at': datetime.datetime.utcnow()
+    }
+
+def convert_ids(document):
+    """Convert the _id of a game, or of every game in a page, to a string"""
+    if isinstance(document, list):
+        return [convert_ids(game) for game in document]
+    return dict(document, _id=str(document['_id']))
+
+def flask_dumps(provider, document):
+    """Serialize the way the models and routes used to: convert the _id, then dump"""
+    return provider.dumps(convert_ids(document)).encode('utf-8')
+
+def time_dumps(dumps, documents, iterations):
+    """Return microseconds per document"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for document in documents:
+            dumps(document)
+    return (time.perf_counter() - started) / (iterations * len(documents)) * 1e6
+
+def main():
+    """Check both provider backends agree and time every serializer"""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = Flask(__name__)
+    flask_provider = DefaultJSONProvider(app)
+    flask_provider.compact = True
+    provider = MongoJSONProvider(app)
+    orjson = json_provider.orjson
+
+    def stdlib_dumps(document):
+        json_provider.orjson = None
+        try:
+            return provider.dump_bytes(document)
+        finally:
+            json_provider.orjson = orjson
+
+    serializers = [
+        ('flask', lambda document: flask_dumps(flask_provider, document)),
+        ('stdlib', stdlib_dumps)
+    ]
+    if orjson is not None:
+        serializers.append(('orjson', provider.dump_bytes))
+
+    workloads = [(f"1 game, {rounds} rounds", [make_game(rounds)]) for rounds in ROUND_COUNTS]
+    workloads.append((f"{GAMES_PER_PAGE} games, 5 rounds", [[make_game(5) for _ in range(GAMES_PER_PAGE)]]))
+
+    if orjson is not None:
+        for name, documents in workloads:
+            for document in documents:
+                if provider.dump_bytes(document) != stdlib_dumps(document):
+                    print(f"❌ orjson and stdlib output differ for {name}")
+                    sys.exit(1)
+        print("✅ orjson and stdlib produce identical bytes\n")
+    else:
+        print("orjson is not installed, only the stdlib backend is timed\n")
+
+    print(f"{'workload':<22} {'KB':>6} " + ' '.join(f"{name + ' µs':>12}" for name, _ in serializers))
+    for name, documents in workloads:
+        size = len(provider.dump_bytes(documents[0])) / 1024
+        timings = [time_dumps(dumps, documents, iterations) for _, dumps in serializers]
+        print(f"{name:<22} {size:>6.1f} " + ' '.join(f"{timing:>12.1f}" for timing in timings))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# scripts/build_journal.py
+"""
+Append-only checkpoint journal for dataset builds.
+
+A build first writes its plan, the list of cities it is going to scrape,
+next to the dataset. Every city it finishes is then appended to a JSONL
+journal as one line and flushed to disk, so a crash or Ctrl-C loses at
+most the page in flight. On restart the plan and journal are read back
+and only the cities without a journal line are scraped again. When the
+build is done the journal is compacted into the dataset file with an
+atomic rename and the plan and journal are removed.
+
+Journal lines look like:
+    {"city": "Lisbon", "status": "done", "destination": {...}}
+    {"city": "Atlantis", "status": "skipped", "reason": "no paragraphs"}
+
+Cities that could not be fetched get no line, so a resumed build tries
+them again.
+"""
+
+import json
+import os
+from http_cache import atomic_write, fsync_directory
+
+class BuildJournal:
+    """Checkpoint a dataset build next to its output file"""
+    def __init__(self, output_file):
+        base, _ = os.path.splitext(output_file)
+        self.output_file = output_file
+        self.plan_file = f"{base}.plan.json"
+        self.journal_file = f"{base}.journal.jsonl"
+
+    def exists(self):
+        """Check if there is an unfinished build to resume"""
+        return os.path.exists(self.plan_file)
+
+    def write_plan(self, cities):
+        """Record the (city, country) pairs a build is going to scrape"""
+        plan = [{'city': city, 'country': country} for city, country in cities]
+        atomic_write(self.plan_file, json.dumps(plan, ensure_ascii=False).encode('utf-8'), durable=True)
+
+    def read_plan(self):
+        """Get the (city, country) pairs of the unfinished build"""
+        with open(self.plan_file, 'r', encoding='utf-8') as f:
+            return [(item['city'], item['country']) for item in json.load(f)]
+
+    def entries(self):
+        """Yield the journal lines written so far.
+
+        A torn last line from a crash mid-write is ignored.
+        """
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def completed(self):
+        """Get the finished destinations by city, None for skipped cities"""
+        return {entry['city']: entry.get('destination') for entry in self.entries()}
+
+    def append(self, city, destination=None, reason=None):
+        """Record a finished city, with its destination or the reason it was skipped"""
+        if destination is not None:
+            entry = {'city': city, 'status': 'done', 'destination': destination}
+        else:
+            entry = {'city': city, 'status': 'skipped', 'reason': reason}
+
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def status(self):
+        """Report the progress of the unfinished build without reading the dataset"""
+        if not self.exists():
+            return None
+
+        planned = self.read_plan()
+        statuses = {}
+        for entry in self.entries():
+            statuses[entry['city']] = entry['status']
+
+        done = sum(1 for city, _ in planned if statuses.get(city) == 'done')
+        skipped = sum(1 for city, _ in planned if statuses.get(city) == 'skipped')
+        remaining = [(city, country) for city, country in planned if city not in statuses]
+        return {
+            'planned': len(planned),
+            'done': done,
+            'skipped': skipped,
+            'remaining': remaining
+        }
+
+    def compact(self, existing_data):
+        """Write the existing and journaled destinations to the dataset atomically.
+
+        Journaled destinations follow the order of the plan, and cities
+        the dataset already has are left out, so compacting again after a
+        crash between the rename and `discard` adds nothing twice. The
+        dataset is on disk before this returns, so the journal can be
+        discarded right after. Returns the full list of destinations
+        written.
+        """
+        completed = self.completed()
+        planned = self.read_plan() if self.exists() else []
+        existing_cities = {item['city'] for item in existing_data}
+        new_destinations = [
+            completed[city] for city, _ in planned
+            if completed.get(city) and city not in existing_cities
+        ]
+
+        all_destinations = existing_data + new_destinations
+        data = json.dumps(all_destinations, indent=2, ensure_ascii=False).encode('utf-8')
+        atomic_write(self.output_file, data, durable=True)
+        return all_destinations
+
+    def discard(self):
+        """Remove the plan and journal of a build"""
+        # Make sure the compacted dataset's rename is on disk before its journal goes
+        fsync_directory(os.path.dirname(os.path.abspath(self.output_file)))
+        for path in [self.journal_file, self.plan_file]:
+            if os.path.exists(path):
+                os.remove(path)
@@ -3,62 +3,105 @@
 Script to expand the Globetrotter dataset using web scraping
 and import the results into MongoDB.
 
-This script performs the following steps:
-1. Runs the web scraper to gather data from Wikipedia
-2. Imports the expanded dataset into MongoDB
+Both steps run in one process as a pipeline:
+1. The web scraper gathers data from Wikipedia and yields every
+   destination as soon as it is built
+2. The importer writes the destinations to MongoDB in small batches
+   while the scraper is still running
+
+Once the scrape finishes the expanded dataset file is written and its
+version recorded, so import_expanded_dataset.py skips it later.
+
+Options:
+    --restart  discard an unfinished scrape and plan a new one
 """
 
 import os
 import sys
 import time
-import subprocess
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_journal import BuildJournal
+from services.dataset_import import DatasetImporter
+from web_scraper import dataset_file, finish_build, load_dataset, prepare_build, scrape_destinations
+
+# Destinations written to MongoDB per bulk write
+IMPORT_BATCH_SIZE = int(os.getenv('EXPAND_IMPORT_BATCH_SIZE', 10))
 
-def run_command(command, description):
-    """Run a command and print its output"""
+def print_step(description):
+    """Print a step header"""
     print(f"\n{'=' * 80}")
     print(f"📋 {description}")
     print(f"{'=' * 80}\n")
-    
-    try:
-        # Run the command and capture output
-        process = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            check=True
-        )
-        print(process.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed with exit code {e.returncode}")
-        print(e.stdout)
-        return False
+
+def rate(count, seconds):
+    """Format a throughput"""
+    return f"{count / seconds:.1f}/s" if seconds > 0 else "-"
 
 def main():
-    """Run the dataset expansion and import process"""
+    """Run the dataset expansion and import pipeline"""
     print("\n🌍 GLOBETROTTER DATASET EXPANSION 🌍")
     print("This script will expand the destination dataset using web scraping.\n")
     
-    # Get the directory of this script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # Load environment variables and connect to MongoDB
+    load_dotenv()
+    client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/globetrotter'))
+    db = client.get_database()
+    importer = DatasetImporter(db)
     
-    # Step 1: Run the web scraper
-    print("\n🕸️  Step 1: Web Scraping")
-    scraper_path = os.path.join(script_dir, "web_scraper.py")
-    if not run_command(["python", scraper_path], "Running web scraper"):
-        print("\n❌ Web scraping failed. Aborting.")
-        return
+    # Step 1: Plan the scrape
+    print_step("Planning web scrape")
+    output_file = dataset_file()
+    journal = BuildJournal(output_file)
+    if '--restart' in sys.argv[1:]:
+        journal.discard()
+    existing_data = load_dataset(output_file)
+    pending = prepare_build(journal, existing_data)
+    
+    # Step 2: Scrape and import side by side
+    print_step(f"Scraping {len(pending)} cities and importing them in batches of {IMPORT_BATCH_SIZE}")
+    started = time.perf_counter()
+    
+    def print_batch(report):
+        elapsed = time.perf_counter() - started
+        print(
+            f"📥 Imported batch {report['batches']}: {report['records']} destinations so far, "
+            f"{report['inserted']} new, {report['updated']} updated ({rate(report['records'], elapsed)})"
+        )
     
-    # Step 2: Import the expanded dataset
-    print("\n📥 Step 2: Importing Dataset")
-    import_path = os.path.join(script_dir, "import_expanded_dataset.py")
-    if not run_command(["python", import_path], "Importing expanded dataset"):
-        print("\n❌ Dataset import failed.")
+    try:
+        report = importer.import_stream(scrape_destinations(pending, journal), IMPORT_BATCH_SIZE, on_batch=print_batch)
+    except KeyboardInterrupt:
+        print("Interrupted. Progress is saved, run the script again to resume.")
+        return
+    except Exception as e:
+        print(f"\n❌ Dataset expansion failed: {e}")
         return
+    elapsed = time.perf_counter() - started
+    
+    # Step 3: Write the dataset file and record its version
+    print_step("Saving expanded dataset")
+    finish_build(journal, existing_data, output_file)
+    version = importer.import_file(output_file)
+    if 'error' in version:
+        print(f"⚠️ Could not record the dataset version: {version['error']}")
+    
+    # The scrape runs for the whole pipeline, the import only while it writes
+    print(f"\n{'stage':<8} {'items':>6} {'seconds':>8} {'throughput':>11}")
+    print(f"{'scrape':<8} {report['records']:>6} {elapsed:>8.2f} {rate(report['records'], elapsed):>11}")
+    print(f"{'import':<8} {report['records']:>6} {report['busy']:>8.2f} {rate(report['records'], report['busy']):>11}")
+    print(
+        f"\nInserted {report['inserted']}, updated {report['updated']}, unchanged {report['unchanged']}, "
+        f"duplicates {report['duplicates']}, rejected {report['rejected']}, failed writes {report['errors']}"
+    )
+    print(f"Total destinations: {importer.destination_model.count_destinations()}")
     
     print("\n✅ Dataset expansion process completed!")
     print("You can now start your Globetrotter application and enjoy a richer dataset.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
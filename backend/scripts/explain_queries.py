@@ -0,0 +1,56 @@
+# scripts/explain_queries.py
+"""
+Create the model indexes and print the query plan of every model query.
+
+Usage:
+    python scripts/explain_queries.py [--strict]
+
+With --strict the script exits with status 1 if any hot path query is
+answered with a collection scan, so CI can run it against a seeded
+local database.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.indexes import ensure_indexes, explain_queries
+
+def main():
+    """Print the plan of every model query"""
+    strict = '--strict' in sys.argv[1:]
+
+    # Load environment variables
+    load_dotenv()
+
+    # Connect to MongoDB
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+    db_name = os.getenv('MONGO_DB_NAME', 'globetrotter')
+    client = MongoClient(mongo_uri)
+    db = client[db_name]
+
+    created = ensure_indexes(db)
+    print(f"Ensured {len(created)} indexes on {db_name}\n")
+
+    scans = []
+    for result in explain_queries(db):
+        marker = 'hot ' if result['hot_path'] else '    '
+        print(f"{marker}{result['collection']:<14} {' <- '.join(result['stages']):<40} {result['name']}")
+        if result['hot_path'] and result['collection_scan']:
+            scans.append(result['name'])
+
+    if scans:
+        print(f"\n❌ {len(scans)} hot path queries scan a whole collection:")
+        for name in scans:
+            print(f"  - {name}")
+        if strict:
+            sys.exit(1)
+    else:
+        print("\n✅ No hot path query scans a whole collection.")
+
+if __name__ == "__main__":
+    main()
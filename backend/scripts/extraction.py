@@ -0,0 +1,389 @@
+# scripts/extraction.py
+"""
+Extract the paragraphs of an article and pick clues, fun facts and trivia.
+
+Paragraphs are the text of the first `max_paragraphs` <p> elements under
+#mw-content-text that are longer than 50 characters. Three backends
+can extract them:
+
+    html.parser  build the whole BeautifulSoup tree (the reference)
+    lxml         build the tree with lxml, if it is installed
+    stream       tokenize the page incrementally and stop as soon as the
+                 last paragraph it needs is closed, without building a tree
+
+The stream backend produces exactly the same paragraphs as html.parser,
+for malformed markup too (tests/test_extraction.py checks this). lxml
+repairs malformed markup its own way and only matches on well-formed
+articles.
+
+SCRAPER_EXTRACTOR picks the backend, `stream` by default.
+
+Every paragraph is split into sentences once, each sentence is lowered
+once, and each sentence is sorted into all three buckets in the same
+pass: fun fact and trivia keywords are matched with one precompiled
+alternation per bucket instead of a loop of substring tests. Buckets
+are deduplicated with sets and the pass stops as soon as every bucket
+is full. The selection is the same as asking each bucket separately.
+"""
+
+import os
+import random
+import re
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+ITEMS_PER_BUCKET = 3
+
+MAX_PARAGRAPHS = 5
+MIN_PARAGRAPH_LENGTH = 50
+CONTENT_ID = 'mw-content-text'
+
+# Tags that never have content, as BeautifulSoup treats them
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+}
+
+# Text inside these tags is not part of a paragraph's text, as BeautifulSoup
+# gives it its own string types
+HIDDEN_TEXT_TAGS = {'style', 'script', 'template', 'rt', 'rp'}
+
+# Whitespace-only text is collapsed everywhere except inside these tags
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+
+FUN_FACT_KEYWORDS = ['largest', 'oldest', 'first', 'famous', 'popular', 'unique', 'founded']
+TRIVIA_KEYWORDS = ['tradition', 'annual', 'celebration', 'festival', 'event', 'known for', 'population']
+
+FUN_FACT_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in FUN_FACT_KEYWORDS))
+TRIVIA_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in TRIVIA_KEYWORDS))
+
+# Clues must be longer than facts, they are shown without the answer
+MIN_CLUE_LENGTH = 30
+MIN_FACT_LENGTH = 20
+
+def select_paragraphs(texts):
+    """Keep the paragraph texts long enough to be worth reading"""
+    text_paragraphs = []
+    for text in texts:
+        text = text.strip()
+        if text and len(text) > MIN_PARAGRAPH_LENGTH:  # Skip short or empty paragraphs
+            text_paragraphs.append(text)
+    return text_paragraphs
+
+def extract_paragraphs(soup, max_paragraphs=MAX_PARAGRAPHS):
+    """Extract paragraphs from the page content"""
+    content_div = soup.find('div', {'id': CONTENT_ID})
+    if not content_div:
+        return []
+
+    paragraphs = content_div.find_all('p')
+    return select_paragraphs(p.get_text() for p in paragraphs[:max_paragraphs])
+
+def extract_with_html_parser(html, max_paragraphs=MAX_PARAGRAPHS):
+    """Extract paragraphs from a full BeautifulSoup tree"""
+    return extract_paragraphs(BeautifulSoup(html, 'html.parser'), max_paragraphs)
+
+def lxml_text(element):
+    """Get an element's text the way BeautifulSoup's get_text does"""
+    parts = []
+
+    def walk(node):
+        # Comments have a callable tag, their own text is skipped
+        if isinstance(node.tag, str) and node.tag not in HIDDEN_TEXT_TAGS and node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(element)
+    return ''.join(parts)
+
+def extract_with_lxml(html, max_paragraphs=MAX_PARAGRAPHS):
+    """Extract paragraphs from an lxml tree"""
+    root = lxml_html.document_fromstring(html)
+    content = root.xpath(f'//div[@id="{CONTENT_ID}"]')
+    if not content:
+        return []
+
+    paragraphs = []
+    for p in content[0].iter('p'):
+        if max_paragraphs is not None and len(paragraphs) >= max_paragraphs:
+            break
+        paragraphs.append(lxml_text(p))
+    return select_paragraphs(paragraphs)
+
+class StopParsing(Exception):
+    """Raised by the stream parser once it has every paragraph it needs"""
+
+class ParagraphStream(HTMLParser):
+    """Collect the text of the first <p> elements under the content div.
+
+    Tokens are read and tags are nested the way BeautifulSoup's
+    html.parser builder does it: character references are decoded by the
+    same rules, a void tag is closed as soon as it opens (and swallows
+    its own end tag), an end tag closes everything up to the nearest open
+    tag of that name and stray end tags are ignored. Runs of
+    whitespace-only text collapse to a single newline or space, text
+    inside hidden tags is dropped while CDATA is kept, and text goes to
+    every open paragraph, so nested paragraphs are part of their parent's
+    text as well. Once the content div or the last paragraph it needs is
+    closed it raises StopParsing, so the rest of the page is never
+    tokenized.
+    """
+    def __init__(self, max_paragraphs=MAX_PARAGRAPHS):
+        super().__init__(convert_charrefs=False)
+        self.max_paragraphs = max_paragraphs
+        self.stack = []
+        self.hidden_depth = 0
+        self.preserve_depth = 0
+        self.closed_void_tags = []
+        self.content_depth = None
+        self.paragraphs = []
+        self.open_paragraphs = []
+        self.pending = []
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if tag in VOID_TAGS:
+            self.closed_void_tags.append(tag)
+            return
+        self.open_tag(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/> opens a void tag like any other, its end tag may close it
+        self.flush_text()
+        self.open_tag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def open_tag(self, tag, attrs):
+        """Push a tag, starting a paragraph if it is one that is needed"""
+        paragraph = None
+        if self.content_depth is None:
+            if tag == 'div' and dict(attrs).get('id') == CONTENT_ID:
+                self.content_depth = len(self.stack)
+        elif tag == 'p' and (self.max_paragraphs is None or len(self.paragraphs) < self.max_paragraphs):
+            paragraph = len(self.paragraphs)
+            self.open_paragraphs.append(paragraph)
+            self.paragraphs.append([])
+
+        self.stack.append((tag, paragraph))
+        self.hidden_depth += tag in HIDDEN_TEXT_TAGS
+        self.preserve_depth += tag in PRESERVE_WHITESPACE_TAGS
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void_tags:
+            # The end tag of a void tag that was closed when it opened
+            self.closed_void_tags.remove(tag)
+            return
+
+        self.flush_text()
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+
+        for name, paragraph in self.stack[depth:]:
+            if paragraph is not None:
+                self.open_paragraphs.remove(paragraph)
+            self.hidden_depth -= name in HIDDEN_TEXT_TAGS
+            self.preserve_depth -= name in PRESERVE_WHITESPACE_TAGS
+        del self.stack[depth:]
+
+        if self.content_depth is not None:
+            content_closed = len(self.stack) <= self.content_depth
+            have_all = self.max_paragraphs is not None and len(self.paragraphs) >= self.max_paragraphs
+            if content_closed or (have_all and not self.open_paragraphs):
+                raise StopParsing()
+
+    def handle_data(self, data):
+        if self.open_paragraphs:
+            self.pending.append(data)
+
+    def handle_charref(self, name):
+        # Code points below 256 are read as windows-1252, like BeautifulSoup does
+        code = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+        data = None
+        if code < 256:
+            try:
+                data = bytes([code]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        # Unknown entities are kept as text, without their semicolon
+        self.handle_data(EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, f'&{name}'))
+
+    def handle_comment(self, data):
+        self.flush_text()
+
+    def handle_decl(self, decl):
+        self.flush_text()
+
+    def handle_pi(self, data):
+        self.flush_text()
+
+    def unknown_decl(self, data):
+        self.flush_text()
+        if data.upper().startswith('CDATA['):
+            # CDATA is text, even inside hidden tags
+            self.handle_data(data[len('CDATA['):])
+            self.flush_text(hidden=False)
+
+    def flush_text(self, hidden=None):
+        """Add the text since the last tag to every open paragraph"""
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+
+        if self.hidden_depth if hidden is None else hidden:
+            return
+        if not self.preserve_depth and not text.translate(ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+        for paragraph in self.open_paragraphs:
+            self.paragraphs[paragraph].append(text)
+
+def extract_with_stream(html, max_paragraphs=MAX_PARAGRAPHS):
+    """Extract paragraphs by tokenizing the page only as far as needed"""
+    parser = ParagraphStream(max_paragraphs)
+    try:
+        parser.feed(html)
+        parser.close()
+        parser.flush_text()
+    except StopParsing:
+        pass
+
+    if parser.content_depth is None:
+        return []
+    return select_paragraphs(''.join(parts) for parts in parser.paragraphs)
+
+PARAGRAPH_EXTRACTORS = {
+    'html.parser': extract_with_html_parser,
+    'lxml': extract_with_lxml,
+    'stream': extract_with_stream
+}
+
+def available_extractors():
+    """Get the names of the paragraph extractors that can run here"""
+    return [name for name in PARAGRAPH_EXTRACTORS if name != 'lxml' or lxml_html is not None]
+
+def extract_article_paragraphs(html, max_paragraphs=MAX_PARAGRAPHS, backend=None):
+    """Extract the paragraphs of an article's HTML with the configured backend"""
+    backend = backend or os.getenv('SCRAPER_EXTRACTOR', 'stream')
+    if backend not in PARAGRAPH_EXTRACTORS:
+        raise ValueError(f"Unknown extractor: {backend}")
+    if backend == 'lxml' and lxml_html is None:
+        raise ValueError("The lxml extractor needs lxml, install it with: pip install lxml")
+    return PARAGRAPH_EXTRACTORS[backend](html, max_paragraphs)
+
+def generic_clues(city_name):
+    """Clues to fall back on when an article has too few"""
+    return [
+        f"This city is located in {city_name.split(',')[1].strip() if ',' in city_name else 'its country'}.",
+        "This destination is known for its unique culture and history.",
+        "Visitors come from around the world to experience this location.",
+        "This place has distinctive architecture and urban planning."
+    ]
+
+def generic_fun_facts(city_name):
+    """Fun facts to fall back on when an article has too few"""
+    return [
+        f"{city_name} has a rich history dating back many centuries.",
+        f"The local cuisine in {city_name} is renowned for its unique flavors.",
+        f"Tourism is one of the major industries in {city_name}.",
+        f"{city_name} experiences diverse weather patterns throughout the year."
+    ]
+
+def generic_trivia(city_name):
+    """Trivia to fall back on when an article has too few"""
+    return [
+        f"The name {city_name} has an interesting etymology in the local language.",
+        f"Local public transportation is a unique experience in {city_name}.",
+        f"The city has undergone significant changes in the past few decades.",
+        f"Many famous historical figures have visited or lived in {city_name}."
+    ]
+
+GENERIC_ITEMS = {
+    'clues': generic_clues,
+    'fun_facts': generic_fun_facts,
+    'trivia': generic_trivia
+}
+
+def classify_sentences(paragraphs, city_name, limit=ITEMS_PER_BUCKET):
+    """Sort the sentences of an article into clue, fun fact and trivia buckets.
+
+    Returns a dict with up to `limit` distinct sentences per bucket, in
+    the order they appear in the article.
+    """
+    city_lower = city_name.lower()
+    buckets = {'clues': [], 'fun_facts': [], 'trivia': []}
+    seen = {bucket: set() for bucket in buckets}
+    open_buckets = len(buckets)
+
+    def add(bucket, sentence):
+        nonlocal open_buckets
+        items = buckets[bucket]
+        if len(items) < limit and sentence not in seen[bucket]:
+            seen[bucket].add(sentence)
+            items.append(sentence)
+            if len(items) == limit:
+                open_buckets -= 1
+
+    for paragraph in paragraphs:
+        for sentence in paragraph.split('. '):
+            cleaned = sentence.strip().replace('\n', ' ')
+            length = len(cleaned)
+            if length <= MIN_FACT_LENGTH:
+                continue
+            if cleaned[-1] != '.':
+                cleaned += '.'
+
+            lowered = sentence.lower()
+
+            # Skip clues that directly mention the city name (too obvious)
+            if length > MIN_CLUE_LENGTH and city_lower not in lowered:
+                add('clues', cleaned)
+            if FUN_FACT_PATTERN.search(lowered):
+                add('fun_facts', cleaned)
+            if TRIVIA_PATTERN.search(lowered):
+                add('trivia', cleaned)
+
+            if not open_buckets:
+                return buckets
+
+    return buckets
+
+def fill_bucket(items, generic, limit=ITEMS_PER_BUCKET):
+    """Top up a bucket with random generic items it does not have yet"""
+    selected = list(items)
+    seen = set(selected)
+    while len(selected) < limit:
+        item = random.choice(generic)
+        if item not in seen:
+            seen.add(item)
+            selected.append(item)
+    return selected
+
+def extract_items(paragraphs, city_name, limit=ITEMS_PER_BUCKET):
+    """Get `limit` clues, fun facts and trivia for a city from its paragraphs"""
+    buckets = classify_sentences(paragraphs, city_name, limit)
+    return {
+        bucket: fill_bucket(items, GENERIC_ITEMS[bucket](city_name), limit)
+        for bucket, items in buckets.items()
+    }
@@ -0,0 +1,209 @@
+# scripts/fetcher.py
+"""
+Concurrent, rate-limited page fetcher for the dataset scripts.
+
+Pages are fetched on an asyncio event loop through one keep-alive HTTP
+client. At most `concurrency` requests are in flight at once, and each
+host gets its own token bucket so a long list of pages on the same site
+never goes faster than `rate_per_host` requests per second. Connection
+errors, timeouts, 429 and 5xx responses are retried with exponential
+backoff and jitter, honouring Retry-After when the server sends one.
+
+With an `HttpCache` pages are revalidated with conditional requests
+instead of downloaded again, served straight from disk in offline mode,
+and a cached copy stands in when the network fails.
+
+Usage:
+    async with AsyncFetcher(concurrency=8, rate_per_host=2) as fetcher:
+        html = await fetcher.fetch(url)
+        pages = await fetcher.fetch_all(urls)
+"""
+
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+import httpx
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Responses worth asking for again, everything else is final
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second with bursts of up to `capacity`"""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if not self.rate or self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncFetcher:
+    """Fetch pages concurrently with per-host rate limits and retries"""
+    def __init__(self, concurrency=4, rate_per_host=2.0, burst=1, timeout=15.0,
+                 retries=3, backoff=0.5, max_backoff=30.0, headers=None, cache=None):
+        self.concurrency = max(1, concurrency)
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = {'User-Agent': USER_AGENT, **(headers or {})}
+        self.cache = cache if cache and cache.enabled else None
+
+        self._client = None
+        self._semaphore = None
+        self._buckets = {}
+
+        self.stats = {
+            'requests': 0,
+            'fetched': 0,
+            'retries': 0,
+            'failed': 0,
+            'bytes': 0,
+            'cache_hits': 0,
+            'revalidated': 0,
+            'stale': 0
+        }
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """Create the shared keep-alive client"""
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency
+            )
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=limits,
+                follow_redirects=True
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        """Close the client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _bucket_for(self, url):
+        """Get the token bucket of a URL's host"""
+        host = urlsplit(url).netloc.lower()
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(self.max_backoff, float(retry_after))
+
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def request(self, url, headers=None):
+        """Send a GET request with retries and return the final response.
+
+        Returns None if the page could not be fetched.
+        """
+        await self.open()
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                await self._bucket_for(url).acquire()
+                self.stats['requests'] += 1
+                try:
+                    response = await self._client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    if attempt < self.retries:
+                        self.stats['retries'] += 1
+                        await asyncio.sleep(self._retry_delay(attempt))
+                        continue
+                    print(f"Error fetching {url}: {e!r}")
+                    self.stats['failed'] += 1
+                    return None
+
+                if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self._retry_delay(attempt, response))
+                    continue
+
+                return response
+
+    async def fetch(self, url):
+        """Fetch a page and return its text, or None on failure"""
+        entry = self.cache.get(url) if self.cache else None
+        if self.cache and (self.cache.offline or self.cache.is_fresh(entry)):
+            if entry:
+                self.stats['cache_hits'] += 1
+                return self.cache.read_text(entry)
+            print(f"Not in the offline cache: {url}")
+            self.stats['failed'] += 1
+            return None
+
+        headers = self.cache.conditional_headers(entry) if entry else None
+        response = await self.request(url, headers=headers)
+
+        if response is None or response.status_code >= 500:
+            if entry:
+                # A stale page is better than none when the site is down
+                self.stats['stale'] += 1
+                return self.cache.read_text(entry)
+        if response is None:
+            return None
+
+        if response.status_code == 304 and entry:
+            self.cache.touch(
+                url,
+                entry,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+            self.stats['revalidated'] += 1
+            return self.cache.read_text(entry)
+
+        if response.status_code >= 400:
+            print(f"Error fetching {url}: HTTP {response.status_code}")
+            self.stats['failed'] += 1
+            return None
+
+        self.stats['fetched'] += 1
+        self.stats['bytes'] += len(response.content)
+        if self.cache:
+            self.cache.store(
+                url,
+                response.content,
+                response.encoding,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+        return response.text
+
+    async def fetch_all(self, urls):
+        """Fetch several pages concurrently, returning texts in the order of `urls`"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
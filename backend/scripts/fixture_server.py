@@ -0,0 +1,188 @@
+# scripts/fixture_server.py
+"""
+Local stand-in for Wikipedia that serves generated fixture pages.
+
+Every /wiki/<City> path returns an article shaped like a Wikipedia page,
+and the two list pages the scraper reads return tables of the fixture
+cities. Responses can be slowed down and made to fail now and then, so
+the fetcher's concurrency, rate limiting and retries can be exercised
+without touching the network. Pages carry an ETag and Last-Modified and
+conditional requests for an unchanged page are answered with 304.
+
+Usage:
+    python scripts/fixture_server.py [--port 8765] [--latency 0.05] [--failure-rate 0.1]
+
+Then run the scraper against it:
+    SCRAPER_WIKI_BASE_URL=http://127.0.0.1:8765/wiki/ python scripts/web_scraper.py
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+FIXTURE_CITIES = [
+    ('Lisbon', 'Portugal'), ('Kyoto', 'Japan'), ('Cusco', 'Peru'), ('Hanoi', 'Vietnam'),
+    ('Seville', 'Spain'), ('Krakow', 'Poland'), ('Nairobi', 'Kenya'), ('Quebec City', 'Canada'),
+    ('Tbilisi', 'Georgia'), ('Valparaiso', 'Chile'), ('Zanzibar City', 'Tanzania'), ('Bruges', 'Belgium'),
+    ('Hobart', 'Australia'), ('Oaxaca', 'Mexico'), ('Luang Prabang', 'Laos'), ('Tallinn', 'Estonia')
+]
+
+PARAGRAPHS = [
+    "{city} is the capital and largest city of its region, with a population of over one million people in the wider metropolitan area. It sits on a natural harbour that shaped its growth.",
+    "The old town was founded more than a thousand years ago. It is famous for its narrow streets, tiled facades and one of the oldest markets in the country, which still opens every morning.",
+    "Each summer the city hosts an annual festival of music and light. The celebration draws visitors from around the world and is known for its night parade along the river.",
+    "The local cuisine is popular across the country. A unique tradition of shared tables in the old quarter is an event every visitor is encouraged to join.",
+    "Trams climb the steep hills between the neighbourhoods. The first line opened in the nineteenth century and remains the most photographed route in the city."
+]
+
+def article_html(city, paragraphs=8):
+    """Build a Wikipedia-like article for a city"""
+    body = []
+    for index in range(paragraphs):
+        text = PARAGRAPHS[index % len(PARAGRAPHS)].format(city=city)
+        body.append(f"<p>{text} <a href=\"/wiki/Note_{index}\">[{index + 1}]</a></p>")
+        if index == 1:
+            # Short paragraphs like coordinates are skipped by the extractor
+            body.append("<p>Coordinates: 1°N 2°E</p>")
+
+    return (
+        "<!DOCTYPE html><html><head><title>" + city + " - Wikipedia</title></head><body>"
+        "<div id=\"mw-navigation\"><p>Main menu and navigation links for the encyclopedia.</p></div>"
+        "<div id=\"content\"><h1>" + city + "</h1>"
+        "<div id=\"mw-content-text\"><div class=\"mw-parser-output\">"
+        "<table class=\"infobox\"><tr><th>Country</th><td>Fixture</td></tr></table>"
+        + "".join(body) +
+        "</div></div></div></body></html>"
+    )
+
+def list_html(cities, with_rank=True):
+    """Build a Wikipedia-like list page of cities"""
+    rows = []
+    for rank, (city, country) in enumerate(cities, 1):
+        if with_rank:
+            rows.append(f"<tr><td>{rank}</td><td><a href=\"/wiki/{city}\">{city}</a></td><td><a href=\"/wiki/{country}\">{country}</a></td></tr>")
+        else:
+            rows.append(f"<tr><td>{rank}</td><td>{city}, {country}</td></tr>")
+
+    return (
+        "<html><body><div id=\"mw-content-text\"><table class=\"wikitable\">"
+        "<tr><th>Rank</th><th>City</th><th>Country</th></tr>"
+        + "".join(rows) +
+        "</table></div></body></html>"
+    )
+
+# Fixture pages never change
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+class FixtureServer:
+    """Serve fixture pages from a background thread"""
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, cities=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.cities = cities or FIXTURE_CITIES
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/wiki/"
+
+    def page(self, path):
+        """Get the HTML of a path, or None if there is no such page"""
+        if not path.startswith('/wiki/'):
+            return None
+
+        name = unquote(path[len('/wiki/'):]).replace('_', ' ')
+        if name == 'List of cities proper by population':
+            return list_html(self.cities)
+        if name == 'List of most visited cities':
+            return list_html(self.cities, with_rank=False)
+        return article_html(name)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server.failure_rate and random.random() < server.failure_rate:
+                    self._send(503, b'Service Unavailable', {'Retry-After': '0'})
+                    return
+
+                html = server.page(self.path.split('?')[0])
+                if html is None:
+                    self._send(404, b'Not Found')
+                    return
+                body = html.encode('utf-8')
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                validators = {'ETag': etag, 'Last-Modified': LAST_MODIFIED}
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b'', validators)
+                    return
+                self._send(200, body, validators)
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    """Serve fixture pages until interrupted"""
+    parser = argparse.ArgumentParser(description='Serve Wikipedia-like fixture pages')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before every response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with 503')
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency=args.latency, failure_rate=args.failure_rate)
+    print(f"Serving fixture pages at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# scripts/http_cache.py
+"""
+Content-addressed on-disk cache of HTTP responses for the dataset scripts.
+
+Bodies are stored once per SHA-256 of their content under `bodies/`, and
+every URL has a small JSON entry under `entries/` pointing at its body
+together with the ETag and Last-Modified validators the server sent. A
+page that did not change costs one conditional request answered with
+304, and identical pages share one body on disk. Files are written to a
+temporary name and renamed into place, so an interrupted run never
+leaves a torn entry behind.
+
+Modes:
+    revalidate  serve cached pages after a conditional request (default)
+    offline     serve only from the cache, never touch the network
+    off         do not read or write the cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_MODES = ('revalidate', 'offline', 'off')
+
+def fsync_directory(directory):
+    """Flush a directory entry, so a rename or removal in it survives power loss"""
+    # Windows cannot open directories, and its renames need no separate flush
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write(path, data, durable=False):
+    """Write bytes to a file so readers see either the old or the new content.
+
+    With `durable` the content and the rename are flushed to disk before
+    returning, so the new file also survives a power loss. Cache entries
+    can be fetched again and skip that cost.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        if durable:
+            fsync_directory(directory)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class HttpCache:
+    """Cache response bodies on disk and revalidate them with conditional requests"""
+    def __init__(self, directory, mode='revalidate', max_age=0):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        # Entries checked less than max_age seconds ago are served without a request
+        self.max_age = max_age
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    @property
+    def offline(self):
+        return self.mode == 'offline'
+
+    def _entry_path(self, url):
+        """Get the path of a URL's entry"""
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, 'entries', digest[:2], f"{digest}.json")
+
+    def _body_path(self, digest):
+        """Get the path of a body by its content hash"""
+        return os.path.join(self.directory, 'bodies', digest[:2], digest)
+
+    def get(self, url):
+        """Get the cache entry of a URL, or None if it is not cached"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._entry_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # An entry is only usable while its body is still there
+        if not os.path.exists(self._body_path(entry['body'])):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """Check if an entry can be served without revalidating it"""
+        return bool(entry and self.max_age and time.time() - entry['checked_at'] < self.max_age)
+
+    def conditional_headers(self, entry):
+        """Get the headers that revalidate an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read_text(self, entry):
+        """Get the decoded body of an entry"""
+        with open(self._body_path(entry['body']), 'rb') as f:
+            return f.read().decode(entry.get('encoding') or 'utf-8', errors='replace')
+
+    def store(self, url, content, encoding=None, etag=None, last_modified=None):
+        """Store a response body and its validators for a URL"""
+        if not self.enabled:
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            atomic_write(body_path, content)
+
+        now = time.time()
+        entry = {
+            'url': url,
+            'body': digest,
+            'size': len(content),
+            'encoding': encoding,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'checked_at': now
+        }
+        self._write_entry(url, entry)
+        return entry
+
+    def touch(self, url, entry, etag=None, last_modified=None):
+        """Record that an entry was revalidated, keeping any new validators"""
+        entry = dict(entry)
+        entry['etag'] = etag or entry.get('etag')
+        entry['last_modified'] = last_modified or entry.get('last_modified')
+        entry['checked_at'] = time.time()
+        self._write_entry(url, entry)
+        return entry
+
+    def _write_entry(self, url, entry):
+        """Write an entry atomically"""
+        atomic_write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
@@ -1,7 +1,6 @@
 # scripts/import_expanded_dataset.py
 import os
 import sys
-import json
 from dotenv import load_dotenv
 from pymongo import MongoClient
 
@@ -9,10 +8,58 @@ from pymongo import MongoClient
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.destination import Destination
-from utils.helpers import load_json_file
+from services.dataset_import import DatasetImporter
+
+SAMPLE_SIZE = 10
+
+def print_plan(plan):
+    """Print what applying an import plan would change"""
+    print(f"Planned {plan['records']} records:")
+    print(f"  {len(plan['inserts'])} new destinations to insert")
+    print(f"  {len(plan['updates'])} existing destinations to update")
+    print(f"  {plan['unchanged']} already up to date")
+    print(f"  {plan['duplicates']} duplicates of earlier records")
+    print(f"  {plan['rejected']} rejected")
+    
+    if plan['alias_matches']:
+        print(f"Matched {plan['aliases']} records to destinations stored under another name, e.g.:")
+        for incoming, existing in plan['alias_matches'][:SAMPLE_SIZE]:
+            print(f"  {incoming} -> {existing}")
+    if plan['rejected_records']:
+        print("Rejected records, e.g.:")
+        for rejected in plan['rejected_records'][:SAMPLE_SIZE]:
+            print(f"  #{rejected['record']}: {rejected['error']}")
+
+def print_report(report):
+    """Print what importing a dataset file did or would do"""
+    if report['status'] == 'unchanged':
+        print(f"{report['file']} is unchanged since catalog version {report['catalog_version']}, skipped.")
+        return
+    
+    print(f"{report['file']}: {report['changed_records']} of {report['records']} records are new or changed since the last import.")
+    if report['superseded_records']:
+        print(f"  {report['superseded_records']} previously imported records were changed or removed (stored destinations are kept).")
+    if report['plan']:
+        print_plan(report['plan'])
+    if report['applied']:
+        applied = report['applied']
+        print(f"Successfully imported {applied['inserted']} new destinations and updated {applied['updated']}.")
+        if applied['errors']:
+            print(f"⚠️ {applied['errors']} writes failed, the file will be imported again next time.")
 
 def main():
-    """Import the expanded dataset into MongoDB"""
+    """Import the starter and expanded datasets into MongoDB.
+    
+    Files and records unchanged since their last import are skipped. Pass
+    --dry-run to only report what would change, --overwrite to replace
+    stored fields that differ instead of only filling missing ones and
+    --force to plan every record again. Records edited since their file
+    was last imported always replace the stored fields.
+    """
+    dry_run = '--dry-run' in sys.argv[1:]
+    overwrite = '--overwrite' in sys.argv[1:]
+    force = '--force' in sys.argv[1:]
+    
     # Load environment variables
     load_dotenv()
     
@@ -23,53 +70,38 @@ def main():
     
     # Initialize destination model
     destination_model = Destination(db)
+    importer = DatasetImporter(db, overwrite=overwrite)
     
     # Check current count
     current_count = destination_model.count_destinations()
     print(f"Current destination count: {current_count}")
     
-    # Check if starter dataset file exists
     data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
     starter_file = os.path.join(data_dir, 'starter_dataset.json')
     expanded_file = os.path.join(data_dir, 'expanded_dataset.json')
     
-    # Import starter dataset if it hasn't been imported yet
-    if current_count == 0 and os.path.exists(starter_file):
-        starter_data = load_json_file(starter_file)
-        if starter_data:
-            starter_count = destination_model.import_destinations(starter_data)
-            print(f"Imported {starter_count} destinations from starter dataset")
-            current_count = destination_model.count_destinations()
+    # The starter dataset goes first so its spellings win
+    if os.path.exists(starter_file):
+        report = importer.import_file(starter_file, force=force, dry_run=dry_run)
+        if 'error' in report:
+            print(f"Failed to import starter dataset: {report['error']}")
+        else:
+            print_report(report)
     
     # Check if we have the expanded dataset
     if not os.path.exists(expanded_file):
         print("Expanded dataset file not found. Please run the web_scraper.py script first.")
         return
     
-    # Load expanded dataset
-    expanded_data = load_json_file(expanded_file)
-    if not expanded_data:
-        print("Failed to load expanded dataset.")
+    report = importer.import_file(expanded_file, force=force, dry_run=dry_run)
+    if 'error' in report:
+        print(f"Failed to import expanded dataset: {report['error']}")
         return
+    print_report(report)
     
-    print(f"Loaded {len(expanded_data)} destinations from expanded dataset.")
-    
-    # Filter out destinations that might already be in the database (checking by city name)
-    existing_cities = []
-    for dest in destination_model.get_all_destinations():
-        if 'city' in dest:
-            existing_cities.append(dest['city'])
-    
-    new_data = [dest for dest in expanded_data if dest['city'] not in existing_cities]
-    
-    print(f"Found {len(new_data)} new destinations to import.")
-    
-    if new_data:
-        # Import new destinations
-        import_count = destination_model.import_destinations(new_data)
-        print(f"Successfully imported {import_count} new destinations.")
-    else:
-        print("No new destinations to import.")
+    if dry_run:
+        print("Dry run, nothing was written.")
+        return
     
     # Get final count
     final_count = destination_model.count_destinations()
@@ -82,4 +114,4 @@ def main():
         print("Run the web_scraper.py script again to gather more destinations.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
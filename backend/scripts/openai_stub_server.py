@@ -0,0 +1,154 @@
+# scripts/openai_stub_server.py
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers POST /v1/chat/completions like the real API, with a fenced JSON
+array of made-up destinations in the message content. The number of
+destinations and the continent are read from the request, and the
+city names are derived from the request so different requests generate
+different cities. Responses can be slowed down and a share of the
+generated destinations can be made invalid, so the expansion's
+concurrency, caching and validation can be exercised offline.
+
+Usage:
+    python scripts/openai_stub_server.py [--port 8766] [--latency 0.5] [--invalid-rate 0.1]
+
+Then point the client at it with base_url http://127.0.0.1:8766/v1 and
+any API key.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def generate_destinations(prompt, invalid_rate=0.0):
+    """Make up the destinations a prompt asks for"""
+    count_match = re.search(r'generate (\d+)', prompt)
+    continent_match = re.search(r' in ([A-Z][A-Za-z ]+)\.', prompt)
+    count = int(count_match.group(1)) if count_match else 3
+    continent = continent_match.group(1) if continent_match else 'Europe'
+
+    seed = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+    destinations = []
+    for index in range(count):
+        city = f"Stubville {seed}-{index}"
+        destination = {
+            'city': city,
+            'country': f"{continent} Stubland",
+            'continent': continent,
+            'clues': [f"This city is number {index} of its batch.", "It only exists on a local test server."],
+            'fun_facts': [f"{city} was generated in under a second.", "Its population is entirely synthetic."],
+            'trivia': ["It has never appeared on a real map.", "Its annual festival celebrates fast tests."],
+            'image_url': None
+        }
+        if invalid_rate and random.random() < invalid_rate:
+            del destination['country']
+        destinations.append(destination)
+    return destinations
+
+class OpenAIStubServer:
+    """Serve fake chat completions from a background thread"""
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, invalid_rate=0.0):
+        self.latency = latency
+        self.invalid_rate = invalid_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def complete(self, body):
+        """Build a chat completion for a request body"""
+        prompt = body['messages'][-1]['content']
+        content = json.dumps(generate_destinations(prompt, self.invalid_rate), indent=2)
+        return {
+            'id': f"chatcmpl-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': f"```json\n{content}\n```"},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4, 'total_tokens': (len(prompt) + len(content)) // 4}
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                with server._lock:
+                    server.requests += 1
+
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path.rstrip('/') != '/v1/chat/completions':
+                    self._send(404, {'error': {'message': 'Not found'}})
+                    return
+
+                if server.latency:
+                    time.sleep(server.latency)
+                self._send(200, server.complete(body))
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='openai-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    """Serve fake chat completions until interrupted"""
+    parser = argparse.ArgumentParser(description='Serve fake OpenAI chat completions')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before every response')
+    parser.add_argument('--invalid-rate', type=float, default=0.0, help='share of generated destinations missing their country')
+    args = parser.parse_args()
+
+    server = OpenAIStubServer(port=args.port, latency=args.latency, invalid_rate=args.invalid_rate)
+    print(f"Serving chat completions at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,53 @@
 # scripts/web_scraper.py
+import asyncio
 import json
+import multiprocessing
 import os
-import random
-import requests
-from bs4 import BeautifulSoup
+import queue
+import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
 from urllib.parse import quote
+from build_journal import BuildJournal
+from extraction import extract_article_paragraphs, extract_items
+from fetcher import AsyncFetcher
+from http_cache import HttpCache
+
+# Pages are fetched from here, point it at a local server to test offline
+WIKI_BASE_URL = os.getenv('SCRAPER_WIKI_BASE_URL', 'https://en.wikipedia.org/wiki/')
+
+# Fetched pages are kept here and revalidated on the next run
+CACHE_DIR = os.getenv(
+    'SCRAPER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cache', 'http')
+)
+
+def create_fetcher():
+    """Create a page fetcher with the limits from the environment"""
+    return AsyncFetcher(
+        concurrency=int(os.getenv('SCRAPER_CONCURRENCY', 4)),
+        rate_per_host=float(os.getenv('SCRAPER_RATE_PER_HOST', 2)),
+        timeout=float(os.getenv('SCRAPER_TIMEOUT', 15)),
+        retries=int(os.getenv('SCRAPER_RETRIES', 3)),
+        cache=HttpCache(
+            CACHE_DIR,
+            mode=os.getenv('SCRAPER_CACHE_MODE', 'revalidate'),
+            max_age=float(os.getenv('SCRAPER_CACHE_MAX_AGE', 0))
+        )
+    )
 
 def fetch_page(url):
     """Fetch a web page and return the soup"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, 'html.parser')
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
+    async def fetch():
+        async with create_fetcher() as fetcher:
+            return await fetcher.fetch(url)
+
+    html = asyncio.run(fetch())
+    if html is None:
         return None
+    return BeautifulSoup(html, 'html.parser')
 
 def get_continent_by_country(country):
     """Get continent based on country"""
@@ -81,144 +110,9 @@ def get_continent_by_country(country):
     
     return continent_mapping.get(country, "Unknown")
 
-def extract_paragraphs(soup, max_paragraphs=5):
-    """Extract paragraphs from the page content"""
-    content_div = soup.find('div', {'id': 'mw-content-text'})
-    if not content_div:
-        return []
-    
-    paragraphs = content_div.find_all('p')
-    text_paragraphs = []
-    
-    for p in paragraphs[:max_paragraphs]:
-        text = p.get_text().strip()
-        if text and len(text) > 50:  # Skip short or empty paragraphs
-            text_paragraphs.append(text)
-    
-    return text_paragraphs
-
-def generate_clues(paragraphs, city_name):
-    """Generate clues based on the extracted paragraphs"""
-    clues = []
-    
-    # Try to find interesting facts for clues
-    for paragraph in paragraphs:
-        sentences = paragraph.split('. ')
-        for sentence in sentences:
-            # Skip sentences that directly mention the city name (too obvious)
-            if city_name.lower() not in sentence.lower() and len(sentence) > 30:
-                # Clean the sentence
-                cleaned = sentence.strip().replace('\n', ' ')
-                if cleaned and len(cleaned) > 30 and cleaned[-1] != '.':
-                    cleaned += '.'
-                
-                if cleaned and len(cleaned) > 30:
-                    clues.append(cleaned)
-    
-    # Select up to 3 clues
-    selected_clues = []
-    for clue in clues:
-        if len(selected_clues) >= 3:
-            break
-        if clue not in selected_clues:
-            selected_clues.append(clue)
-    
-    # If we don't have enough clues, generate some generic ones
-    generic_clues = [
-        f"This city is located in {city_name.split(',')[1].strip() if ',' in city_name else 'its country'}.",
-        "This destination is known for its unique culture and history.",
-        "Visitors come from around the world to experience this location.",
-        "This place has distinctive architecture and urban planning."
-    ]
-    
-    while len(selected_clues) < 3:
-        clue = random.choice(generic_clues)
-        if clue not in selected_clues:
-            selected_clues.append(clue)
-    
-    return selected_clues
-
-def generate_fun_facts(paragraphs, city_name):
-    """Generate fun facts based on the extracted paragraphs"""
-    facts = []
-    
-    # Extract statistics and interesting information
-    for paragraph in paragraphs:
-        sentences = paragraph.split('. ')
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in ['largest', 'oldest', 'first', 'famous', 'popular', 'unique', 'founded']):
-                cleaned = sentence.strip().replace('\n', ' ')
-                if cleaned and len(cleaned) > 20 and cleaned[-1] != '.':
-                    cleaned += '.'
-                
-                if cleaned and len(cleaned) > 20:
-                    facts.append(cleaned)
-    
-    # Select up to 3 fun facts
-    selected_facts = []
-    for fact in facts:
-        if len(selected_facts) >= 3:
-            break
-        if fact not in selected_facts:
-            selected_facts.append(fact)
-    
-    # If we don't have enough facts, generate some generic ones
-    generic_facts = [
-        f"{city_name} has a rich history dating back many centuries.",
-        f"The local cuisine in {city_name} is renowned for its unique flavors.",
-        f"Tourism is one of the major industries in {city_name}.",
-        f"{city_name} experiences diverse weather patterns throughout the year."
-    ]
-    
-    while len(selected_facts) < 3:
-        fact = random.choice(generic_facts)
-        if fact not in selected_facts:
-            selected_facts.append(fact)
-    
-    return selected_facts
-
-def generate_trivia(paragraphs, city_name):
-    """Generate trivia based on the extracted paragraphs"""
-    trivia = []
-    
-    # Look for trivia information
-    for paragraph in paragraphs:
-        sentences = paragraph.split('. ')
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in ['tradition', 'annual', 'celebration', 'festival', 'event', 'known for', 'population']):
-                cleaned = sentence.strip().replace('\n', ' ')
-                if cleaned and len(cleaned) > 20 and cleaned[-1] != '.':
-                    cleaned += '.'
-                
-                if cleaned and len(cleaned) > 20:
-                    trivia.append(cleaned)
-    
-    # Select up to 3 trivia items
-    selected_trivia = []
-    for item in trivia:
-        if len(selected_trivia) >= 3:
-            break
-        if item not in selected_trivia:
-            selected_trivia.append(item)
-    
-    # If we don't have enough trivia, generate some generic ones
-    generic_trivia = [
-        f"The name {city_name} has an interesting etymology in the local language.",
-        f"Local public transportation is a unique experience in {city_name}.",
-        f"The city has undergone significant changes in the past few decades.",
-        f"Many famous historical figures have visited or lived in {city_name}."
-    ]
-    
-    while len(selected_trivia) < 3:
-        item = random.choice(generic_trivia)
-        if item not in selected_trivia:
-            selected_trivia.append(item)
-    
-    return selected_trivia
-
 def scrape_popular_cities():
     """Scrape a list of popular cities from Wikipedia"""
-    wiki_url = "https://en.wikipedia.org/wiki/List_of_cities_proper_by_population"
+    wiki_url = f"{WIKI_BASE_URL}List_of_cities_proper_by_population"
     soup = fetch_page(wiki_url)
     
     if not soup:
@@ -251,7 +145,7 @@ def scrape_popular_cities():
 
 def scrape_tourist_destinations():
     """Scrape a list of tourist destinations"""
-    wiki_url = "https://en.wikipedia.org/wiki/List_of_most_visited_cities"
+    wiki_url = f"{WIKI_BASE_URL}List_of_most_visited_cities"
     soup = fetch_page(wiki_url)
     
     if not soup:
@@ -282,26 +176,182 @@ def scrape_tourist_destinations():
     
     return cities
 
-def main():
-    """Main function to run the scraper"""
-    print("Starting web scraper to build destination dataset...")
+def city_url(city):
+    """Get the Wikipedia URL of a city"""
+    return f"{WIKI_BASE_URL}{quote(city.replace(' ', '_'))}"
+
+def build_destination(city, country, html):
+    """Build a destination from a city's page, or None if it has no content"""
+    # Extract paragraphs
+    paragraphs = extract_article_paragraphs(html)
+    if not paragraphs:
+        print(f"No paragraphs found for {city}. Skipping.")
+        return None
     
-    # Set up paths
-    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
-    output_file = os.path.join(data_dir, 'expanded_dataset.json')
+    # Get continent
+    continent = get_continent_by_country(country)
     
-    # Create data directory if it doesn't exist
-    os.makedirs(data_dir, exist_ok=True)
+    # Generate clues, fun facts, and trivia in one pass over the sentences
+    items = extract_items(paragraphs, city)
     
-    # Load existing dataset if it exists
-    try:
-        with open(output_file, 'r', encoding='utf-8') as f:
-            existing_data = json.load(f)
-            print(f"Loaded {len(existing_data)} existing destinations.")
-    except (FileNotFoundError, json.JSONDecodeError):
-        existing_data = []
-        print("No existing dataset found. Creating a new one.")
+    # Create destination data
+    return {
+        "city": city,
+        "country": country,
+        "continent": continent,
+        "clues": items['clues'],
+        "fun_facts": items['fun_facts'],
+        "trivia": items['trivia']
+    }
+
+def parse_page(city, country, html):
+    """Build a destination in a worker process and time it.
     
+    Returns (destination, seconds, error).
+    """
+    started = time.perf_counter()
+    try:
+        destination = build_destination(city, country, html)
+    except Exception as e:
+        return None, time.perf_counter() - started, repr(e)
+    return destination, time.perf_counter() - started, None
+
+class StageTimings:
+    """Items handled and seconds spent in each stage of a scrape"""
+    def __init__(self, stages):
+        self.stages = {stage: {'items': 0, 'busy': 0.0, 'blocked': 0.0} for stage in stages}
+        self.started = time.perf_counter()
+    
+    def add(self, stage, busy, blocked=0.0):
+        """Record one item handled by a stage"""
+        self.stages[stage]['items'] += 1
+        self.stages[stage]['busy'] += busy
+        self.stages[stage]['blocked'] += blocked
+    
+    def report(self):
+        """Print the timings of every stage"""
+        elapsed = time.perf_counter() - self.started
+        print(f"\nFinished in {elapsed:.2f}s")
+        print(f"{'stage':<8} {'items':>6} {'busy s':>8} {'ms/item':>8} {'blocked s':>10}")
+        for stage, timing in self.stages.items():
+            per_item = timing['busy'] / timing['items'] * 1000 if timing['items'] else 0.0
+            print(f"{stage:<8} {timing['items']:>6} {timing['busy']:>8.2f} {per_item:>8.1f} {timing['blocked']:>10.2f}")
+
+async def scrape_cities(cities, journal=None, on_destination=None):
+    """Fetch the pages of several cities and build their destinations in a pipeline.
+    
+    The stages run side by side and are connected by bounded queues:
+    fetch workers download pages on the event loop, parse workers hand
+    each page to a process pool so parsing uses every core and never
+    holds up the downloads, and a single writer appends every finished
+    city to the journal. When a queue is full the stage feeding it
+    waits, so at most a few pages are held in memory. Busy time and the
+    time each stage spent blocked on a full queue are printed at the end.
+    The destinations keep the order of `cities`. The writer also hands
+    every destination to `on_destination` as soon as it is built.
+    """
+    loop = asyncio.get_running_loop()
+    fetcher = create_fetcher()
+    parse_workers = int(os.getenv('SCRAPER_PARSE_WORKERS', 0)) or os.cpu_count() or 1
+    queue_size = int(os.getenv('SCRAPER_QUEUE_SIZE', 0)) or 2 * max(fetcher.concurrency, parse_workers)
+    
+    todo = iter(range(len(cities)))
+    pages = asyncio.Queue(maxsize=queue_size)
+    parsed = asyncio.Queue(maxsize=queue_size)
+    destinations = [None] * len(cities)
+    timings = StageTimings(['fetch', 'parse', 'write'])
+    
+    async def fetch_worker():
+        for index in todo:
+            started = time.perf_counter()
+            html = await fetcher.fetch(city_url(cities[index][0]))
+            fetched = time.perf_counter()
+            await pages.put((index, html))
+            timings.add('fetch', fetched - started, time.perf_counter() - fetched)
+    
+    async def parse_worker(pool):
+        while (item := await pages.get()) is not None:
+            index, html = item
+            city, country = cities[index]
+            destination, seconds, failure = None, 0.0, f"Could not fetch page for {city}. Skipping."
+            if html is not None:
+                destination, seconds, error = await loop.run_in_executor(pool, parse_page, city, country, html)
+                failure = f"Error parsing page for {city}: {error}" if error else None
+            
+            queued = time.perf_counter()
+            await parsed.put((index, destination, failure))
+            timings.add('parse', seconds, time.perf_counter() - queued)
+    
+    async def writer():
+        done = 0
+        while (item := await parsed.get()) is not None:
+            index, destination, failure = item
+            city, country = cities[index]
+            done += 1
+            print(f"Processing {done}/{len(cities)}: {city}, {country}")
+            
+            started = time.perf_counter()
+            if failure:
+                print(failure)
+            else:
+                destinations[index] = destination
+                if journal:
+                    journal.append(city, destination, reason='no paragraphs')
+                if destination and on_destination:
+                    on_destination(destination)
+            timings.add('write', time.perf_counter() - started)
+    
+    # Parse workers are spawned rather than forked: scrape_destinations runs
+    # this on a background thread and its callers hold MongoDB clients, and
+    # neither threads nor clients survive a fork
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        async with fetcher:
+            write_task = asyncio.create_task(writer())
+            parse_tasks = [asyncio.create_task(parse_worker(pool)) for _ in range(parse_workers)]
+            await asyncio.gather(*(fetch_worker() for _ in range(fetcher.concurrency)))
+            
+            # Stop the parse workers once every page is queued, then the writer
+            for _ in parse_tasks:
+                await pages.put(None)
+            await asyncio.gather(*parse_tasks)
+            await parsed.put(None)
+            await write_task
+    
+    timings.report()
+    return [destination for destination in destinations if destination]
+
+def scrape_destinations(cities, journal=None):
+    """Scrape cities and yield each destination as soon as it is built.
+    
+    The scrape runs on its own event loop in a background thread, so the
+    caller can do blocking work, such as writing to the database, with
+    every destination while the next pages are being fetched. Errors of
+    the scrape are raised once the destinations built before them are
+    yielded.
+    """
+    built = queue.Queue()
+    finished = object()
+    errors = []
+    
+    def run():
+        try:
+            asyncio.run(scrape_cities(cities, journal, on_destination=built.put))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            built.put(finished)
+    
+    # A daemon thread, so an interrupted caller does not wait for the scrape
+    thread = threading.Thread(target=run, name='scraper', daemon=True)
+    thread.start()
+    while (destination := built.get()) is not finished:
+        yield destination
+    thread.join()
+    if errors:
+        raise errors[0]
+
+def plan_cities(existing_data):
+    """Gather the cities a build should scrape"""
     # Get cities we've already processed
     existing_cities = {item['city'] for item in existing_data}
     
@@ -360,60 +410,94 @@ def main():
         print(f"Limiting to {max_cities} cities to avoid overloading servers.")
         cities_to_scrape = cities_to_scrape[:max_cities]
     
-    new_destinations = []
-    
-    # Scrape data for each city
-    for i, (city, country) in enumerate(cities_to_scrape):
-        print(f"Processing {i+1}/{len(cities_to_scrape)}: {city}, {country}")
-        
-        # Format Wikipedia URL
-        safe_city = quote(city.replace(' ', '_'))
-        wiki_url = f"https://en.wikipedia.org/wiki/{safe_city}"
-        
-        soup = fetch_page(wiki_url)
-        if not soup:
-            print(f"Could not fetch page for {city}. Skipping.")
-            continue
-        
-        # Extract paragraphs
-        paragraphs = extract_paragraphs(soup)
-        if not paragraphs:
-            print(f"No paragraphs found for {city}. Skipping.")
-            continue
-        
-        # Get continent
-        continent = get_continent_by_country(country)
-        
-        # Generate clues, fun facts, and trivia
-        clues = generate_clues(paragraphs, city)
-        fun_facts = generate_fun_facts(paragraphs, city)
-        trivia = generate_trivia(paragraphs, city)
-        
-        # Create destination data
-        destination = {
-            "city": city,
-            "country": country,
-            "continent": continent,
-            "clues": clues,
-            "fun_facts": fun_facts,
-            "trivia": trivia
-        }
-        
-        new_destinations.append(destination)
-        
-        # Add delay to be nice to the server
-        time.sleep(2)
+    return cities_to_scrape
+
+def print_status(journal):
+    """Print what is left of an unfinished build"""
+    status = journal.status()
+    if not status:
+        print("No unfinished build.")
+        return
+    
+    print(f"Planned: {status['planned']} cities")
+    print(f"Done: {status['done']}, skipped: {status['skipped']}, remaining: {len(status['remaining'])}")
+    for city, country in status['remaining']:
+        print(f"  - {city}, {country}")
+
+def load_dataset(output_file):
+    """Load the destinations of an earlier build, or an empty list"""
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            existing_data = json.load(f)
+            print(f"Loaded {len(existing_data)} existing destinations.")
+    except (FileNotFoundError, json.JSONDecodeError):
+        existing_data = []
+        print("No existing dataset found. Creating a new one.")
+    return existing_data
+
+def prepare_build(journal, existing_data):
+    """Resume an unfinished build or plan a new one, returning the cities left to scrape"""
+    if journal.exists():
+        cities_to_scrape = journal.read_plan()
+        print(f"Resuming unfinished build of {len(cities_to_scrape)} cities.")
+    else:
+        cities_to_scrape = plan_cities(existing_data)
+        journal.write_plan(cities_to_scrape)
+    
+    completed = journal.completed()
+    pending = [(city, country) for city, country in cities_to_scrape if city not in completed]
+    if completed:
+        print(f"{len(completed)} cities already done, {len(pending)} left to scrape.")
+    return pending
+
+def finish_build(journal, existing_data, output_file):
+    """Write the journal of a finished build into the dataset file"""
+    status = journal.status()
+    if status['remaining']:
+        print(f"Could not fetch {len(status['remaining'])} cities, they will be planned again on the next run.")
     
     # Combine existing and new destinations
-    all_destinations = existing_data + new_destinations
-    
-    # Save the data
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_destinations, f, indent=2, ensure_ascii=False)
+    all_destinations = journal.compact(existing_data)
+    journal.discard()
     
-    print(f"Added {len(new_destinations)} new destinations.")
+    print(f"Added {len(all_destinations) - len(existing_data)} new destinations.")
     print(f"Total destinations: {len(all_destinations)}")
     print(f"Dataset saved to {output_file}")
+    return all_destinations
+
+def dataset_file():
+    """Get the path of the expanded dataset, creating its directory if needed"""
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, 'expanded_dataset.json')
+
+def main():
+    """Main function to run the scraper.
+    
+    Options:
+        --status   report the progress of an unfinished build and exit
+        --restart  discard an unfinished build and plan a new one
+    """
+    print("Starting web scraper to build destination dataset...")
+    
+    output_file = dataset_file()
+    journal = BuildJournal(output_file)
+    if '--status' in sys.argv[1:]:
+        print_status(journal)
+        return
+    if '--restart' in sys.argv[1:]:
+        journal.discard()
+    
+    existing_data = load_dataset(output_file)
+    pending = prepare_build(journal, existing_data)
+    
+    try:
+        asyncio.run(scrape_cities(pending, journal))
+    except KeyboardInterrupt:
+        print("Interrupted. Progress is saved, run the scraper again to resume.")
+        return
+    
+    finish_build(journal, existing_data, output_file)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,68 @@
+# backend/services/catalog_response_cache.py
+import threading
+
+class CatalogResponseCache:
+    """Serialized responses of the catalog read endpoints.
+
+    Each response is built from a catalog snapshot, serialized once and
+    stored under the snapshot's catalog version, so it is served until the
+    catalog version changes. Its strong ETag is derived from the response
+    name and that version. Hits, misses, 304 responses and invalidations
+    are counted for the metrics endpoint.
+    """
+    def __init__(self, catalog, serialize):
+        self.catalog = catalog
+        self.serialize = serialize
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_etag(name, version):
+        """Build the entity tag of a response at a catalog version"""
+        return f"{name}-v{version}"
+
+    def get(self, name, build):
+        """Get (etag, body) of a response, building it from the snapshot on a miss"""
+        snapshot = self.catalog.get_snapshot()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry and entry[0] == snapshot.version:
+                self._hits += 1
+                return entry[1], entry[2]
+            self._misses += 1
+
+        # Build outside the lock, concurrent misses at worst build the same body twice
+        etag = self.make_etag(name, snapshot.version)
+        body = self.serialize(build(snapshot))
+        with self._lock:
+            self._entries[name] = (snapshot.version, etag, body)
+        return etag, body
+
+    def record_not_modified(self):
+        """Count a conditional request answered with 304"""
+        with self._lock:
+            self._not_modified += 1
+
+    def invalidate(self):
+        """Drop every response and make the catalog check its version on the next read"""
+        self.catalog.invalidate()
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def metrics(self):
+        """Report hits, misses and 304 responses"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'not_modified': self._not_modified,
+                'invalidations': self._invalidations
+            }
@@ -0,0 +1,110 @@
+# backend/services/catalog_service.py
+import random
+import threading
+import time
+from models.destination import Destination
+from services.distractor_index import DistractorIndex
+
+class CatalogSnapshot:
+    """Immutable view of the destinations collection at one catalog version"""
+    def __init__(self, version, destinations):
+        self.version = version
+        self.destinations = destinations
+        self.by_id = {str(destination['_id']): destination for destination in destinations}
+        self.ids = [str(destination['_id']) for destination in destinations]
+        self.distractors = DistractorIndex(destinations)
+
+    def ids_added_after(self, catalog_version):
+        """Get the IDs of destinations added after a catalog version.
+
+        Destinations are stamped with the catalog version their import
+        produced (see Destination.bump_catalog_version). Unstamped ones
+        were just inserted and count as newer than any version, while
+        destinations from before stamping count as version 0.
+        """
+        ids = []
+        for destination in self.destinations:
+            added_version = destination.get('added_version', 0)
+            if added_version is None or added_version > catalog_version:
+                ids.append(str(destination['_id']))
+        return ids
+
+class DestinationCatalog:
+    """App-scoped, in-memory cache of the destinations collection.
+
+    The snapshot is reloaded when the catalog version stored in MongoDB
+    changes. The version is checked at most once every
+    `version_check_interval` seconds, so serving a round normally needs no
+    database round trip. Returned destination documents are shared between
+    requests and must not be modified.
+    """
+    def __init__(self, db, version_check_interval=5, destination_model=None):
+        self.destination_model = destination_model or Destination(db)
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0
+
+    def _is_fresh(self, snapshot):
+        """Check if a snapshot was validated recently enough to be served"""
+        if snapshot is None:
+            return False
+        return time.monotonic() - self._checked_at < self.version_check_interval
+
+    def get_snapshot(self):
+        """Get the current snapshot, reloading it if the catalog version changed"""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            # Read the version before the documents so a concurrent bump
+            # is picked up by the next check rather than lost
+            version = self.destination_model.get_catalog_version()
+            if snapshot is None or snapshot.version != version:
+                destinations = self.destination_model.get_all_destination_documents()
+                snapshot = CatalogSnapshot(version, destinations)
+                self._snapshot = snapshot
+
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """Force a version check on the next read"""
+        self._checked_at = 0
+
+    @property
+    def version(self):
+        """Version of the snapshot currently being served"""
+        return self.get_snapshot().version
+
+    def count(self):
+        """Count the destinations in the catalog"""
+        return len(self.get_snapshot().destinations)
+
+    def get_destination_by_id(self, destination_id):
+        """Get a destination by its ID"""
+        if not destination_id:
+            return None
+        return self.get_snapshot().by_id.get(str(destination_id))
+
+    def sample_destinations(self, count):
+        """Get up to `count` distinct random destinations"""
+        destinations = self.get_snapshot().destinations
+        return random.sample(destinations, min(count, len(destinations)))
+
+    def get_multiple_choice_options(self, correct_destination, num_options=3):
+        """Get shuffled answer options, unique by city, including the correct one"""
+        options = self.get_snapshot().distractors.get_distractors(correct_destination, num_options)
+        options.append({
+            'city': correct_destination['city'],
+            'country': correct_destination['country'],
+            '_id': str(correct_destination['_id'])
+        })
+        random.shuffle(options)
+        return options
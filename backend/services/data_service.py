@@ -1,21 +1,50 @@
 # backend/services/data_service.py
 import os
 import json
-import requests
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
 from models.destination import Destination
+from services.dataset_import import DatasetImporter
 from utils.helpers import load_json_file, save_json_file
+from utils.response_cache import ResponseCache
+
+EXPANSION_MODEL = "gpt-3.5-turbo-0125"
+EXPANSION_CONTINENTS = [
+    "Africa", "Antarctica", "Asia", "Europe",
+    "North America", "Oceania", "South America"
+]
+
+# Counts reported for every chunk of a streamed import
+CHUNK_COUNTS = ('records', 'inserted', 'updated', 'unchanged', 'duplicates', 'errors')
+
+def parse_generated_destinations(content):
+    """Get the list of destinations in a response, or None if it has none"""
+    # Extract JSON data from the response
+    json_match = re.search(r'```(?:json)?\n([\s\S]*?)\n```', content or '')
+    json_str = json_match.group(1) if json_match else content
+    
+    try:
+        destinations = json.loads(json_str)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return destinations if isinstance(destinations, list) else None
 
 class DataService:
-    def __init__(self, db, openai_api_key=None):
+    def __init__(self, db, openai_api_key=None, openai_base_url=None, cache_dir=None, destination_model=None):
         self.db = db
-        self.destination_model = Destination(db)
-        self.openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+        self.destination_model = destination_model or Destination(db)
+        # Streamed imports replace the fields their records set
+        self.importer = DatasetImporter(db, overwrite=True, destination_model=self.destination_model)
+        self.openai_client = OpenAI(api_key=openai_api_key, base_url=openai_base_url) if openai_api_key else None
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
         
         # Create data directory if it doesn't exist
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+        
+        # Generated responses are kept here so reruns do not pay for them again
+        self.response_cache = ResponseCache(cache_dir or os.path.join(self.data_dir, 'cache', 'openai'))
     
     def import_starter_dataset(self, file_path=None):
         """Import starter dataset from a file"""
@@ -28,110 +57,244 @@ class DataService:
         
         return self.destination_model.import_destinations(data)
     
-    def expand_dataset_with_ai(self, prompts_count=30):
-        """Expand dataset using OpenAI API"""
-        if not self.openai_client:
-            raise ValueError("OpenAI API key is required for dataset expansion")
-        
-        # Get a list of destination examples to guide the AI
-        existing_count = self.destination_model.count_destinations()
+    def import_destination_stream(self, lines, chunk_size=500, max_rejected_lines=100):
+        """Import destinations from NDJSON lines without loading them all.
         
-        # If we already have 100+ destinations, no need to expand
-        if existing_count >= 100:
-            return 0
-        
-        # Determine how many more destinations we need
-        destinations_to_generate = max(100 - existing_count, 0)
-        batch_size = min(prompts_count, destinations_to_generate)
+        Each line is parsed and validated on its own, so a bad record only
+        rejects its own line. Valid records are imported in chunks of
+        `chunk_size` by the same planner as dataset files (see
+        DatasetImporter.import_stream): they match stored destinations on
+        their alias-aware match key and replace the fields they set.
+        Returns totals, per-chunk counts and diagnostics for up to
+        `max_rejected_lines` rejected lines.
+        """
+        report = {
+            'received': 0,
+            'inserted': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'errors': 0,
+            'chunks': [],
+            'rejected_lines': []
+        }
+        # Line numbers of the records handed to the importer, in order
+        line_numbers = []
+        counted = dict.fromkeys(CHUNK_COUNTS, 0)
         
-        if batch_size <= 0:
-            return 0
+        def reject(line_number, error):
+            report['rejected'] += 1
+            if len(report['rejected_lines']) < max_rejected_lines:
+                report['rejected_lines'].append({'line': line_number, 'error': error})
         
-        # Get example destinations for reference
-        all_destinations = list(self.destination_model.collection.find({}, {'_id': 0}))
-        examples = all_destinations[:min(3, len(all_destinations))]
-        
-        expanded_destinations = []
-        continents = [
-            "Africa", "Antarctica", "Asia", "Europe", 
-            "North America", "Oceania", "South America"
-        ]
-        
-        for batch in range(0, destinations_to_generate, batch_size):
-            batch_destinations = []
-            
-            # Add continent-specific requests to ensure diversity
-            for i in range(batch_size):
-                if batch + i >= destinations_to_generate:
-                    break
-                
-                continent = continents[(batch + i) % len(continents)]
-                
-                prompt = f"""
-                Generate {batch_size} unique tourist destinations for the Globetrotter quiz game about famous places around the world.
-                Focus on destinations in {continent}.
-                
-                Each destination should include:
-                1. City name
-                2. Country
-                3. Continent
-                4. 3-4 cryptic clues that hint at the destination
-                5. 3-4 fun facts about the destination
-                6. 3-4 trivia items about the destination
-                7. (Optional) An image URL for the destination
+        def records():
+            for line_number, line in enumerate(lines, start=1):
+                if isinstance(line, bytes):
+                    try:
+                        line = line.decode('utf-8')
+                    except UnicodeDecodeError:
+                        report['received'] += 1
+                        reject(line_number, 'Line is not valid UTF-8')
+                        continue
                 
-                Format the output as a JSON array.
+                line = line.strip()
+                if not line:
+                    continue
+                report['received'] += 1
                 
-                Here are some examples of the format:
-                {json.dumps(examples, indent=2)}
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    reject(line_number, f'Invalid JSON: {e.msg}')
+                    continue
                 
-                Make sure to generate destinations that are not in the examples. Create unique, interesting destinations with engaging clues and facts.
-                """
+                error = self.destination_model.validate_record(record)
+                if error:
+                    reject(line_number, error)
+                    continue
                 
-                try:
-                    response = self.openai_client.chat.completions.create(
-                        model="gpt-3.5-turbo-0125",
-                        messages=[
-                            {"role": "system", "content": "You are a travel expert and data generation assistant."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.7,
-                        max_tokens=2500
-                    )
-                    
-                    # Extract the generated content
-                    content = response.choices[0].message.content
+                line_numbers.append(line_number)
+                yield record
+        
+        def add_chunk(totals):
+            # The importer reports running totals, a chunk is the difference
+            chunk = {field: totals[field] - counted[field] for field in CHUNK_COUNTS}
+            first = counted['records']
+            counted.update({field: totals[field] for field in CHUNK_COUNTS})
+            report['chunks'].append({
+                'first_line': line_numbers[first],
+                'last_line': line_numbers[counted['records'] - 1],
+                **chunk
+            })
+        
+        totals = self.importer.import_stream(records(), chunk_size, on_batch=add_chunk)
+        for field in ('inserted', 'updated', 'unchanged', 'duplicates', 'errors'):
+            report[field] = totals[field]
+        
+        return report
+    
+    def expand_dataset_with_ai(self, prompts_count=30, concurrency=4, target_count=100):
+        """Expand dataset using OpenAI API, returning how many destinations were added"""
+        return self.expand_dataset(prompts_count, concurrency, target_count)['inserted']
+    
+    def expand_dataset(self, prompts_count=30, concurrency=4, target_count=100, chunk_size=25):
+        """Generate destinations with OpenAI until the catalog has `target_count`.
+        
+        Every request asks for `prompts_count` destinations on one
+        continent. Requests run on a pool of `concurrency` threads and each
+        response is cached on disk under a hash of its request. Requests
+        depend only on their continent, their batch number and
+        `prompts_count`, so a rerun (or a crash halfway through) replays
+        the cached responses for free and only pays for the requests that
+        never completed. As responses arrive their destinations are validated and
+        upserted in chunks of `chunk_size`, so the catalog grows while the
+        remaining requests are still in flight.
+        
+        Returns the import report with request counts added.
+        """
+        if not self.openai_client:
+            raise ValueError("OpenAI API key is required for dataset expansion")
+        
+        report = {'requests': 0, 'cache_hits': 0, 'failed_requests': 0, 'unparsable_responses': 0, 'generated': 0}
+        
+        # If we already have enough destinations, no need to expand
+        existing_count = self.destination_model.count_destinations()
+        destinations_to_generate = max(target_count - existing_count, 0)
+        if destinations_to_generate <= 0 or prompts_count <= 0:
+            return {**report, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+        
+        expansion_requests = self._build_expansion_requests(destinations_to_generate, prompts_count)
+        generated = []
+        
+        def generated_lines():
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                futures = [pool.submit(self._complete_cached, request) for request in expansion_requests]
+                for future in as_completed(futures):
+                    report['requests'] += 1
+                    try:
+                        content, cached = future.result()
+                    except Exception as e:
+                        report['failed_requests'] += 1
+                        print(f"Error calling OpenAI API: {e}")
+                        continue
                     
-                    # Extract JSON data from the response
-                    import re
-                    json_match = re.search(r'```json\n([\s\S]*?)\n```', content)
-                    if json_match:
-                        json_str = json_match.group(1)
-                    else:
-                        json_str = content
+                    if cached:
+                        report['cache_hits'] += 1
                     
-                    # Try to parse the JSON
-                    try:
-                        new_destinations = json.loads(json_str)
-                        if isinstance(new_destinations, list):
-                            batch_destinations.extend(new_destinations)
-                    except json.JSONDecodeError:
-                        print(f"Error parsing JSON from AI response")
+                    destinations = parse_generated_destinations(content)
+                    if destinations is None:
+                        report['unparsable_responses'] += 1
+                        print("Error parsing JSON from AI response")
+                        continue
                     
-                except Exception as e:
-                    print(f"Error calling OpenAI API: {e}")
-            
-            # Add the new destinations to our collection
-            expanded_destinations.extend(batch_destinations)
+                    report['generated'] += len(destinations)
+                    for destination in destinations:
+                        generated.append(destination)
+                        yield json.dumps(destination)
+        
+        report.update(self.import_destination_stream(generated_lines(), chunk_size))
         
-        # Save the expanded dataset
+        # Save the generated destinations that passed validation
         expanded_file_path = os.path.join(self.data_dir, 'expanded_dataset.json')
-        save_json_file(expanded_destinations, expanded_file_path)
+        save_json_file(
+            [destination for destination in generated if not self.destination_model.validate_record(destination)],
+            expanded_file_path
+        )
+        
+        return report
+    
+    def _build_expansion_requests(self, destinations_to_generate, batch_size):
+        """Build the chat completion requests for an expansion.
+        
+        Requests are numbered per continent and cycle through the
+        continents in a fixed order. Requests whose responses are already
+        cached are always included, since they cost nothing, and count for
+        the destinations in them the catalog does not have yet. Uncached
+        ones count for `batch_size` each, and are added until the requests
+        cover `destinations_to_generate`.
+        """
+        # A few existing destinations show the model the format, the oldest
+        # ones so the prompt does not change as the catalog grows
+        examples = list(
+            self.destination_model.collection.find({}, {'_id': 0, 'match_key': 0}).sort('_id', 1).limit(3)
+        )
+        
+        # The instructions and examples are identical in every request, so
+        # they come first and only the short request-specific part varies
+        system_prompt = f"""You are a travel expert and data generation assistant for the Globetrotter quiz game about famous places around the world.
+
+Each destination should include:
+1. City name
+2. Country
+3. Continent
+4. 3-4 cryptic clues that hint at the destination
+5. 3-4 fun facts about the destination
+6. 3-4 trivia items about the destination
+7. (Optional) An image URL for the destination
+
+Format the output as a JSON array.
+
+Here are some examples of the format:
+{json.dumps(examples, separators=(',', ':'), ensure_ascii=False)}
+
+Make sure to generate destinations that are not in the examples. Create unique, interesting destinations with engaging clues and facts."""
+        
+        known_keys = {
+            self.destination_model.make_match_key(destination.get('city'), destination.get('country'))
+            for destination in self.destination_model.collection.find({}, {'city': 1, 'country': 1})
+        }
+        
+        expansion_requests = []
+        remaining = destinations_to_generate
+        index = 0
+        while remaining > 0:
+            continent = EXPANSION_CONTINENTS[index % len(EXPANSION_CONTINENTS)]
+            batch = index // len(EXPANSION_CONTINENTS) + 1
+            request = {
+                'model': EXPANSION_MODEL,
+                'messages': [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Batch {batch} for {continent}: generate {batch_size} unique tourist destinations in {continent}."}
+                ],
+                'temperature': 0.7,
+                'max_tokens': 2500
+            }
+            key = self.response_cache.key(request)
+            if self.response_cache.contains(key):
+                remaining -= self._count_new_destinations(self.response_cache.get(key), known_keys)
+            else:
+                remaining -= batch_size
+            expansion_requests.append(request)
+            index += 1
+        return expansion_requests
+    
+    def _count_new_destinations(self, content, known_keys):
+        """Count the valid destinations of a response missing from `known_keys`, adding them to it"""
+        new = 0
+        for record in parse_generated_destinations(content) or []:
+            if self.destination_model.validate_record(record):
+                continue
+            match_key = self.destination_model.make_match_key(record.get('city'), record.get('country'))
+            if match_key not in known_keys:
+                known_keys.add(match_key)
+                new += 1
+        return new
+    
+    def _complete_cached(self, request):
+        """Get the response text of a request from the cache or the API.
         
-        # Import the expanded dataset
-        import_count = self.destination_model.import_destinations(expanded_destinations)
+        Returns (content, cached).
+        """
+        key = self.response_cache.key(request)
+        content = self.response_cache.get(key)
+        if content is not None:
+            return content, True
         
-        return import_count
+        response = self.openai_client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        self.response_cache.put(key, content)
+        return content, False
     
     def get_destination_count(self):
         """Get the number of destinations in the database"""
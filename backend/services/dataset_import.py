@@ -0,0 +1,152 @@
+# backend/services/dataset_import.py
+import os
+import time
+from models.dataset_version import DatasetVersion
+from models.destination import Destination
+from services.import_planner import ImportPlanner
+from utils.helpers import load_json_file
+
+class DatasetImporter:
+    """Import dataset files, skipping whatever was imported before.
+
+    A file whose content hash matches its recorded version is skipped
+    without being parsed. Otherwise only the records whose content hash
+    is new since the last import are planned and applied, and the new
+    version is recorded with the catalog version it produced. Imports
+    that change nothing leave the catalog version alone, so running
+    destination catalogs do not reload.
+    """
+    def __init__(self, db, overwrite=False, destination_model=None):
+        self.destination_model = destination_model or Destination(db)
+        self.versions = DatasetVersion(db)
+        self.planner = ImportPlanner(self.destination_model, overwrite=overwrite)
+        # Records edited in an imported file replace what their last import wrote
+        self.edit_planner = self.planner if overwrite else ImportPlanner(self.destination_model, overwrite=True)
+
+    def import_file(self, file_path, force=False, dry_run=False):
+        """Import the records of a JSON dataset file that changed since its last import.
+
+        Once a file has a recorded version its changed records replace the
+        fields they set, as with `overwrite`: otherwise an edited record
+        would only fill in missing fields, and its new hash would keep the
+        edit from being planned again. With `force` the recorded version is
+        ignored and every record is planned again. With `dry_run` nothing is
+        written, not even the version. Returns a report, or
+        {'error': message}.
+        """
+        name = os.path.basename(file_path)
+        if not os.path.exists(file_path):
+            return {'error': f'{name} not found'}
+
+        file_hash = DatasetVersion.hash_file(file_path)
+        version = None if force else self.versions.get_version(name)
+        report = {
+            'file': name,
+            'file_hash': file_hash,
+            'status': 'unchanged',
+            'records': 0,
+            'changed_records': 0,
+            'superseded_records': 0,
+            'plan': None,
+            'applied': None,
+            'catalog_version': version['catalog_version'] if version else None
+        }
+
+        # An emptied catalog has to be rebuilt even from unchanged files
+        if version and version['file_hash'] == file_hash and self.destination_model.count_destinations():
+            report['records'] = version['records']
+            return report
+
+        data = load_json_file(file_path)
+        if not isinstance(data, list):
+            return {'error': f'{name} is not a JSON list of destinations'}
+
+        known = set(version['record_hashes']) if version else set()
+        record_hashes = set()
+        changed = []
+        for record in data:
+            # Invalid records are always planned, so they are reported every time
+            if self.destination_model.validate_record(record) is None:
+                record_hash = DatasetVersion.hash_record(self.destination_model.transform_record(record, partial=True))
+                record_hashes.add(record_hash)
+                if record_hash in known:
+                    continue
+            changed.append(record)
+
+        report['records'] = len(data)
+        report['changed_records'] = len(changed)
+        report['superseded_records'] = len(known - record_hashes)
+        report['status'] = 'planned' if dry_run else 'imported'
+        if changed:
+            planner = self.edit_planner if version else self.planner
+            report['plan'] = planner.plan(changed, planner.load_index())
+
+        if dry_run:
+            return report
+
+        plan = report['plan']
+        if plan and (plan['inserts'] or plan['updates']):
+            # Inserts rely on the unique match key index
+            self.destination_model.backfill_match_keys()
+            report['applied'] = planner.apply(plan)
+        report['catalog_version'] = self.destination_model.get_catalog_version()
+
+        # Leave the version alone after failed writes so the next import retries them
+        if not report['applied'] or not report['applied']['errors']:
+            self.versions.save_version(name, file_hash, record_hashes, report['catalog_version'])
+        return report
+
+    def import_stream(self, records, batch_size=25, on_batch=None):
+        """Import destinations from an iterable while it is still producing them.
+
+        Records are planned and applied in batches of `batch_size` against
+        an index of the catalog loaded once, which every batch extends with
+        the destinations it inserted. `on_batch` is called with the totals
+        after every batch. Dataset versions are not recorded, import the
+        file the records end up in to do that.
+        """
+        # Inserts rely on the unique match key index, backfill it once for the whole stream
+        self.destination_model.backfill_match_keys()
+        index = self.planner.load_index()
+        report = {
+            'records': 0,
+            'batches': 0,
+            'inserted': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'errors': 0,
+            'busy': 0.0
+        }
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self._import_batch(batch, index, report, on_batch)
+                batch = []
+        if batch:
+            self._import_batch(batch, index, report, on_batch)
+        return report
+
+    def _import_batch(self, batch, index, report, on_batch):
+        """Plan and apply one batch of a stream and add its counts to the report"""
+        started = time.perf_counter()
+        plan = self.planner.plan(batch, index)
+        if plan['inserts'] or plan['updates']:
+            applied = self.planner.apply(plan)
+            for field in ('inserted', 'updated', 'errors'):
+                report[field] += applied[field]
+
+        # Later batches match the destinations this one inserted
+        for document in plan['inserts']:
+            self.planner.add_to_index(index, document)
+
+        report['records'] += plan['records']
+        report['batches'] += 1
+        for field in ('unchanged', 'duplicates', 'rejected'):
+            report[field] += plan[field]
+        report['busy'] += time.perf_counter() - started
+        if on_batch:
+            on_batch(report)
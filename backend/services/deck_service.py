@@ -0,0 +1,82 @@
+# backend/services/deck_service.py
+import random
+from models.user import User
+
+class DeckService:
+    """Deals destinations to users from a stored, shuffled deck.
+
+    Each user document holds a permutation of destination IDs and a cursor.
+    Drawing advances the cursor in a single round trip, so picking an
+    unplayed destination no longer depends on how many the user has played.
+    An exhausted deck is reshuffled, and destinations imported after the
+    deck was built (IDs above its high water mark) are merged into the
+    undealt part of the deck on the next draw.
+    """
+    def __init__(self, db, catalog, user_model=None):
+        self.user_model = user_model or User(db)
+        self.catalog = catalog
+
+    def draw(self, user_id=None, count=1):
+        """Draw up to `count` distinct destinations for a user"""
+        snapshot = self.catalog.get_snapshot()
+        count = min(count, len(snapshot.destinations))
+        if count <= 0:
+            return []
+
+        # Anonymous players have no deck, just deal random destinations
+        if not user_id:
+            return self.catalog.sample_destinations(count)
+
+        state = self.user_model.draw_from_deck(user_id, count)
+        if state is None:
+            return self.catalog.sample_destinations(count)
+
+        # Skip IDs of destinations that were removed from the catalog
+        drawn = [snapshot.by_id[id] for id in state['drawn'] if id in snapshot.by_id]
+
+        if len(state['drawn']) < count:
+            # The deck ran out (or was never dealt), start a new one
+            drawn.extend(self._reshuffle(user_id, state, drawn, count - len(drawn), snapshot))
+            return drawn
+
+        # Decks built before the catalog version was recorded count as version 0
+        if state.get('catalog_version', 0) < snapshot.version:
+            self._merge_new_destinations(user_id, state, count, snapshot)
+
+        if len(drawn) < count:
+            drawn_ids = {str(destination['_id']) for destination in drawn}
+            extra = [d for d in self.catalog.sample_destinations(count * 2) if str(d['_id']) not in drawn_ids]
+            drawn.extend(extra[:count - len(drawn)])
+
+        return drawn
+
+    def _reshuffle(self, user_id, state, drawn, needed, snapshot):
+        """Build a new deck for the user and deal `needed` destinations from it"""
+        # Keep just-dealt destinations at the bottom of the new deck
+        recent_ids = {str(destination['_id']) for destination in drawn}
+
+        # A user's first deck puts their previously played destinations last
+        if not state['size']:
+            recent_ids.update(self.user_model.get_played_destinations(user_id))
+
+        fresh_ids = [id for id in snapshot.ids if id not in recent_ids]
+        stale_ids = [id for id in snapshot.ids if id in recent_ids]
+        random.shuffle(fresh_ids)
+        random.shuffle(stale_ids)
+
+        # Never deal a destination twice in the same draw
+        already_drawn = {str(destination['_id']) for destination in drawn}
+        deck = fresh_ids + [id for id in stale_ids if id not in already_drawn] + \
+            [id for id in stale_ids if id in already_drawn]
+
+        self.user_model.reset_deck(user_id, deck, needed, snapshot.version)
+        return [snapshot.by_id[id] for id in deck[:needed]]
+
+    def _merge_new_destinations(self, user_id, state, count, snapshot):
+        """Insert destinations added since the deck was built at a random undealt position"""
+        # Merge even when nothing was added (the version also changes on
+        # updates and deletes), so the deck is marked current and skips the scan
+        new_ids = snapshot.ids_added_after(state.get('catalog_version', 0))
+        random.shuffle(new_ids)
+        position = random.randint(min(state['cursor'] + count, state['size']), state['size'])
+        self.user_model.merge_into_deck(user_id, new_ids, position, snapshot.version)
@@ -0,0 +1,82 @@
+# backend/services/distractor_index.py
+import random
+from utils.helpers import normalize_name
+
+UNKNOWN_CONTINENTS = (None, '', 'Unknown')
+
+class DistractorIndex:
+    """Precomputed pools of wrong answers for multiple choice options.
+
+    Destinations are keyed by normalized city name, so every pool holds at
+    most one option per city, and grouped by continent and country. Drawing
+    N distractors samples at most N + 1 positions per pool, so it runs in
+    O(N) time and always terminates, however small the catalog is.
+    """
+    def __init__(self, destinations):
+        self.options = []
+        self.by_continent = {}
+        self.country_continents = {}
+
+        seen_cities = set()
+        for destination in destinations:
+            city_key = normalize_name(destination.get('city'))
+            if not city_key or city_key in seen_cities:
+                continue
+            seen_cities.add(city_key)
+
+            option = {
+                '_id': str(destination['_id']),
+                'city': destination['city'],
+                'country': destination.get('country')
+            }
+            entry = (city_key, option)
+            self.options.append(entry)
+
+            continent = destination.get('continent')
+            if continent in UNKNOWN_CONTINENTS:
+                continue
+            countries = self.by_continent.setdefault(continent, {})
+            countries.setdefault(normalize_name(option['country']), []).append(entry)
+            self.country_continents.setdefault(normalize_name(option['country']), continent)
+
+        # Flatten each continent once so sampling is a constant-time index lookup
+        self.continent_options = {
+            continent: [entry for entries in countries.values() for entry in entries]
+            for continent, countries in self.by_continent.items()
+        }
+
+    def __len__(self):
+        return len(self.options)
+
+    def get_continent(self, destination):
+        """Get the continent of a destination, inferring it from its country if missing"""
+        continent = destination.get('continent')
+        if continent in UNKNOWN_CONTINENTS:
+            continent = self.country_continents.get(normalize_name(destination.get('country')))
+        return continent
+
+    def get_distractors(self, destination, count=3):
+        """Get up to `count` options with cities different from the destination's"""
+        excluded = {normalize_name(destination.get('city'))}
+        distractors = []
+
+        # Prefer cities on the same continent, then fill up from the whole catalog
+        pools = [self.continent_options.get(self.get_continent(destination), []), self.options]
+        for pool in pools:
+            needed = count - len(distractors)
+            if needed <= 0:
+                break
+            # Each excluded city matches at most one entry in a pool, so this
+            # many distinct positions always yields `needed` new cities if the
+            # pool has them
+            sample_size = min(len(pool), needed + len(excluded))
+            for position in random.sample(range(len(pool)), sample_size):
+                city_key, option = pool[position]
+                if city_key in excluded:
+                    continue
+                excluded.add(city_key)
+                distractors.append(dict(option))
+                if len(distractors) == count:
+                    break
+
+        return distractors
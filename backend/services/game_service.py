@@ -3,13 +3,22 @@ import random
 from models.destination import Destination
 from models.user import User
 from models.game import Game
+from services.catalog_service import DestinationCatalog
+from services.deck_service import DeckService
+from services.stats_service import DirectStatsWriter
 
 class GameService:
-    def __init__(self, db):
+    def __init__(self, db, catalog=None, stats_writer=None, destination_model=None, user_model=None,
+                 game_model=None, deck_service=None):
         self.db = db
-        self.destination_model = Destination(db)
-        self.user_model = User(db)
-        self.game_model = Game(db)
+        # Prefer the app-scoped models and services, built here only when used standalone
+        self.destination_model = destination_model or Destination(db)
+        self.user_model = user_model or User(db)
+        self.game_model = game_model or Game(db)
+        # Prefer the app-scoped catalog so its snapshot is shared between requests
+        self.catalog = catalog or DestinationCatalog(db, destination_model=self.destination_model)
+        self.deck_service = deck_service or DeckService(db, self.catalog, self.user_model)
+        self.stats_writer = stats_writer or DirectStatsWriter(db, self.user_model)
     
     def start_game_for_user(self, user_id):
         """Start a new game for a user"""
@@ -22,70 +31,105 @@ class GameService:
         game = self.game_model.create_game(user_id)
         return game
     
-    def get_next_round(self, game_id, user_id=None):
-        """Get the next round for a game"""
-        # Get the game
-        game = self.game_model.get_game(game_id)
-        if not game or not game['active']:
-            return None
+    def create_rounds(self, game_id, user_id=None, count=1):
+        """Deal `count` new rounds and add them to an active game.
         
-        # Get excluded destination IDs from user's played list
-        excluded_ids = []
-        if user_id:
-            excluded_ids = self.user_model.get_played_destinations(user_id)
+        This is the hot path behind POST /api/games/<id>/round(s). A draw
+        from an existing deck costs two MongoDB round trips, whatever the
+        count: one deck draw for the user (which also records the
+        destinations as played) and one find_one_and_update that pushes
+        every round and returns the updated game. Anonymous players skip the
+        deck draw, so they cost one. Destinations, answer options and clues
+        come from the in-memory catalog.
         
-        # Get a random destination
-        destination = self.destination_model.get_random_destination(excluded_ids)
-        if not destination:
-            return None
+        Some draws cost more:
+        
+        - a user's first deck also reads their played destinations and
+          stores the new deck (four round trips)
+        - an exhausted deck stores a reshuffled one (three)
+        - the first draw after a catalog change merges the destinations
+          added since into the deck (three)
+        - the catalog reads its version at most once every
+          CATALOG_VERSION_CHECK_SECONDS (one more), and reloads every
+          destination when the version has changed
+        - the game is read again on the error path, to report why the push
+          failed
         
-        # Get answer options for multiple choice
-        answer_options = self.destination_model.get_multiple_choice_options(destination)
+        Returns a dict with the updated `game` and the new `rounds`, or a
+        dict with an `error` message.
+        """
+        # Deal distinct unplayed destinations from the user's deck
+        drawn = self.deck_service.draw(user_id, count)
+        if not drawn:
+            return {'error': 'No destinations found'}
         
-        # Select 1-2 random clues
-        clues = destination['clues']
-        num_clues = min(2, len(clues))
-        selected_clues = random.sample(clues, num_clues)
+        rounds = []
+        for destination in drawn:
+            # Select 1-2 random clues
+            clues = destination['clues']
+            num_clues = min(2, len(clues))
+            
+            rounds.append({
+                'destination': destination,
+                'destination_id': str(destination['_id']),
+                'clues_shown': random.sample(clues, num_clues),
+                'answer_options': self.catalog.get_multiple_choice_options(destination)
+            })
         
-        # If user is logged in, mark destination as played
-        if user_id:
-            self.user_model.add_played_destination(user_id, str(destination['_id']))
+        # Add the rounds to the game, this also returns the updated game
+        updated_game = self.game_model.add_rounds(game_id, rounds)
         
-        # Add the round to the game
-        self.game_model.add_round(
-            game_id, 
-            str(destination['_id']), 
-            selected_clues,
-            answer_options
-        )
+        if not updated_game:
+            game = self.game_model.get_game(game_id)
+            if not game:
+                return {'error': 'Game not found'}
+            return {'error': 'Game is not active'}
         
-        # Get the updated game
-        updated_game = self.game_model.get_game(game_id)
-        round_index = len(updated_game['rounds']) - 1
+        # The pushed rounds are the last ones in the game
+        first_index = len(updated_game['rounds']) - len(rounds)
         
         # Prepare response
-        round_data = {
-            'destination_id': str(destination['_id']),
-            'clues': selected_clues,
-            'answer_options': answer_options,
-            'round_index': round_index,
-            'correct_answer': {
-                'city': destination['city'],
-                'country': destination['country']
-            }
+        rounds_data = []
+        for offset, round in enumerate(rounds):
+            destination = round['destination']
+            rounds_data.append({
+                'destination_id': round['destination_id'],
+                'clues': round['clues_shown'],
+                'answer_options': round['answer_options'],
+                'round_index': first_index + offset,
+                'correct_answer': {
+                    'city': destination['city'],
+                    'country': destination['country']
+                }
+            })
+        
+        return {
+            'game': updated_game,
+            'rounds': rounds_data
         }
+    
+    def create_round(self, game_id, user_id=None):
+        """Deal a new round and add it to an active game"""
+        result = self.create_rounds(game_id, user_id)
+        if 'error' in result:
+            return result
         
-        return round_data
+        return {
+            'game': result['game'],
+            'round': result['rounds'][0]
+        }
+    
+    def get_next_round(self, game_id, user_id=None):
+        """Get the next round for a game"""
+        result = self.create_round(game_id, user_id)
+        if 'error' in result:
+            return None
+        return result['round']
     
     def validate_answer(self, game_id, destination_id, user_answer, round_index):
         """Validate a user's answer for a round"""
-        # Get the game
-        game = self.game_model.get_game(game_id)
-        if not game or not game['active']:
-            return None
-        
         # Get the destination
-        destination = self.destination_model.get_destination_by_id(destination_id)
+        destination = self.catalog.get_destination_by_id(destination_id)
         if not destination:
             return None
         
@@ -100,21 +144,21 @@ class GameService:
         
         random_fact = random.choice(facts) if facts else "No fact available"
         
-        # Update the round
-        self.game_model.update_round(
+        # Update the round, this also returns the game before and after
+        previous_game, updated_game = self.game_model.update_round(
             game_id, 
             round_index, 
             user_answer, 
             is_correct, 
-            random_fact
+            random_fact,
+            active_only=True
         )
+        if not updated_game:
+            return None
         
-        # Update user stats
-        user_id = game['user_id']
-        self.user_model.update_stats(user_id, is_correct)
-        
-        # Get the updated game
-        updated_game = self.game_model.get_game(game_id)
+        # Update user stats, unless the round was already answered
+        if previous_game['rounds'][int(round_index)].get('user_answer') is None:
+            self.stats_writer.record_answer(updated_game['user_id'], is_correct)
         
         # Prepare response
         result = {
@@ -130,6 +174,109 @@ class GameService:
         
         return result
     
+    def pick_fact(self, destination, is_correct):
+        """Pick a fun fact for a correct answer or a trivia item for a wrong one"""
+        if is_correct:
+            facts = destination.get('fun_facts') or destination.get('fun_fact')
+            default = f"{destination['city']} is a fascinating destination!"
+        else:
+            facts = destination.get('trivia')
+            default = f"{destination['city']} has many interesting aspects to explore."
+        
+        return random.choice(facts) if facts else default
+    
+    def submit_answers(self, game_id, answers):
+        """Validate several answers and apply them to a game in one write.
+        
+        `answers` is a list of `{round_index, destination_id, answer}`
+        items. Destinations come from the in-memory catalog, every round and
+        the score are written with one update, and the user's statistics
+        with one $inc. If a round is answered more than once, the last
+        answer wins. Only rounds that had no answer before the update count
+        towards the statistics, so a client re-sending queued answers after
+        a reconnect does not count them twice.
+        
+        Returns a dict with the updated `game` and per-round `results`, or a
+        dict with an `error` message (and `details` for invalid items).
+        """
+        if not isinstance(answers, list) or not answers:
+            return {'error': 'Invalid answers', 'details': ['Answers must be a non-empty list']}
+        
+        by_round = {}
+        details = []
+        for position, item in enumerate(answers):
+            if not isinstance(item, dict):
+                details.append(f'Answer {position} must be an object')
+                continue
+            
+            round_index = item.get('round_index')
+            user_answer = item.get('answer')
+            destination = self.catalog.get_destination_by_id(item.get('destination_id'))
+            
+            if not isinstance(round_index, int) or isinstance(round_index, bool) or round_index < 0:
+                details.append(f'Answer {position} has an invalid round index')
+            elif not user_answer:
+                details.append(f'Answer {position} is missing the answer')
+            elif not destination:
+                details.append(f'Answer {position} has an unknown destination')
+            else:
+                by_round[round_index] = (destination, user_answer)
+        
+        if details:
+            return {'error': 'Invalid answers', 'details': details}
+        
+        round_updates = []
+        results = []
+        for round_index, (destination, user_answer) in sorted(by_round.items()):
+            is_correct = destination['city'] == user_answer
+            fact = self.pick_fact(destination, is_correct)
+            
+            round_updates.append({
+                'round_index': round_index,
+                'user_answer': user_answer,
+                'is_correct': is_correct,
+                'fact_shown': fact
+            })
+            results.append({
+                'round_index': round_index,
+                'is_correct': is_correct,
+                'fact': fact,
+                'correct_answer': {
+                    'city': destination['city'],
+                    'country': destination['country'],
+                    'image_url': destination.get('image_url')
+                }
+            })
+        
+        # Update every round and the score, this also returns the updated game
+        previous_game, updated_game = self.game_model.update_rounds(game_id, round_updates, active_only=True)
+        
+        if not updated_game:
+            game = self.game_model.get_game(game_id)
+            if not game:
+                return {'error': 'Game not found'}
+            if not game['active']:
+                return {'error': 'Game is not active'}
+            return {'error': 'Round not found'}
+        
+        # Update user stats with the rounds this update answered for the first time
+        newly_answered = [
+            round for round in round_updates
+            if previous_game['rounds'][round['round_index']].get('user_answer') is None
+        ]
+        correct_answers = sum(1 for round in newly_answered if round['is_correct'])
+        if newly_answered:
+            self.stats_writer.record(
+                updated_game['user_id'],
+                correct_answers=correct_answers,
+                incorrect_answers=len(newly_answered) - correct_answers
+            )
+        
+        return {
+            'game': updated_game,
+            'results': results
+        }
+    
     def create_challenge(self, user_id, frontend_url):
         """Create a challenge from a user"""
         # Get user
@@ -0,0 +1,178 @@
+# backend/services/import_planner.py
+import copy
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from utils.helpers import normalize_name
+
+EMPTY_VALUES = (None, '', [])
+
+def describe(destination):
+    """Format a destination as "City, Country" for reports"""
+    return f"{destination.get('city')}, {destination.get('country')}"
+
+def spelling(destination):
+    """Get the normalized city and country names, without resolving aliases"""
+    return normalize_name(destination.get('city')), normalize_name(destination.get('country'))
+
+class ImportPlanner:
+    """Diff imported destination records against the stored catalog.
+
+    Stored destinations are indexed by their match key, the alias-aware
+    city+country key of Destination.make_match_key, so "New York City,
+    United States" matches a stored "New York, USA". Every import goes
+    through this planner, so they all agree on what is a new destination. Planning is a single pass over the records with
+    one dictionary lookup each, and classifies every record as an insert,
+    an update of a stored destination, unchanged, a duplicate of an earlier
+    record or rejected. Nothing is written until the plan is applied.
+
+    By default an update only fills fields the stored destination is
+    missing; with `overwrite` it also replaces fields that differ. City and
+    country names of stored destinations are never changed.
+    """
+    def __init__(self, destination_model, overwrite=False, max_reported=100):
+        self.destination_model = destination_model
+        self.overwrite = overwrite
+        self.max_reported = max_reported
+        self.fields = list(destination_model.optional_fields)
+
+    def load_index(self):
+        """Index every stored destination"""
+        projection = ['city', 'country', 'match_key'] + self.fields
+        return self.build_index(self.destination_model.collection.find({}, projection))
+
+    def build_index(self, documents):
+        """Map the match key of each destination to its document"""
+        index = {}
+        for document in documents:
+            self.add_to_index(index, document)
+        return index
+
+    def add_to_index(self, index, document):
+        """Index a destination under its match key, unless one is indexed there already"""
+        index.setdefault(self.destination_model.make_match_key(document.get('city'), document.get('country')), document)
+
+    def plan(self, records, index):
+        """Work out what importing `records` would change.
+
+        Returns a plan with the documents to insert, the fields to set on
+        stored destinations, counts for every outcome and samples of the
+        rejected records and alias matches.
+        """
+        plan = {
+            'records': 0,
+            'inserts': [],
+            'updates': {},
+            'unchanged': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'aliases': 0,
+            'rejected_records': [],
+            'alias_matches': []
+        }
+        # Keys already seen in this import, mapped to their target document
+        seen = {}
+
+        for number, record in enumerate(records, start=1):
+            plan['records'] += 1
+            error = self.destination_model.validate_record(record)
+            if error:
+                plan['rejected'] += 1
+                if len(plan['rejected_records']) < self.max_reported:
+                    plan['rejected_records'].append({'record': number, 'error': error})
+                continue
+
+            destination = self.destination_model.transform_record(record, partial=True)
+            key = destination['match_key']
+
+            if key in seen:
+                # Later records for the same place only fill in what is missing
+                plan['duplicates'] += 1
+                self._merge(seen[key], destination, plan)
+                continue
+
+            existing = index.get(key)
+            if existing is None:
+                document = dict(destination)
+                for field, default in self.destination_model.optional_fields.items():
+                    document.setdefault(field, copy.copy(default))
+                seen[key] = document
+                plan['inserts'].append(document)
+                continue
+
+            seen[key] = existing
+            if spelling(existing) != spelling(destination):
+                plan['aliases'] += 1
+                if len(plan['alias_matches']) < self.max_reported:
+                    plan['alias_matches'].append((describe(destination), describe(existing)))
+
+            if not self._merge(existing, destination, plan):
+                plan['unchanged'] += 1
+
+        return plan
+
+    def _merge(self, target, destination, plan):
+        """Copy the fields a record adds onto its target, returning True if any did"""
+        changes = {}
+        for field in self.fields:
+            value = destination.get(field)
+            if value in EMPTY_VALUES:
+                continue
+            current = target.get(field)
+            if current in EMPTY_VALUES or (self.overwrite and current != value):
+                changes[field] = value
+        if not changes:
+            return False
+
+        target.update(changes)
+        if '_id' in target:
+            plan['updates'].setdefault(target['_id'], {}).update(changes)
+        return True
+
+    def apply(self, plan, chunk_size=1000):
+        """Write a plan in unordered bulk writes of `chunk_size`.
+
+        Inserts are upserts on the match key, so a destination that
+        appeared since the plan was made is left alone, and the documents
+        of the plan receive the IDs they were inserted with. Run
+        Destination.backfill_match_keys once per import before applying,
+        it scans the whole collection. Inserted destinations are stamped
+        with the catalog version the write produces. Returns the counts of
+        inserted, updated and failed writes.
+        """
+        operations = [
+            UpdateOne(
+                {'match_key': document['match_key']},
+                {'$setOnInsert': dict(document, added_version=None)},
+                upsert=True
+            )
+            for document in plan['inserts']
+        ]
+        operations.extend(
+            UpdateOne({'_id': document_id}, {'$set': changes})
+            for document_id, changes in plan['updates'].items()
+        )
+
+        report = {'inserted': 0, 'updated': 0, 'errors': 0}
+        inserted_ids = []
+        collection = self.destination_model.collection
+        for start in range(0, len(operations), chunk_size):
+            try:
+                result = collection.bulk_write(operations[start:start + chunk_size], ordered=False)
+                report['inserted'] += result.upserted_count
+                report['updated'] += result.modified_count
+                upserted = result.upserted_ids.items()
+            except BulkWriteError as e:
+                report['inserted'] += e.details.get('nUpserted', 0)
+                report['updated'] += e.details.get('nModified', 0)
+                report['errors'] += len(e.details.get('writeErrors', []))
+                upserted = [(item['index'], item['_id']) for item in e.details.get('upserted', [])]
+
+            # Inserted documents get their IDs, so later plans can update them
+            for position, document_id in upserted:
+                inserted_ids.append(document_id)
+                if start + position < len(plan['inserts']):
+                    plan['inserts'][start + position]['_id'] = document_id
+
+        if report['inserted'] or report['updated']:
+            self.destination_model.bump_catalog_version(inserted_ids)
+        return report
@@ -0,0 +1,195 @@
+# backend/services/stats_service.py
+import atexit
+import os
+import threading
+import time
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from models.user import User
+
+class DirectStatsWriter:
+    """Apply every answer to the user's statistics as it is recorded"""
+    mode = 'direct'
+
+    def __init__(self, db, user_model=None):
+        self.user_model = user_model or User(db)
+
+    def record(self, user_id, correct_answers=0, incorrect_answers=0):
+        """Add answers to a user's statistics"""
+        self.user_model.apply_stats_delta(user_id, correct_answers, incorrect_answers)
+
+    def record_answer(self, user_id, is_correct):
+        """Add a single answer to a user's statistics"""
+        self.record(user_id, 1 if is_correct else 0, 0 if is_correct else 1)
+
+    def flush(self):
+        """Nothing is buffered, so there is nothing to flush"""
+        return 0
+
+    def close(self):
+        """Nothing to release"""
+
+    def metrics(self):
+        """Report how statistics are written"""
+        return {'mode': self.mode}
+
+class BufferedStatsWriter(DirectStatsWriter):
+    """Write-behind aggregator for user statistics.
+
+    Answers are summed per user in memory and flushed as one unordered
+    bulk write of $inc operations when `max_users` users have pending
+    deltas, every `flush_interval` seconds, and at interpreter shutdown.
+    The pending deltas are swapped out under a lock, so an answer recorded
+    during a flush lands in the next batch instead of being lost, and
+    deltas from a failed write are merged back to be retried.
+    """
+    mode = 'buffered'
+
+    def __init__(self, db, max_users=100, flush_interval=2, user_model=None):
+        super().__init__(db, user_model)
+        self.max_users = max_users
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._pending_since = None
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        self._flushes = 0
+        self._flushed_users = 0
+        self._flushed_answers = 0
+        self._failed_flushes = 0
+        self._last_batch_size = 0
+        self._max_batch_size = 0
+        self._last_flush_lag = 0.0
+        self._max_flush_lag = 0.0
+
+        atexit.register(self.close)
+
+    def _ensure_flusher(self):
+        """Start the periodic flush thread in the current process"""
+        # Threads do not survive a fork, so each worker starts its own
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Deltas copied from the parent process belong to the parent
+                self._pending = {}
+                self._pending_since = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='stats-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Flush pending deltas every flush interval until closed"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def record(self, user_id, correct_answers=0, incorrect_answers=0):
+        """Buffer answers for a user, flushing if enough users are pending"""
+        # An invalid ID would fail every flush it is part of, so drop it here
+        if not ObjectId.is_valid(user_id):
+            return
+
+        self._ensure_flusher()
+
+        with self._lock:
+            self._add_pending(user_id, correct_answers, incorrect_answers)
+            should_flush = len(self._pending) >= self.max_users
+
+        if should_flush:
+            self.flush()
+
+    def _add_pending(self, user_id, correct_answers, incorrect_answers, since=None):
+        """Add a delta to the pending batch, the caller must hold the lock"""
+        pending = self._pending.get(user_id, (0, 0))
+        self._pending[user_id] = (pending[0] + correct_answers, pending[1] + incorrect_answers)
+
+        since = since or time.monotonic()
+        if self._pending_since is None or since < self._pending_since:
+            self._pending_since = since
+
+    def flush(self):
+        """Write all pending deltas and return how many users were flushed"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                since, self._pending_since = self._pending_since, None
+
+            if not batch:
+                return 0
+
+            try:
+                self.user_model.bulk_apply_stats_deltas(batch)
+            except BulkWriteError as e:
+                # Only the operations listed as errors were not applied
+                users = list(batch)
+                failed = {users[error['index']] for error in e.details.get('writeErrors', [])}
+                self._requeue({user_id: batch[user_id] for user_id in failed}, since)
+                print(f"Error flushing user stats for {len(failed)} users: {e}")
+                return len(batch) - len(failed)
+            except Exception as e:
+                # The write may not have reached the server, so retry the whole batch
+                self._requeue(batch, since)
+                print(f"Error flushing user stats: {e}")
+                return 0
+
+            self._record_flush(batch, since)
+            return len(batch)
+
+    def _requeue(self, batch, since):
+        """Merge deltas from a failed flush back into the pending batch"""
+        with self._lock:
+            self._failed_flushes += 1
+            for user_id, (correct_answers, incorrect_answers) in batch.items():
+                self._add_pending(user_id, correct_answers, incorrect_answers, since)
+
+    def _record_flush(self, batch, since):
+        """Update the flush metrics after a successful write"""
+        lag = time.monotonic() - since if since else 0.0
+        self._flushes += 1
+        self._flushed_users += len(batch)
+        self._flushed_answers += sum(correct + incorrect for correct, incorrect in batch.values())
+        self._last_batch_size = len(batch)
+        self._max_batch_size = max(self._max_batch_size, len(batch))
+        self._last_flush_lag = lag
+        self._max_flush_lag = max(self._max_flush_lag, lag)
+
+    def close(self):
+        """Stop the flush thread and write whatever is still pending"""
+        self._stop.set()
+        self.flush()
+
+    def metrics(self):
+        """Report flush lag, batch sizes and pending work"""
+        with self._lock:
+            pending_users = len(self._pending)
+            pending_since = self._pending_since
+
+        return {
+            'mode': self.mode,
+            'pending_users': pending_users,
+            'pending_age_seconds': time.monotonic() - pending_since if pending_since else 0.0,
+            'flushes': self._flushes,
+            'failed_flushes': self._failed_flushes,
+            'flushed_users': self._flushed_users,
+            'flushed_answers': self._flushed_answers,
+            'last_batch_size': self._last_batch_size,
+            'max_batch_size': self._max_batch_size,
+            'last_flush_lag_seconds': self._last_flush_lag,
+            'max_flush_lag_seconds': self._max_flush_lag
+        }
+
+def create_stats_writer(db, mode='direct', max_users=100, flush_interval=2, user_model=None):
+    """Create the statistics writer for the configured mode"""
+    if mode == 'buffered':
+        return BufferedStatsWriter(db, max_users, flush_interval, user_model)
+    if mode != 'direct':
+        raise ValueError(f"Unknown stats write mode: {mode}")
+    return DirectStatsWriter(db, user_model)
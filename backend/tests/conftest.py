@@ -0,0 +1,40 @@
+# backend/tests/conftest.py
+import os
+import sys
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# Import the app modules the way app.py does, from the backend directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The dataset scripts import their siblings directly
+sys.path.append(os.path.join(BACKEND_DIR, 'scripts'))
+
+# Server features such as query plans and update pipelines need a real MongoDB
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+
+@pytest.fixture
+def mock_db():
+    """An in-memory MongoDB database"""
+    mongomock = pytest.importorskip('mongomock')
+    return mongomock.MongoClient()['globetrotter_test']
+
+@pytest.fixture(scope='module')
+def server_db(request):
+    """A throwaway database on the MongoDB server in MONGO_URI, skipped if it is not reachable"""
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB is not reachable at {MONGO_URI}: {e}")
+
+    db_name = f"globetrotter_test_{request.module.__name__.rsplit('.', 1)[-1]}"
+    client.drop_database(db_name)
+    try:
+        yield client[db_name]
+    finally:
+        client.drop_database(db_name)
+        client.close()
@@ -0,0 +1,58 @@
+# backend/tests/test_extraction.py
+import random
+import pytest
+from extraction import extract_article_paragraphs
+from fixture_server import FIXTURE_CITIES, article_html
+
+# Long enough that every paragraph is kept, so no difference is filtered out
+TEXT = 'The old town is famous for its narrow streets and tiled facades, and much more.'
+
+def content(body):
+    return f'<html><body><div id="mw-content-text">{body}</div><p>{TEXT} after</p></body></html>'
+
+CASES = {
+    'cdata': content(f'<p>{TEXT}<![CDATA[ kept <b>as text</b>]]></p>'),
+    'cdata in style': content(f'<p>{TEXT}<style><![CDATA[x]]></style></p>'),
+    'style at the limit': content(f'<p>{TEXT}</p>' * 4 + f'<p>{TEXT}<style>p {{}}</style> tail</p><p>{TEXT} sixth</p>'),
+    'textarea': content(f'<p>{TEXT}<textarea>  \n  </textarea></p>' * 2 + f'<p>{TEXT} third'),
+    'table': content(f'<p>{TEXT}<table><tr><td>cell</td></tr></table></p><table><p>{TEXT} in a table</p>'),
+    'stray end tag': content(f'</span><p>{TEXT}</b> end</p></td><p>{TEXT}'),
+    'unclosed content': f'<div id="mw-content-text"><p>{TEXT}<p>{TEXT} nested',
+    'void tags': content(f'<p>{TEXT}<br>a<br/>b</br>c<img src=x>d</img></p><p>{TEXT}<br/></br>e</p>'),
+    'hidden tags': content(f'<p>{TEXT}<template>t<b>u</b></template><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby></p>'),
+    'references': content(f'<p>{TEXT} &amp; &#150; &#0; &#x41; &nbsp;&foo; &lt &#99999999;</p>'),
+    'whitespace': content(f'<p>{TEXT}<b> </b><i>\n\t</i><pre> \n </pre></p>'),
+    'markup declarations': content(f'<!DOCTYPE html><p>{TEXT}<!-- c --><?pi x?><!x> end</p>'),
+    'content after paragraphs': f'<p>{TEXT} before</p><div><div id="mw-content-text"><p>{TEXT}</div></div><p>{TEXT}</p>',
+    'no content': f'<p>{TEXT}</p>'
+}
+
+TOKENS = [
+    '<p>', '</p>', '<div>', '</div>', '<b>', '</b>', '<span>', '</span>', '<style>', '</style>',
+    '<script>s</script>', '<textarea>', '</textarea>', '<pre>', '</pre>', '<table>', '</table>',
+    '<td>', '</td>', '<br>', '<br/>', '</br>', '<img src=x>', '<template>', '</template>',
+    '<rt>', '</rt>', '<div id="mw-content-text">', '</x>', TEXT, 'word', ' ', '\n', '  \n ',
+    '&amp;', '&#150;', '&foo;', '&', '<!-- c -->', '<![CDATA[cd]]>', '<![CDATA[ ]]>',
+    '<!DOCTYPE html>', '<?pi x?>', '<P>', '<p/>', '<', '</', '>'
+]
+
+def random_page(rng):
+    return ''.join(rng.choice(TOKENS) for _ in range(rng.randint(1, 40)))
+
+def assert_same_paragraphs(html):
+    for max_paragraphs in (None, 1, 2, 5):
+        expected = extract_article_paragraphs(html, max_paragraphs, backend='html.parser')
+        assert extract_article_paragraphs(html, max_paragraphs, backend='stream') == expected
+
+@pytest.mark.parametrize('html', CASES.values(), ids=CASES.keys())
+def test_stream_matches_html_parser(html):
+    assert_same_paragraphs(html)
+
+@pytest.mark.parametrize('city', [city for city, _ in FIXTURE_CITIES[:4]])
+def test_stream_matches_html_parser_on_articles(city):
+    assert_same_paragraphs(article_html(city))
+
+def test_stream_matches_html_parser_on_random_markup():
+    rng = random.Random(0)
+    for _ in range(300):
+        assert_same_paragraphs(rng.choice(['', '<div id="mw-content-text">']) + random_page(rng))
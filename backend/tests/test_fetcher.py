@@ -0,0 +1,79 @@
+# backend/tests/test_fetcher.py
+import asyncio
+import time
+import pytest
+import fixture_server
+from fetcher import AsyncFetcher
+from fixture_server import FixtureServer
+from http_cache import HttpCache
+
+@pytest.fixture
+def server():
+    with FixtureServer() as server:
+        yield server
+
+def fetch_all(fetcher, urls):
+    """Fetch pages with a fresh event loop, returning their texts"""
+    async def run():
+        async with fetcher:
+            return await fetcher.fetch_all(urls)
+    return asyncio.run(run())
+
+def test_retries_after_a_503(server, monkeypatch):
+    # Fail the first request, serve every later one
+    draws = iter([0.0])
+    monkeypatch.setattr(fixture_server.random, 'random', lambda: next(draws, 1.0))
+    server.failure_rate = 0.5
+    fetcher = AsyncFetcher(rate_per_host=0, retries=2, backoff=0)
+
+    [html] = fetch_all(fetcher, [server.base_url + 'Lisbon'])
+
+    assert 'Lisbon' in html
+    assert fetcher.stats['retries'] == 1
+    assert fetcher.stats['fetched'] == 1
+    assert server.requests == 2
+
+def test_gives_up_after_the_last_retry(server):
+    server.failure_rate = 1.0
+    fetcher = AsyncFetcher(rate_per_host=0, retries=2, backoff=0)
+
+    assert fetch_all(fetcher, [server.base_url + 'Lisbon']) == [None]
+    assert fetcher.stats['failed'] == 1
+    assert server.requests == 3
+
+def test_rate_limits_each_host(server):
+    urls = [server.base_url + city for city, _ in fixture_server.FIXTURE_CITIES[:6]]
+    fetcher = AsyncFetcher(concurrency=6, rate_per_host=20, burst=1)
+
+    started = time.monotonic()
+    pages = fetch_all(fetcher, urls)
+    elapsed = time.monotonic() - started
+
+    assert all(pages)
+    # The first request takes the only token, the other five wait 1/20 s each
+    assert elapsed >= 5 / 20 * 0.9
+
+def test_cache_revalidates_unchanged_pages(server, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    url = server.base_url + 'Kyoto'
+
+    [first] = fetch_all(AsyncFetcher(rate_per_host=0, cache=cache), [url])
+    fetcher = AsyncFetcher(rate_per_host=0, cache=cache)
+    [second] = fetch_all(fetcher, [url])
+
+    assert second == first
+    assert fetcher.stats['revalidated'] == 1
+    assert fetcher.stats['fetched'] == 0
+    assert server.requests == 2
+
+def test_offline_cache_never_touches_the_network(server, tmp_path):
+    url = server.base_url + 'Cusco'
+    [cached] = fetch_all(AsyncFetcher(rate_per_host=0, cache=HttpCache(str(tmp_path))), [url])
+
+    fetcher = AsyncFetcher(rate_per_host=0, cache=HttpCache(str(tmp_path), mode='offline'))
+    pages = fetch_all(fetcher, [url, server.base_url + 'Hanoi'])
+
+    assert pages == [cached, None]
+    assert fetcher.stats['cache_hits'] == 1
+    assert fetcher.stats['failed'] == 1
+    assert server.requests == 1
@@ -0,0 +1,47 @@
+# backend/tests/test_indexes.py
+import datetime
+import pytest
+from bson import ObjectId
+from models.indexes import MODEL_QUERIES, ensure_indexes, explain_queries
+
+# Query plans need a real server (see server_db), mongomock cannot explain queries
+
+HOT_PATH_QUERIES = [query['name'] for query in MODEL_QUERIES if query['hot_path']]
+
+def seed(db):
+    """Insert a few documents into every collection the model queries read"""
+    user_ids = [ObjectId() for _ in range(20)]
+    db.users.insert_many([{
+        '_id': user_id,
+        'username': f"player{number}",
+        'challenge_id': f"challenge{number}",
+        'game_stats': {'correct_answers': 0, 'incorrect_answers': 0, 'total_played': 0},
+        'deck': {'ids': [], 'cursor': 0, 'catalog_version': 1}
+    } for number, user_id in enumerate(user_ids)])
+    db.games.insert_many([{
+        'user_id': str(user_ids[number % len(user_ids)]),
+        'rounds': [{'user_answer': None, 'is_correct': None} for _ in range(5)],
+        'score': 0,
+        'active': number % 2 == 0,
+        'version': 1,
+        'created_at': datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=number)
+    } for number in range(100)])
+    db.destinations.insert_many([{
+        'city': f"City {number}",
+        'country': f"Country {number % 10}",
+        'match_key': f"city {number}|country {number % 10}"
+    } for number in range(50)])
+    db.metadata.insert_one({'_id': 'destination_catalog', 'version': 1})
+    db.dataset_versions.insert_one({'_id': 'expanded_dataset.json', 'file_hash': 'example'})
+
+@pytest.fixture(scope='module')
+def query_plans(server_db):
+    """Explain every model query against a seeded, indexed database"""
+    seed(server_db)
+    ensure_indexes(server_db)
+    return {result['name']: result for result in explain_queries(server_db)}
+
+@pytest.mark.parametrize('name', HOT_PATH_QUERIES)
+def test_hot_path_query_uses_an_index(query_plans, name):
+    result = query_plans[name]
+    assert not result['collection_scan'], f"{name} scans {result['collection']}: {' <- '.join(result['stages'])}"
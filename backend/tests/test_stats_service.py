@@ -0,0 +1,120 @@
+# backend/tests/test_stats_service.py
+import threading
+from pymongo.errors import BulkWriteError
+from models.user import User
+from services.stats_service import BufferedStatsWriter
+
+def create_users(db, count):
+    """Create users and return their IDs as the routes pass them"""
+    user_model = User(db)
+    return [str(user_model.create_user(f"player{number}")['_id']) for number in range(count)]
+
+def stored_totals(db, user_ids):
+    """Read (correct, incorrect, total) for each user from the database"""
+    user_model = User(db)
+    totals = {}
+    for user_id in user_ids:
+        stats = user_model.get_user_by_id(user_id)['game_stats']
+        totals[user_id] = (stats['correct_answers'], stats['incorrect_answers'], stats['total_played'])
+    return totals
+
+def expected_totals(user_ids, answers):
+    """Sum recorded (user_id, is_correct) answers per user"""
+    totals = {user_id: (0, 0, 0) for user_id in user_ids}
+    for user_id, is_correct in answers:
+        correct, incorrect, total = totals[user_id]
+        totals[user_id] = (correct + is_correct, incorrect + (not is_correct), total + 1)
+    return totals
+
+def record_in_threads(writer, user_ids, threads=8, answers_per_thread=300):
+    """Record answers from several threads and return every answer recorded"""
+    recorded = [[] for _ in range(threads)]
+
+    def play(number):
+        for answer in range(answers_per_thread):
+            user_id = user_ids[(number * 7 + answer) % len(user_ids)]
+            is_correct = (number + answer) % 3 == 0
+            writer.record_answer(user_id, is_correct)
+            recorded[number].append((user_id, is_correct))
+
+    workers = [threading.Thread(target=play, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [answer for answers in recorded for answer in answers]
+
+def test_concurrent_records_across_flush_threshold(mock_db):
+    user_ids = create_users(mock_db, 10)
+    writer = BufferedStatsWriter(mock_db, max_users=3, flush_interval=60)
+
+    answers = record_in_threads(writer, user_ids)
+    writer.close()
+
+    assert writer.metrics()['flushes'] > 1
+    assert writer.metrics()['pending_users'] == 0
+    assert stored_totals(mock_db, user_ids) == expected_totals(user_ids, answers)
+
+def test_flush_racing_record(mock_db):
+    user_ids = create_users(mock_db, 5)
+    writer = BufferedStatsWriter(mock_db, max_users=1000, flush_interval=60)
+    done = threading.Event()
+
+    def flush_until_done():
+        while not done.is_set():
+            writer.flush()
+
+    flusher = threading.Thread(target=flush_until_done)
+    flusher.start()
+    answers = record_in_threads(writer, user_ids, threads=4)
+    done.set()
+    flusher.join()
+    writer.close()
+
+    assert stored_totals(mock_db, user_ids) == expected_totals(user_ids, answers)
+
+def test_bulk_write_error_requeues_only_failed_users(mock_db):
+    user_ids = create_users(mock_db, 3)
+    failing_user = user_ids[1]
+    writer = BufferedStatsWriter(mock_db, max_users=1000, flush_interval=60)
+    bulk_apply = writer.user_model.bulk_apply_stats_deltas
+    failures = []
+
+    def fail_once(deltas):
+        # Apply every other user's delta, then report the failing one as a write error
+        if failures:
+            return bulk_apply(deltas)
+        users = list(deltas)
+        failures.append(failing_user)
+        bulk_apply({user_id: delta for user_id, delta in deltas.items() if user_id != failing_user})
+        raise BulkWriteError({'writeErrors': [{'index': users.index(failing_user), 'code': 1, 'errmsg': 'failed'}]})
+
+    writer.user_model.bulk_apply_stats_deltas = fail_once
+
+    answers = [(user_id, is_correct) for user_id in user_ids for is_correct in (True, True, False)]
+    for user_id, is_correct in answers:
+        writer.record_answer(user_id, is_correct)
+
+    assert writer.flush() == 2
+    metrics = writer.metrics()
+    assert metrics['failed_flushes'] == 1
+    assert metrics['pending_users'] == 1
+    assert stored_totals(mock_db, [failing_user]) == {failing_user: (0, 0, 0)}
+
+    assert writer.flush() == 1
+    writer.close()
+    assert stored_totals(mock_db, user_ids) == expected_totals(user_ids, answers)
+
+def test_close_drains_pending_deltas(mock_db):
+    user_ids = create_users(mock_db, 4)
+    writer = BufferedStatsWriter(mock_db, max_users=1000, flush_interval=60)
+
+    answers = [(user_id, number % 2 == 0) for number, user_id in enumerate(user_ids * 5)]
+    for user_id, is_correct in answers:
+        writer.record_answer(user_id, is_correct)
+
+    assert stored_totals(mock_db, user_ids) == expected_totals(user_ids, [])
+    writer.close()
+
+    assert writer.metrics()['pending_users'] == 0
+    assert stored_totals(mock_db, user_ids) == expected_totals(user_ids, answers)
@@ -0,0 +1,59 @@
+# backend/tests/test_user_deck.py
+import pytest
+from models.user import User
+
+# Deck draws project with aggregation expressions, which mongomock rejects
+
+@pytest.fixture
+def user_model(server_db):
+    server_db.users.delete_many({})
+    return User(server_db)
+
+def create_user_with_deck(user_model, ids, cursor=0):
+    user_id = str(user_model.create_user('player')['_id'])
+    user_model.reset_deck(user_id, ids, cursor, 1)
+    return user_id
+
+def test_draw_returns_the_slice_at_the_cursor(user_model):
+    user_id = create_user_with_deck(user_model, ['a', 'b', 'c', 'd', 'e'], cursor=1)
+
+    state = user_model.draw_from_deck(user_id, 2)
+
+    assert state['drawn'] == ['b', 'c']
+    assert state['cursor'] == 1
+    assert state['size'] == 5
+    assert user_model.draw_from_deck(user_id, 1)['drawn'] == ['d']
+
+def test_draw_past_the_end_returns_what_is_left(user_model):
+    user_id = create_user_with_deck(user_model, ['a', 'b', 'c'], cursor=2)
+
+    assert user_model.draw_from_deck(user_id, 3)['drawn'] == ['c']
+    assert user_model.draw_from_deck(user_id, 3)['drawn'] == []
+
+def test_draw_without_a_deck_returns_nothing(user_model):
+    user_id = str(user_model.create_user('newcomer')['_id'])
+
+    state = user_model.draw_from_deck(user_id, 2)
+
+    assert state['drawn'] == []
+    assert state['cursor'] == 0
+    assert state['size'] == 0
+
+def test_draw_for_a_missing_user_returns_none(user_model):
+    assert user_model.draw_from_deck('0' * 24, 1) is None
+
+def test_merge_inserts_new_ids_at_the_position(user_model):
+    user_id = create_user_with_deck(user_model, ['a', 'b', 'c'])
+
+    assert user_model.merge_into_deck(user_id, ['x', 'b', 'y'], 1, 2)
+
+    state = user_model.draw_from_deck(user_id, 10)
+    assert state['drawn'] == ['a', 'x', 'y', 'b', 'c']
+    assert state['catalog_version'] == 2
+
+def test_merge_of_an_older_version_is_a_no_op(user_model):
+    user_id = create_user_with_deck(user_model, ['a', 'b'])
+    user_model.merge_into_deck(user_id, ['x'], 2, 3)
+
+    assert not user_model.merge_into_deck(user_id, ['y'], 0, 3)
+    assert user_model.draw_from_deck(user_id, 10)['drawn'] == ['a', 'b', 'x']
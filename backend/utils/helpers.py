@@ -1,7 +1,10 @@
 # backend/utils/helpers.py
+import base64
+import datetime
 import json
 import os
 import random
+import unicodedata
 from bson import ObjectId
 
 class JSONEncoder(json.JSONEncoder):
@@ -47,4 +50,28 @@ def shuffle_list(items):
     """Shuffle a list and return the shuffled copy"""
     shuffled = items.copy()
     random.shuffle(shuffled)
-    return shuffled
\ No newline at end of file
+    return shuffled
+
+def normalize_name(name):
+    """Normalize a place name for comparisons (casefolded, accents stripped)"""
+    if not name:
+        return ''
+    if name.isascii():
+        return ' '.join(name.casefold().split())
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+def encode_cursor(created_at, document_id):
+    """Encode a (created_at, _id) position as an opaque pagination cursor"""
+    raw = f"{created_at.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor into (created_at, ObjectId), or None if invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, document_id = raw.split('|', 1)
+        return datetime.datetime.fromisoformat(created_at), ObjectId(document_id)
+    except (ValueError, TypeError, UnicodeError, AttributeError):
+        return None
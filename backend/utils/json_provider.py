@@ -0,0 +1,55 @@
+# backend/utils/json_provider.py
+import datetime
+import decimal
+import json
+import uuid
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def encode_default(obj):
+    """Encode the values of MongoDB documents that JSON has no type for"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, (uuid.UUID, decimal.Decimal)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class MongoJSONProvider(JSONProvider):
+    """Flask JSON provider for MongoDB documents.
+
+    ObjectIds are written as their hex strings and datetimes as ISO 8601,
+    at any depth, so documents can be returned as they come from the
+    database. Serializes with orjson when it is installed and with the
+    standard library otherwise; both produce the same compact output.
+    """
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        """Serialize to a JSON string"""
+        return self.dump_bytes(obj).decode('utf-8')
+
+    def dump_bytes(self, obj):
+        """Serialize to UTF-8 encoded JSON"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=encode_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response without an intermediate string"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj), mimetype=self.mimetype)
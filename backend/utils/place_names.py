@@ -0,0 +1,92 @@
+# backend/utils/place_names.py
+import re
+from utils.helpers import normalize_name
+
+# Other names a city is known by, keyed by the normalized alias
+CITY_ALIASES = {
+    'new york city': 'new york',
+    'nyc': 'new york',
+    'washington dc': 'washington',
+    'washington d c': 'washington',
+    'st petersburg': 'saint petersburg',
+    'kiev': 'kyiv',
+    'bombay': 'mumbai',
+    'calcutta': 'kolkata',
+    'madras': 'chennai',
+    'bangalore': 'bengaluru',
+    'peking': 'beijing',
+    'saigon': 'ho chi minh city',
+    'rangoon': 'yangon',
+    'cracow': 'krakow',
+    'praha': 'prague',
+    'wien': 'vienna',
+    'munchen': 'munich',
+    'roma': 'rome',
+    'firenze': 'florence',
+    'venezia': 'venice',
+    'napoli': 'naples',
+    'lisboa': 'lisbon',
+    'koln': 'cologne',
+    'marrakesh': 'marrakech',
+    'macao': 'macau',
+    'den haag': 'the hague',
+    'kobenhavn': 'copenhagen',
+    'bruxelles': 'brussels',
+    'brussel': 'brussels',
+    'sevilla': 'seville',
+    'mexico df': 'mexico city',
+    'ciudad de mexico': 'mexico city',
+    'rio': 'rio de janeiro',
+    'la': 'los angeles',
+    'sf': 'san francisco',
+    'hk': 'hong kong'
+}
+
+# Other names a country is known by, keyed by the normalized alias
+COUNTRY_ALIASES = {
+    'usa': 'united states',
+    'us': 'united states',
+    'u s a': 'united states',
+    'u s': 'united states',
+    'united states of america': 'united states',
+    'america': 'united states',
+    'uk': 'united kingdom',
+    'u k': 'united kingdom',
+    'great britain': 'united kingdom',
+    'britain': 'united kingdom',
+    'england': 'united kingdom',
+    'scotland': 'united kingdom',
+    'wales': 'united kingdom',
+    'northern ireland': 'united kingdom',
+    'uae': 'united arab emirates',
+    'u a e': 'united arab emirates',
+    'czechia': 'czech republic',
+    'turkiye': 'turkey',
+    'holland': 'netherlands',
+    'the netherlands': 'netherlands',
+    'republic of korea': 'south korea',
+    'korea': 'south korea',
+    'russian federation': 'russia',
+    'viet nam': 'vietnam',
+    'cote d ivoire': 'ivory coast',
+    'burma': 'myanmar',
+    'swaziland': 'eswatini',
+    'prc': 'china',
+    'people s republic of china': 'china',
+    'timor leste': 'east timor',
+    'republic of ireland': 'ireland'
+}
+
+PUNCTUATION = re.compile(r"[.,'’\-()/]+")
+
+def canonical_name(name, aliases=None):
+    """Normalize a place name and resolve it to its canonical alias"""
+    normalized = ' '.join(PUNCTUATION.sub(' ', normalize_name(name)).split())
+    if normalized.startswith('st '):
+        normalized = 'saint ' + normalized[3:]
+    return (aliases or {}).get(normalized, normalized)
+
+def canonical_place_key(city, country):
+    """Build an alias-aware city+country key, so "New York City, USA" and
+    "New York, United States" are the same place"""
+    return f"{canonical_name(city, CITY_ALIASES)}|{canonical_name(country, COUNTRY_ALIASES)}"
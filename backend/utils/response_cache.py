@@ -0,0 +1,47 @@
+# backend/utils/response_cache.py
+import hashlib
+import json
+import os
+import tempfile
+
+class ResponseCache:
+    """On-disk cache of generated responses keyed by a hash of the request"""
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def key(request):
+        """Hash a request (model, messages and parameters) into a cache key"""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        """Get the file of a cache key"""
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def contains(self, key):
+        """Check if a response is cached for a key"""
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Get the cached response text of a key, or None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                content = json.load(f)['content']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+        return content
+
+    def put(self, key, content):
+        """Store a response text, replacing the file atomically"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'content': content}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
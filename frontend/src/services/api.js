@@ -106,6 +106,20 @@ export const addGameRound = async (gameId, userId) => {
   }
 };
 
+export const addGameRounds = async (gameId, userId, count = 5) => {
+  try {
+    const response = await api.post(`/games/${gameId}/rounds`, {
+      ...(userId ? { user_id: userId } : {})
+    }, {
+      params: { count }
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error getting game rounds:", error);
+    throw error;
+  }
+};
+
 // export const submitAnswer = async (gameId, destinationId, answer, roundIndex) => {
 //   try {
 //     console.log("API submitAnswer called with:", {
@@ -169,6 +183,22 @@ export const submitAnswer = async (gameId, destinationId, answer, roundIndex) =>
     }
   };
 
+export const submitAnswers = async (gameId, answers) => {
+  try {
+    const response = await api.post(`/games/${gameId}/answers`, {
+      answers: answers.map(({ destinationId, answer, roundIndex }) => ({
+        destination_id: destinationId,
+        answer,
+        round_index: roundIndex
+      }))
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error submitting answers:", error);
+    throw error;
+  }
+};
+
 export const endGame = async (gameId) => {
   try {
     console.log("Ending game:", gameId);
@@ -181,9 +211,15 @@ export const endGame = async (gameId) => {
   }
 };
 
-export const getUserGames = async (userId) => {
+export const getUserGames = async (userId, { before, limit, includeRounds } = {}) => {
   try {
-    const response = await api.get(`/games/user/${userId}`);
+    const response = await api.get(`/games/user/${userId}`, {
+      params: {
+        ...(before ? { before } : {}),
+        ...(limit !== undefined ? { limit } : {}),
+        ...(includeRounds ? { include_rounds: true } : {})
+      }
+    });
     return response.data;
   } catch (error) {
     throw error;